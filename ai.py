@@ -3,13 +3,39 @@ from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, AIMessage, BaseMessage, SystemMessage
 from langchain_core.runnables import RunnableConfig
 from log_callback_handler import NiceGuiLogElementCallbackHandler
+from conversation_store import ConversationView, HistoryBackend, HistoryEntry, RingBufferStore
+from response_cache import ResponseCache, response_key
 from dotenv import load_dotenv
+import asyncio
+import itertools
+import logging
+import math
 import os
-from typing import AsyncGenerator, Optional, List
+import time
+from collections import deque
+from typing import AsyncGenerator, Any, Callable, Deque, List, Optional
 
 load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 
+logger = logging.getLogger(__name__)
+
+# Tokens added per message by the chat format (role and separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(message: BaseMessage) -> int:
+    """Estimate the tokens of a message at about four characters per token."""
+    return math.ceil(len(str(message.content)) / 4) + MESSAGE_OVERHEAD_TOKENS
+
+
+SUMMARY_PROMPT = """
+You maintain the memory of a conversation between a user and an AI assistant.
+Write a concise summary of the conversation below, extending the summary so far if there is one.
+Keep facts, decisions, user preferences, submitted form data and open questions; leave out small talk
+and the JSON of forms. Reply with the summary only.
+"""
+
 
 class AIAgent:
     """
@@ -17,24 +43,80 @@ class AIAgent:
     
     This implementation follows the current LangChain recommendations:
     - Uses direct message storage instead of deprecated ConversationBufferMemory
-    - Implements message trimming to manage memory usage
+    - Implements message trimming by message count and token budget
+    - Optionally folds older turns into a running summary in the background
+    - Optionally persists the conversation, keeping only a recent window in memory
+    - Optionally replays cached answers to identical prompts
     - Compatible with LangGraph persistence patterns
     - No deprecation warnings
     """
-    def __init__(self, model: str = 'gpt-4o-mini', max_messages: int = 100):
-        """Initialize the AI agent with memory capabilities."""
+    def __init__(self, model: str = 'gpt-4o-mini', max_messages: int = 100,
+                 token_budget: Optional[int] = 16000,
+                 token_counter: Optional[Callable[[BaseMessage], int]] = None,
+                 summary_threshold: Optional[int] = None, summary_keep_turns: int = 2,
+                 history_backend: Optional[HistoryBackend] = None, session_id: str = 'default',
+                 response_cache: Optional[ResponseCache] = None):
+        """Initialize the AI agent with memory capabilities.
+        
+        Args:
+            model: The OpenAI chat model to use
+            max_messages: Maximum number of messages kept in the history
+            token_budget: Maximum prompt size in tokens (system prompt, history
+                and new message); None for no limit
+            token_counter: Counts the tokens of a message; by default the
+                model's tokenizer, or estimate_tokens() if it is unavailable
+            summary_threshold: History size in tokens above which older turns
+                are folded into a running summary after a turn; None to disable
+            summary_keep_turns: Number of recent turns kept verbatim when folding
+            history_backend: Persistent storage of the conversation; the recent
+                window of the session is loaded from it when first needed
+            session_id: The conversation to store in and restore from history_backend
+            response_cache: Cache of answers, keyed on the model, system prompt,
+                history and message; cached answers are replayed as a stream
+        """
         # Set API key via environment variable
         if OPENAI_API_KEY:
             os.environ["OPENAI_API_KEY"] = OPENAI_API_KEY
             
+        self.model = model
         self.llm = ChatOpenAI(
             model=model, 
             streaming=True
         )
-        # Modern approach: store messages directly instead of using deprecated memory classes
-        self.chat_history: List[BaseMessage] = []
+        # Modern approach: store messages directly instead of using deprecated memory classes.
+        # The ring buffer has room for a turn beyond max_messages before trimming, and
+        # keeps the token count of every message, computed once when it is appended.
+        self.chat_history = RingBufferStore(max_messages + 2)
         self.max_messages = max_messages
         
+        self.token_budget = token_budget
+        self.token_counter = token_counter
+        self._llm_counts_tokens = True
+        
+        # Running summary of the turns folded out of chat_history
+        self.summary_threshold = summary_threshold
+        self.summary_keep_turns = summary_keep_turns
+        self.summary_llm: Any = None  # Model writing the summaries; None for self.llm
+        self.summary = ''
+        self.summary_tokens = 0
+        self.compactions = 0
+        self._summary_message: Optional[SystemMessage] = None
+        self._compaction_task: Optional[asyncio.Task] = None
+        self._memory_generation = 0  # Bumped by clear_memory() to discard summaries in flight
+        
+        # Persistent history; turns are numbered per session from 0 by the backend
+        self.history_backend = history_backend
+        self.session_id = session_id
+        self._next_turn = 0  # One past the last turn this agent knows of
+        self._turns: Deque[int] = deque()  # Numbers of the turns in memory, oldest first
+        self._loaded = history_backend is None
+        self._turns_in_flight = 0
+        self._compacting = 0
+        self._unload_pending = False
+        self.last_active = time.monotonic()
+        
+        self.response_cache = response_cache
+        
         # System message to help AI understand MondrUI capabilities
         self.system_message = SystemMessage(content="""
 You are an AI assistant with the ability to create interactive forms using MondrUI. 
@@ -107,24 +189,146 @@ Use forms when users:
 
 Always explain what the form is for before presenting it.
 """)
-        
-    def get_conversation_history(self) -> List[BaseMessage]:
-        """Get the current conversation history."""
-        return self.chat_history.copy()
+        # The system prompt is part of every prompt, so its tokens are reserved
+        self.system_tokens = self.count_tokens(self.system_message)
+    
+    def count_tokens(self, message: BaseMessage) -> int:
+        """Count the tokens a message takes up in the prompt."""
+        if self.token_counter is not None:
+            return self.token_counter(message)
+        if self._llm_counts_tokens:
+            try:
+                return self.llm.get_num_tokens_from_messages([message])
+            except Exception:
+                # The tokenizer may be unavailable, e.g. if its encoding cannot be downloaded
+                self._llm_counts_tokens = False
+        return estimate_tokens(message)
+    
+    def get_history_tokens(self) -> int:
+        """Get the number of tokens in the conversation history."""
+        self._ensure_loaded()
+        return self.chat_history.total_tokens
+    
+    def get_conversation_history(self) -> ConversationView:
+        """Get a live, read-only view of the conversation history (nothing is copied)."""
+        self._ensure_loaded()
+        return self.chat_history.view()
     
     def clear_memory(self) -> None:
-        """Clear the conversation memory."""
+        """Clear the conversation memory (and the stored conversation)."""
         self.chat_history.clear()
+        self._set_summary('')
+        self._memory_generation += 1
+        self._next_turn = 0
+        self._turns.clear()
+        self._loaded = True
+        if self.history_backend is not None:
+            self.history_backend.clear(self.session_id)
+    
+    def _ensure_loaded(self) -> None:
+        """Load the recent window and the summary of the session from the history backend.
+        
+        The window holds the last max_messages // 2 turns not covered by the
+        summary; their stored token counts are used as they are.
+        """
+        if self._loaded:
+            return
+        self._loaded = True
+        summary, summary_turn = self.history_backend.load_summary(self.session_id)
+        self._next_turn = self.history_backend.last_turn(self.session_id) + 1
+        start = max(summary_turn, self._next_turn - self.max_messages // 2)
+        for turn, message, tokens in self.history_backend.load_turns(self.session_id, start):
+            self.chat_history.append(message, tokens)
+            if isinstance(message, HumanMessage):
+                self._turns.append(turn)
+        self._set_summary(summary)
+        self._trim_messages_if_needed()
     
-    def _trim_messages_if_needed(self) -> None:
-        """Trim messages to keep within max_messages limit."""
+    def unload(self) -> None:
+        """Release the in-memory history of an idle session; it is loaded again when needed.
+        
+        Only has an effect with a history backend, to which pending changes are
+        written. While a reply is streaming or turns are being folded, the
+        history is released once they are done.
+        """
+        if self.history_backend is None:
+            return
+        if self._turns_in_flight or self._compacting:
+            self._unload_pending = True
+            return
+        self._unload_pending = False
+        self.history_backend.flush()
+        self.chat_history.clear()
+        self._turns.clear()
+        self._set_summary('')
+        self._memory_generation += 1
+        self._loaded = False
+    
+    def _unload_if_pending(self) -> None:
+        if self._unload_pending:
+            self.unload()
+    
+    def load_older_turns(self, count: int = 10, before: Optional[int] = None) -> List[HistoryEntry]:
+        """Load up to count stored turns before turn `before` (by default, the oldest one in memory).
+        
+        Returns (turn, message, tokens) entries, oldest first; the messages
+        are not added to the history. Without a history backend there are
+        no older turns.
+        """
+        if self.history_backend is None:
+            return []
+        self._ensure_loaded()
+        if before is None:
+            before = self._first_turn_in_memory()
+        return self.history_backend.load_turns(self.session_id, max(0, before - count), before)
+    
+    def _first_turn_in_memory(self) -> int:
+        """The number of the oldest turn in the in-memory history."""
+        return self._turns[0] if self._turns else self._next_turn
+    
+    def _append_message(self, message: BaseMessage, tokens: Optional[int] = None) -> None:
+        """Add a message to the history, counting its tokens once (unless already counted)."""
+        self.chat_history.append(message, self.count_tokens(message) if tokens is None else tokens)
+    
+    def _trim_messages_if_needed(self, reserved_tokens: int = 0) -> None:
+        """Trim messages to keep within the max_messages limit and the token budget.
+        
+        Whole turns are removed from the beginning, so a human message is
+        never kept without its answer. The budget covers the system prompt,
+        the history and reserved_tokens (the message about to be sent).
+        """
         if len(self.chat_history) > self.max_messages:
             # Keep the most recent messages, ensuring we maintain pairs
             excess = len(self.chat_history) - self.max_messages
             # Remove from the beginning, but try to keep message pairs intact
             if excess % 2 == 1:
                 excess += 1  # Remove one more to keep pairs
-            self.chat_history = self.chat_history[excess:]
+            self._drop_oldest(excess)
+        
+        if self.token_budget is None:
+            return
+        available = self.token_budget - self.system_tokens - self.summary_tokens - reserved_tokens
+        history_tokens = self.get_history_tokens()
+        excess = 0
+        while history_tokens > available and excess < len(self.chat_history):
+            turn_end = self._turn_end(excess)
+            history_tokens -= sum(self.chat_history.tokens(index) for index in range(excess, turn_end))
+            excess = turn_end
+        self._drop_oldest(excess)
+    
+    def _turn_end(self, start: int) -> int:
+        """End of the turn starting at start: the index of the next human message."""
+        end = start + 1
+        while end < len(self.chat_history) and not isinstance(self.chat_history[end], HumanMessage):
+            end += 1
+        return end
+    
+    def _drop_oldest(self, count: int) -> None:
+        if self._turns:
+            dropped = sum(1 for message in self.chat_history[:count] if isinstance(message, HumanMessage))
+            for _ in range(min(dropped, len(self._turns))):
+                self._turns.popleft()
+        self.chat_history.drop_oldest(count)
     
     async def send_message(
         self, 
@@ -141,39 +345,176 @@ Always explain what the form is for before presenting it.
         Yields:
             str: Chunks of the AI response
         """
+        self.last_active = time.monotonic()
+        self._turns_in_flight += 1
+        stream = self._stream_turn(message, callback_handler)
+        try:
+            async for chunk in stream:
+                yield chunk
+        finally:
+            await stream.aclose()
+            self._turns_in_flight -= 1
+            self._unload_if_pending()
+    
+    async def _stream_turn(
+        self,
+        message: str,
+        callback_handler: Optional[NiceGuiLogElementCallbackHandler]
+    ) -> AsyncGenerator[str, None]:
+        """Stream the answer to a message and add the turn to the history."""
+        self._ensure_loaded()
+        
         # Add user message to history
         user_message = HumanMessage(content=message)
+        user_tokens = self.count_tokens(user_message)
+        
+        # Make room for the new message within the token budget
+        self._trim_messages_if_needed(reserved_tokens=user_tokens)
         
-        # Prepare messages with system message and history (include current message)
-        messages = [self.system_message] + self.chat_history + [user_message]
+        # Prepare messages with system message, summary and history (include current message);
+        # the history is read in place rather than concatenated
+        prefix = [self.system_message]
+        if self._summary_message is not None:
+            prefix.append(self._summary_message)
+        messages = self.chat_history.prompt(prefix, [user_message])
         
         # Configure callbacks
         config = None
         if callback_handler:
             config = RunnableConfig(callbacks=[callback_handler])
         
+        # Replay a cached answer to the same prompt, chunk by chunk as it was streamed
+        cache_key = None
+        cached = None
+        if self.response_cache is not None:
+            history = itertools.chain(prefix[1:], self.chat_history)
+            cache_key = response_key(self.model, str(self.system_message.content), history, message)
+            cached = self.response_cache.get(cache_key)
+        
         # Stream the response
         response_content = ""
-        async for chunk in self.llm.astream(messages, config=config):
-            chunk_content = str(chunk.content) if chunk.content else ""
-            response_content += chunk_content
-            yield chunk_content
+        if cached is not None:
+            async for chunk_content in self.response_cache.replay(cached):
+                response_content += chunk_content
+                yield chunk_content
+        else:
+            chunks = []
+            async for chunk in self.llm.astream(messages, config=config):
+                chunk_content = str(chunk.content) if chunk.content else ""
+                response_content += chunk_content
+                chunks.append(chunk_content)
+                yield chunk_content
+            if cache_key is not None:
+                self.response_cache.put(cache_key, [chunk for chunk in chunks if chunk])
         
         # Save the conversation to memory
-        self.chat_history.append(user_message)
-        self.chat_history.append(AIMessage(content=response_content))
+        ai_message = AIMessage(content=response_content)
+        ai_tokens = self.count_tokens(ai_message)
+        self._append_message(user_message, user_tokens)
+        self._append_message(ai_message, ai_tokens)
+        if self.history_backend is not None:
+            turn = self.history_backend.next_turn(self.session_id)
+            self.history_backend.append(self.session_id, [
+                (turn, user_message, user_tokens), (turn, ai_message, ai_tokens)
+            ])
+            self._turns.append(turn)
+            self._next_turn = max(self._next_turn, turn + 1)
         
         # Trim messages if we've exceeded the limit
         self._trim_messages_if_needed()
+        
+        # Fold older turns into the summary without holding up the caller
+        self._schedule_compaction()
+    
+    def _schedule_compaction(self) -> None:
+        """Start folding older turns in the background if the history exceeds the threshold."""
+        if self.summary_threshold is None or self.get_history_tokens() <= self.summary_threshold:
+            return
+        if self._compaction_task is not None and not self._compaction_task.done():
+            return
+        self._compaction_task = asyncio.get_running_loop().create_task(self.compact())
+    
+    async def wait_for_compaction(self) -> None:
+        """Wait until a compaction running in the background has finished."""
+        if self._compaction_task is not None:
+            await self._compaction_task
+    
+    async def compact(self) -> bool:
+        """Fold all but the most recent summary_keep_turns turns into the running summary.
+        
+        The history keeps changing while the summary is written: new turns
+        are appended and old ones may be trimmed. Only the folded messages
+        still at the start of the history are replaced, and nothing is
+        changed if the memory was cleared meanwhile. Returns whether turns
+        were folded; failures are logged and leave the history as it is.
+        """
+        self._compacting += 1
+        try:
+            return await self._fold_turns()
+        finally:
+            self._compacting -= 1
+            self._unload_if_pending()
+    
+    async def _fold_turns(self) -> bool:
+        self._ensure_loaded()
+        turn_starts = [index for index, message in enumerate(self.chat_history) if isinstance(message, HumanMessage)]
+        if len(turn_starts) <= self.summary_keep_turns:
+            return False
+        end = turn_starts[-self.summary_keep_turns] if self.summary_keep_turns else len(self.chat_history)
+        folded = self.chat_history[:end]
+        generation = self._memory_generation
+        
+        transcript = '\n\n'.join(
+            f'{"User" if isinstance(message, HumanMessage) else "Assistant"}: {message.content}' for message in folded
+        )
+        previous = f'Summary so far:\n{self.summary}\n\n' if self.summary else ''
+        try:
+            response = await (self.summary_llm or self.llm).ainvoke([
+                SystemMessage(content=SUMMARY_PROMPT),
+                HumanMessage(content=f'{previous}Conversation:\n{transcript}')
+            ])
+        except Exception:
+            logger.exception('Summarizing the conversation failed')
+            return False
+        if generation != self._memory_generation:
+            return False
+        
+        folded_ids = {id(message) for message in folded}
+        count = 0
+        while count < len(self.chat_history) and id(self.chat_history[count]) in folded_ids:
+            count += 1
+        self._drop_oldest(count)
+        self._set_summary(str(response.content).strip())
+        self.compactions += 1
+        if self.history_backend is not None:
+            self.history_backend.save_summary(self.session_id, self.summary, self._first_turn_in_memory())
+        return True
+    
+    def _set_summary(self, summary: str) -> None:
+        self.summary = summary
+        if summary:
+            self._summary_message = SystemMessage(content=f'Summary of the earlier conversation:\n{summary}')
+            self.summary_tokens = self.count_tokens(self._summary_message)
+        else:
+            self._summary_message = None
+            self.summary_tokens = 0
+    
+    def get_response_cache_stats(self) -> dict:
+        """Get response cache statistics (empty without a response cache)."""
+        return self.response_cache.stats() if self.response_cache is not None else {}
     
     def get_conversation_count(self) -> int:
         """Get the number of message pairs in the conversation."""
+        self._ensure_loaded()
         return len(self.chat_history) // 2
     
     def get_memory_stats(self) -> dict:
         """Get detailed memory statistics."""
+        self._ensure_loaded()
         human_messages = sum(1 for msg in self.chat_history if isinstance(msg, HumanMessage))
         ai_messages = sum(1 for msg in self.chat_history if isinstance(msg, AIMessage))
+        history_tokens = self.get_history_tokens()
+        prompt_tokens = self.system_tokens + self.summary_tokens + history_tokens
         
         return {
             "total_messages": len(self.chat_history),
@@ -181,11 +522,20 @@ Always explain what the form is for before presenting it.
             "ai_messages": ai_messages,
             "conversation_turns": min(human_messages, ai_messages),
             "max_messages": self.max_messages,
-            "memory_usage_percent": (len(self.chat_history) / self.max_messages) * 100
+            "memory_usage_percent": (len(self.chat_history) / self.max_messages) * 100,
+            "history_tokens": history_tokens,
+            "system_tokens": self.system_tokens,
+            "summary_tokens": self.summary_tokens,
+            "compactions": self.compactions,
+            "prompt_tokens": prompt_tokens,
+            "token_budget": self.token_budget,
+            "token_usage_percent": (prompt_tokens / self.token_budget) * 100 if self.token_budget else 0.0,
+            "stored_turns": self._next_turn if self.history_backend is not None else None
         }
     
     def get_conversation_summary(self) -> str:
         """Get a summary of the conversation for display purposes."""
+        self._ensure_loaded()
         if not self.chat_history:
             return "New conversation"
         
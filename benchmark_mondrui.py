@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+MondrUI rendering pipeline benchmarks.
+
+Generates synthetic specifications parameterised by nesting depth, breadth,
+form field count and list size, runs them through the pipeline (template
+expansion, compilation, rendering, list binding, JSON extraction) and
+reports throughput and latency percentiles.
+
+Runs headless: components are rendered into NiceGUI's auto-index client
+without starting a server, or into the in-memory backend.
+
+Usage:
+    python benchmark_mondrui.py                       # Full run, table on stdout
+    python benchmark_mondrui.py --quick               # Smaller sizes, shorter runs
+    python benchmark_mondrui.py -o results.json       # Store machine-readable results
+    python benchmark_mondrui.py --compare base.json   # Compare with an earlier run
+    python benchmark_mondrui.py -k render             # Only cases whose name contains "render"
+    python benchmark_mondrui.py --backend memory      # Render into the in-memory backend
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import nicegui
+from nicegui import ui
+
+from mondrui import ItemTemplateBinder, MondrUIRenderer, parse_and_render
+from mondrui_memory import MemoryUI
+from mondrui_stream import extract_mondrui_json
+
+
+FIELD_TYPES = ['text', 'email', 'textarea', 'select', 'radio', 'checkboxGroup', 'slider']
+
+
+# Synthetic specifications
+
+def make_nested_spec(depth: int, breadth: int) -> Dict[str, Any]:
+    """Containers nested `depth` levels deep with `breadth` children each; Text leaves."""
+    def build(level: int, path: str) -> Dict[str, Any]:
+        if level == depth:
+            return {'component': 'Text', 'props': {'text': f'Leaf {path}'}}
+        return {
+            'component': 'Container',
+            'props': {
+                'layout': 'horizontal' if level % 2 else 'vertical',
+                'style': {'classes': ['gap-2'], 'padding': '4px'},
+                'children': [build(level + 1, f'{path}.{i}') for i in range(breadth)]
+            }
+        }
+    
+    return {'type': 'ui.render', **build(0, '0')}
+
+
+def make_field(index: int) -> Dict[str, Any]:
+    """A form field cycling through the supported field types."""
+    field_type = FIELD_TYPES[index % len(FIELD_TYPES)]
+    field = {'id': f'field_{index}', 'label': f'Field {index}', 'type': field_type, 'required': index % 3 == 0}
+    if field_type in ('select', 'radio'):
+        field['options'] = [f'Option {n}' for n in range(4)]
+    elif field_type == 'checkboxGroup':
+        field['options'] = {f'option_{n}': f'Option {n}' for n in range(4)}
+    elif field_type == 'slider':
+        field.update({'min': 0, 'max': 10, 'value': 5})
+    return field
+
+
+def make_form_spec(field_count: int, component: str = 'Form') -> Dict[str, Any]:
+    """A form (or form template) with `field_count` fields."""
+    return {
+        'type': 'ui.render',
+        'component': component,
+        'props': {
+            'title': f'Form with {field_count} fields',
+            'fields': [make_field(i) for i in range(field_count)],
+            'actions': [{'label': 'Submit', 'action': 'submit_form'}]
+        }
+    }
+
+
+def make_list_items(size: int) -> List[Dict[str, Any]]:
+    """List items with nested values for template binding."""
+    return [
+        {'id': i, 'title': f'Item {i}', 'owner': {'name': f'User {i % 50}'}, 'tags': ['a', 'b']}
+        for i in range(size)
+    ]
+
+
+ITEM_TEMPLATE = {
+    'component': 'Card',
+    'props': {
+        'title': '{{title}}',
+        'children': [
+            {'component': 'Text', 'props': {'text': 'Owner: {{owner.name}} ({{tags.0}})'}}
+        ]
+    }
+}
+
+
+def make_list_spec(size: int, virtual: bool = False) -> Dict[str, Any]:
+    """A List of `size` items rendered through ITEM_TEMPLATE."""
+    props = {'items': make_list_items(size), 'itemTemplate': ITEM_TEMPLATE}
+    if virtual:
+        props.update({'virtual': True, 'rowHeight': 64, 'height': '600px'})
+    return {'type': 'ui.render', 'component': 'List', 'props': props}
+
+
+def make_response_text(field_count: int, prose_paragraphs: int) -> str:
+    """An LLM-style response: prose around a ```json block with a form spec."""
+    paragraph = 'Here is some explanation of what the form is for and how to fill it in. ' * 4
+    prose = '\n\n'.join(paragraph for _ in range(prose_paragraphs))
+    block = json.dumps(make_form_spec(field_count), indent=2)
+    return f'{prose}\n\n```json\n{block}\n```\n\n{prose}'
+
+
+# Measurement
+
+class Case:
+    """A benchmark case: a name, its parameters and a callable to time."""
+    
+    def __init__(self, name: str, params: Dict[str, Any], run: Callable[[], Any],
+                 renders: bool = False):
+        self.name = name
+        self.params = params
+        self.run = run
+        self.renders = renders  # Rendered elements are discarded after each iteration
+    
+    @property
+    def key(self) -> str:
+        return case_key(self.name, self.params)
+
+
+def case_key(name: str, params: Dict[str, Any]) -> str:
+    """Identify a case by name and parameters, e.g. "list.render[items=100]"."""
+    joined = ','.join(f'{key}={value}' for key, value in params.items())
+    return f'{name}[{joined}]' if joined else name
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Linearly interpolated percentile of an ascending list."""
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarize(durations: List[float]) -> Dict[str, Any]:
+    """Throughput and latency figures (milliseconds) for a list of durations in seconds."""
+    ordered = sorted(durations)
+    total = sum(ordered)
+    return {
+        'iterations': len(ordered),
+        'ops_per_sec': len(ordered) / total if total else float('inf'),
+        'latency_ms': {
+            'mean': statistics.fmean(ordered) * 1e3,
+            'min': ordered[0] * 1e3,
+            'p50': percentile(ordered, 0.50) * 1e3,
+            'p90': percentile(ordered, 0.90) * 1e3,
+            'p99': percentile(ordered, 0.99) * 1e3,
+            'max': ordered[-1] * 1e3,
+        }
+    }
+
+
+def measure(case: Case, min_time: float, min_iterations: int, max_iterations: int,
+            warmup: int = 2, backend: Any = ui) -> Dict[str, Any]:
+    """Time a case until both min_time and min_iterations are reached."""
+    with backend.column() as sink:
+        for _ in range(warmup):
+            with sink:
+                case.run()
+            sink.clear()
+        
+        durations: List[float] = []
+        elapsed = 0.0
+        while len(durations) < max_iterations and (elapsed < min_time or len(durations) < min_iterations):
+            with sink:
+                start = time.perf_counter()
+                case.run()
+                duration = time.perf_counter() - start
+            durations.append(duration)
+            elapsed += duration
+            if case.renders:
+                sink.clear()
+    sink.delete()
+    
+    return {'name': case.name, 'params': case.params, **summarize(durations)}
+
+
+# Cases
+
+def build_cases(quick: bool, backend: Any = ui) -> Iterator[Case]:
+    """Generate the benchmark cases, smaller when quick is set."""
+    depths = [(2, 3), (3, 4)] if quick else [(2, 4), (4, 3), (3, 8)]
+    field_counts = [10, 50] if quick else [10, 100, 500]
+    list_sizes = [100, 1000] if quick else [100, 1000, 10000]
+    
+    for depth, breadth in depths:
+        renderer = MondrUIRenderer(backend=backend)
+        spec = make_nested_spec(depth, breadth)
+        yield Case('render_component.nested', {'depth': depth, 'breadth': breadth},
+                   lambda r=renderer, s=spec: r.render_component(s), renders=True)
+    
+    for field_count in field_counts:
+        renderer = MondrUIRenderer(backend=backend)
+        spec = make_form_spec(field_count)
+        yield Case('render_component.form', {'fields': field_count},
+                   lambda r=renderer, s=spec: r.render_component(s), renders=True)
+        yield Case('compile.uncached', {'fields': field_count},
+                   lambda r=renderer, s=spec: r.compile(s, cache=False))
+        
+        template_props = make_form_spec(field_count, 'bugReportForm')['props']
+        yield Case('expand_template', {'template': 'bugReportForm', 'fields': field_count},
+                   lambda r=renderer, p=template_props: r._expand_template('bugReportForm', p))
+        
+        text = json.dumps(make_form_spec(field_count))
+        if backend is ui:  # Uses the global renderer
+            yield Case('parse_and_render', {'fields': field_count},
+                       lambda t=text: parse_and_render(t), renders=True)
+        
+        for paragraphs in ([2] if quick else [2, 50]):
+            response = make_response_text(field_count, paragraphs)
+            yield Case('extract_mondrui_json', {'fields': field_count, 'prose_paragraphs': paragraphs},
+                       lambda t=response: extract_mondrui_json(t))
+    
+    for size in list_sizes:
+        items = make_list_items(size)
+        yield Case('list.bind_items', {'items': size}, lambda i=items: _bind_all(i))
+        
+        if size <= 1000:
+            renderer = MondrUIRenderer(backend=backend)
+            spec = make_list_spec(size)
+            yield Case('list.render', {'items': size},
+                       lambda r=renderer, s=spec: r.render_component(s), renders=True)
+        
+        renderer = MondrUIRenderer(backend=backend)
+        spec = make_list_spec(size, virtual=True)
+        yield Case('list.render_virtual', {'items': size},
+                   lambda r=renderer, s=spec: r.render_component(s), renders=True)
+
+
+def _bind_all(items: List[Dict[str, Any]]) -> List[Any]:
+    """Bind every item the way ListComponent does: one binder per render."""
+    binder = ItemTemplateBinder(ITEM_TEMPLATE)
+    return [binder.bind_item(item) for item in items]
+
+
+# Reporting
+
+def git_revision() -> Optional[str]:
+    """Current git commit, if available."""
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                                capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def environment() -> Dict[str, Any]:
+    """Metadata identifying the run."""
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'nicegui': nicegui.__version__,
+        'revision': git_revision(),
+    }
+
+
+def result_key(result: Dict[str, Any]) -> str:
+    return case_key(result['name'], result['params'])
+
+
+def compare(current: List[Dict[str, Any]], baseline: List[Dict[str, Any]]) -> List[Tuple[str, float, float, float]]:
+    """Pair results by name and parameters; return (key, baseline p50, current p50, ratio)."""
+    previous = {result_key(result): result for result in baseline}
+    rows = []
+    for result in current:
+        key = result_key(result)
+        if key in previous:
+            before = previous[key]['latency_ms']['p50']
+            after = result['latency_ms']['p50']
+            rows.append((key, before, after, after / before if before else float('inf')))
+    return rows
+
+
+def print_results(results: List[Dict[str, Any]]) -> None:
+    width = max((len(result_key(result)) for result in results), default=10)
+    print(f"{'case':<{width}}  {'iter':>6}  {'ops/s':>10}  {'p50 ms':>9}  {'p90 ms':>9}  {'p99 ms':>9}")
+    for result in results:
+        latency = result['latency_ms']
+        print(f"{result_key(result):<{width}}  {result['iterations']:>6}  {result['ops_per_sec']:>10.1f}  "
+              f"{latency['p50']:>9.3f}  {latency['p90']:>9.3f}  {latency['p99']:>9.3f}")
+
+
+def print_comparison(rows: List[Tuple[str, float, float, float]]) -> None:
+    width = max((len(row[0]) for row in rows), default=10)
+    print(f"\n{'case':<{width}}  {'base p50':>9}  {'p50':>9}  {'change':>8}")
+    for key, before, after, ratio in rows:
+        print(f'{key:<{width}}  {before:>9.3f}  {after:>9.3f}  {(ratio - 1) * 100:>+7.1f}%')
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the MondrUI rendering pipeline.')
+    parser.add_argument('--quick', action='store_true', help='smaller sizes and shorter runs')
+    parser.add_argument('-o', '--output', help='write results as JSON to this file')
+    parser.add_argument('--compare', help='JSON results of an earlier run to compare with')
+    parser.add_argument('-k', dest='filter', default='', help='only run cases whose name contains this')
+    parser.add_argument('--min-time', type=float, default=None, help='minimum seconds per case')
+    parser.add_argument('--backend', choices=['nicegui', 'memory'], default='nicegui',
+                        help='element backend to render with')
+    args = parser.parse_args(argv)
+    
+    min_time = args.min_time if args.min_time is not None else (0.2 if args.quick else 1.0)
+    results = []
+    backend = MemoryUI() if args.backend == 'memory' else ui
+    for case in build_cases(args.quick, backend):
+        if args.filter in case.key:
+            results.append(measure(case, min_time, min_iterations=5, max_iterations=10000, backend=backend))
+    
+    print_results(results)
+    report = {'environment': {**environment(), 'backend': args.backend}, 'results': results}
+    
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+        print_comparison(compare(results, baseline['results']))
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump(report, output_file, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
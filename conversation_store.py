@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Conversation history storage for the AI agent.
+
+A RingBufferStore keeps the most recent messages, and the token count of
+each, in fixed-size slots. Dropping the oldest messages moves the start of
+the ring instead of re-slicing a list, and readers get live, read-only
+views instead of copies:
+
+    store = RingBufferStore(capacity=100)
+    store.append(HumanMessage(content='Hi'), tokens=5)
+    for message in store.view():
+        ...
+    llm.astream(store.prompt([system_message], [user_message]))
+
+A HistoryBackend persists whole conversations per session, so the agent
+only needs to keep a recent window in memory; SQLiteHistoryBackend stores
+them in a local SQLite database.
+"""
+
+import json
+import sqlite3
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+from typing import Iterator, List, Optional, Tuple, Union
+
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+
+# A stored message: (turn number, message, token count)
+HistoryEntry = Tuple[int, BaseMessage, int]
+
+
+class ConversationView(Sequence):
+    """Read-only, live view of the messages in a store, oldest first.
+    
+    Nothing is copied: indexing and iteration read the store's slots, so
+    the view reflects later changes. Slicing returns a list of the slice.
+    """
+    
+    __slots__ = ('_store',)
+    
+    def __init__(self, store: 'RingBufferStore'):
+        self._store = store
+    
+    def __len__(self) -> int:
+        return len(self._store)
+    
+    def __getitem__(self, index: Union[int, slice]) -> Union[BaseMessage, List[BaseMessage]]:
+        return self._store[index]
+    
+    def __iter__(self) -> Iterator[BaseMessage]:
+        return iter(self._store)
+    
+    def __repr__(self) -> str:
+        return f'<ConversationView of {len(self)} messages>'
+
+
+class PromptView(Sequence):
+    """Read-only sequence of prefix messages, the stored history and suffix messages.
+    
+    Passed to a chat model as its input, it is turned into the model's
+    message list in one go, without the history being concatenated first.
+    """
+    
+    __slots__ = ('_prefix', '_store', '_suffix')
+    
+    def __init__(self, prefix: Sequence, store: 'RingBufferStore', suffix: Sequence):
+        self._prefix = prefix
+        self._store = store
+        self._suffix = suffix
+    
+    def __len__(self) -> int:
+        return len(self._prefix) + len(self._store) + len(self._suffix)
+    
+    def __getitem__(self, index: Union[int, slice]) -> Union[BaseMessage, List[BaseMessage]]:
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('prompt index out of range')
+        if index < len(self._prefix):
+            return self._prefix[index]
+        index -= len(self._prefix)
+        if index < len(self._store):
+            return self._store[index]
+        return self._suffix[index - len(self._store)]
+    
+    def __iter__(self) -> Iterator[BaseMessage]:
+        yield from self._prefix
+        yield from self._store
+        yield from self._suffix
+
+
+class RingBufferStore:
+    """Bounded store of messages and their token counts, oldest first.
+    
+    Appending to a full store overwrites the oldest message. The total
+    token count is kept up to date, so reading it costs nothing.
+    """
+    
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("Capacity must be at least 1")
+        self.capacity = capacity
+        self.total_tokens = 0
+        self._messages: List[Optional[BaseMessage]] = [None] * capacity
+        self._tokens: List[int] = [0] * capacity
+        self._start = 0
+        self._size = 0
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def __iter__(self) -> Iterator[BaseMessage]:
+        for offset in range(self._size):
+            yield self._messages[(self._start + offset) % self.capacity]
+    
+    def __getitem__(self, index: Union[int, slice]) -> Union[BaseMessage, List[BaseMessage]]:
+        if isinstance(index, slice):
+            return [self._messages[self._slot(position)] for position in range(*index.indices(self._size))]
+        return self._messages[self._slot(index)]
+    
+    def _slot(self, index: int) -> int:
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError('conversation index out of range')
+        return (self._start + index) % self.capacity
+    
+    def tokens(self, index: int) -> int:
+        """Token count of the message at index."""
+        return self._tokens[self._slot(index)]
+    
+    def items(self) -> Iterator[Tuple[BaseMessage, int]]:
+        """Iterate over (message, token count) pairs, oldest first."""
+        for offset in range(self._size):
+            slot = (self._start + offset) % self.capacity
+            yield self._messages[slot], self._tokens[slot]
+    
+    def append(self, message: BaseMessage, tokens: int = 0) -> None:
+        """Add a message, overwriting the oldest one if the store is full."""
+        if self._size == self.capacity:
+            self.drop_oldest(1)
+        slot = (self._start + self._size) % self.capacity
+        self._messages[slot] = message
+        self._tokens[slot] = tokens
+        self._size += 1
+        self.total_tokens += tokens
+    
+    def drop_oldest(self, count: int) -> None:
+        """Remove the oldest count messages."""
+        for _ in range(min(count, self._size)):
+            self.total_tokens -= self._tokens[self._start]
+            # Release the message so it can be garbage collected
+            self._messages[self._start] = None
+            self._tokens[self._start] = 0
+            self._start = (self._start + 1) % self.capacity
+            self._size -= 1
+    
+    def clear(self) -> None:
+        """Remove all messages."""
+        self.drop_oldest(self._size)
+        self._start = 0
+    
+    def view(self) -> ConversationView:
+        """A live, read-only view of the messages."""
+        return ConversationView(self)
+    
+    def prompt(self, prefix: Sequence = (), suffix: Sequence = ()) -> PromptView:
+        """The messages between prefix and suffix messages, as input for a chat model."""
+        return PromptView(prefix, self, suffix)
+
+
+class HistoryBackend(ABC):
+    """Persistent storage of conversation histories, keyed by session id.
+    
+    Messages are stored with the number of the turn they belong to (turns
+    are numbered from 0 per session, a turn starting with a human message)
+    and their token count, so restored messages need not be counted again.
+    """
+    
+    @abstractmethod
+    def append(self, session_id: str, entries: Sequence) -> None:
+        """Store (turn, message, tokens) entries at the end of a session's history."""
+    
+    @abstractmethod
+    def load_turns(self, session_id: str, start: int, stop: Optional[int] = None) -> List[HistoryEntry]:
+        """Load the entries of turns start to stop (exclusive; None for the last), oldest first."""
+    
+    @abstractmethod
+    def last_turn(self, session_id: str) -> int:
+        """The number of the last stored turn of a session, or -1 if there is none."""
+    
+    @abstractmethod
+    def next_turn(self, session_id: str) -> int:
+        """Reserve the number of a new turn of a session.
+        
+        Several agents may write to the same session (e.g. two tabs of one
+        browser), so turn numbers are handed out by the backend, each once.
+        """
+    
+    @abstractmethod
+    def save_summary(self, session_id: str, summary: str, first_turn: int) -> None:
+        """Store the running summary of a session, which covers the turns before first_turn."""
+    
+    @abstractmethod
+    def load_summary(self, session_id: str) -> Tuple[str, int]:
+        """Load the (summary, first turn it does not cover) of a session; ('', 0) if there is none."""
+    
+    @abstractmethod
+    def clear(self, session_id: str) -> None:
+        """Delete a session's history and summary."""
+    
+    def flush(self) -> None:
+        """Write out buffered changes."""
+    
+    def close(self) -> None:
+        """Write out buffered changes and release resources."""
+        self.flush()
+
+
+class SQLiteHistoryBackend(HistoryBackend):
+    """History backend storing messages in a local SQLite database.
+    
+    Appended entries are buffered and written in one transaction once
+    batch_size entries are pending, or when flush() or close() is called;
+    reads flush first, so they always see every appended entry. Messages
+    are indexed by session and turn, so loading a window of turns reads
+    only those rows. Turn numbers are reserved from a per-session counter
+    in a write transaction, so concurrent writers never share one.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS messages (
+            id INTEGER PRIMARY KEY,
+            session_id TEXT NOT NULL,
+            turn INTEGER NOT NULL,
+            message TEXT NOT NULL,
+            tokens INTEGER NOT NULL
+        );
+        CREATE UNIQUE INDEX IF NOT EXISTS messages_session_turn ON messages (session_id, turn, id);
+        CREATE TABLE IF NOT EXISTS turns (
+            session_id TEXT PRIMARY KEY,
+            next_turn INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS summaries (
+            session_id TEXT PRIMARY KEY,
+            summary TEXT NOT NULL,
+            first_turn INTEGER NOT NULL
+        );
+    """
+    
+    def __init__(self, path: str = ':memory:', batch_size: int = 32):
+        self.path = path
+        self.batch_size = batch_size
+        self._pending: List[Tuple[str, int, str, int]] = []
+        self._connection = sqlite3.connect(path)
+        if path != ':memory:':
+            # Readers do not block the writer
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.executescript(self.SCHEMA)
+    
+    def append(self, session_id: str, entries: Sequence) -> None:
+        self._pending.extend(
+            (session_id, turn, json.dumps(message_to_dict(message)), tokens) for turn, message, tokens in entries
+        )
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+    
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        with self._connection:
+            self._connection.executemany(
+                'INSERT INTO messages (session_id, turn, message, tokens) VALUES (?, ?, ?, ?)', self._pending
+            )
+        self._pending.clear()
+    
+    def load_turns(self, session_id: str, start: int, stop: Optional[int] = None) -> List[HistoryEntry]:
+        self.flush()
+        query = 'SELECT turn, message, tokens FROM messages WHERE session_id = ? AND turn >= ?'
+        parameters: list = [session_id, start]
+        if stop is not None:
+            query += ' AND turn < ?'
+            parameters.append(stop)
+        rows = self._connection.execute(query + ' ORDER BY turn, id', parameters).fetchall()
+        messages = messages_from_dict([json.loads(message) for _, message, _ in rows])
+        return [(turn, message, tokens) for (turn, _, tokens), message in zip(rows, messages)]
+    
+    def last_turn(self, session_id: str) -> int:
+        self.flush()
+        row = self._connection.execute('SELECT MAX(turn) FROM messages WHERE session_id = ?', (session_id,)).fetchone()
+        return -1 if row[0] is None else row[0]
+    
+    def next_turn(self, session_id: str) -> int:
+        turn = self._reserve_turn(session_id)
+        if turn is None:
+            # First turn reserved for the session in this database: continue after its stored turns
+            self.flush()
+            with self._connection:
+                self._connection.execute(
+                    'INSERT OR IGNORE INTO turns (session_id, next_turn)'
+                    ' SELECT ?, COALESCE(MAX(turn), -1) + 1 FROM messages WHERE session_id = ?',
+                    (session_id, session_id)
+                )
+            turn = self._reserve_turn(session_id)
+        return turn
+    
+    def _reserve_turn(self, session_id: str) -> Optional[int]:
+        """Take the next turn number of a session in one write transaction; None if it has no counter."""
+        with self._connection:
+            rows = self._connection.execute(
+                'UPDATE turns SET next_turn = next_turn + 1 WHERE session_id = ? RETURNING next_turn - 1',
+                (session_id,)
+            ).fetchall()
+        return rows[0][0] if rows else None
+    
+    def save_summary(self, session_id: str, summary: str, first_turn: int) -> None:
+        with self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO summaries (session_id, summary, first_turn) VALUES (?, ?, ?)',
+                (session_id, summary, first_turn)
+            )
+    
+    def load_summary(self, session_id: str) -> Tuple[str, int]:
+        row = self._connection.execute(
+            'SELECT summary, first_turn FROM summaries WHERE session_id = ?', (session_id,)
+        ).fetchone()
+        return (row[0], row[1]) if row else ('', 0)
+    
+    def clear(self, session_id: str) -> None:
+        self._pending = [entry for entry in self._pending if entry[0] != session_id]
+        with self._connection:
+            self._connection.execute('DELETE FROM messages WHERE session_id = ?', (session_id,))
+            self._connection.execute('DELETE FROM turns WHERE session_id = ?', (session_id,))
+            self._connection.execute('DELETE FROM summaries WHERE session_id = ?', (session_id,))
+    
+    def close(self) -> None:
+        self.flush()
+        self._connection.close()
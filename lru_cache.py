@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Bounded least-recently-used cache.
+
+Shared by the MondrUI renderer (plan, verdict and HTML caches) and the AI
+agent's response cache, so neither has to import the other.
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+
+class LRUCache:
+    """Bounded least-recently-used cache with hit/miss counters.
+    
+    Besides the number of entries, the total size of the entries can be
+    bounded with maxbytes; sizes are given to put() or computed by sizeof.
+    An entry larger than maxbytes on its own is not stored.
+    """
+    
+    def __init__(self, maxsize: int = 256, maxbytes: Optional[int] = None,
+                 sizeof: Optional[Callable[[Any], int]] = None):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.nbytes = 0
+        self._entries: 'OrderedDict[Any, Any]' = OrderedDict()
+        self._sizes: Dict[Any, int] = {}
+    
+    def get(self, key: Any, default: Any = None) -> Any:
+        """Return the cached value for key, marking it as recently used."""
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+    
+    def put(self, key: Any, value: Any, size: Optional[int] = None) -> None:
+        """Store a value, evicting the least recently used entries if full."""
+        if size is None and self.sizeof is not None:
+            size = self.sizeof(value)
+        self._discard(key)
+        if self.maxbytes is not None and (size or 0) > self.maxbytes:
+            return
+        self._entries[key] = value
+        if size:
+            self._sizes[key] = size
+            self.nbytes += size
+        while len(self._entries) > self.maxsize or (self.maxbytes is not None and self.nbytes > self.maxbytes):
+            self._discard(next(iter(self._entries)))
+            self.evictions += 1
+    
+    def _discard(self, key: Any) -> None:
+        if key in self._entries:
+            del self._entries[key]
+            self.nbytes -= self._sizes.pop(key, 0)
+    
+    def clear(self) -> None:
+        """Drop all entries (counters are kept)."""
+        self._entries.clear()
+        self._sizes.clear()
+        self.nbytes = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, key: Any) -> bool:
+        return key in self._entries
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'bytes': self.nbytes,
+            'maxbytes': self.maxbytes,
+            'evictions': self.evictions,
+            'hit_rate': (self.hits / lookups) if lookups else 0.0
+        }
@@ -1,55 +1,60 @@
 #!/usr/bin/env python3
 from ai import AIAgent
+from conversation_store import SQLiteHistoryBackend
+from response_cache import ResponseCache
 from log_callback_handler import NiceGuiLogElementCallbackHandler
 from dotenv import load_dotenv
-from nicegui import ui
-from mondrui import render_ui, register_action_handler
+from nicegui import app, ui
+from mondrui import render_ui, render_static, register_action_handler, bind_value_readout, FormState
+from mondrui_stream import SpecExtractor, StreamedFormParts, extract_mondrui_specs
+from streaming_message import StreamingMessage
+from langchain_core.messages import HumanMessage
+from pathlib import Path
 import os
 import json
-import re
+import secrets
+import time
 
 load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 
+# Conversations of all sessions, kept across page reloads and restarts
+history_backend = SQLiteHistoryBackend(os.getenv("MONDRUI_HISTORY_DB", "mondrui_history.sqlite3"))
+app.on_shutdown(history_backend.close)
 
-def extract_mondrui_json(text: str) -> tuple[str, dict | None]:
-    """
-    Extract MondrUI JSON from AI response text.
-    Returns (cleaned_text, json_spec) where json_spec is None if no valid JSON found.
-    """
-    # Look for JSON code blocks that contain MondrUI specifications
-    json_pattern = r'```json\s*(\{[^`]*"type":\s*"ui\.render"[^`]*\})\s*```'
-    match = re.search(json_pattern, text, re.DOTALL)
-    
-    if not match:
-        return text, None
-    
-    try:
-        json_str = match.group(1)
-        json_spec = json.loads(json_str)
-        
-        # Validate it's a proper MondrUI spec
-        if json_spec.get("type") == "ui.render" and "component" in json_spec:
-            # Remove the JSON block from the text
-            cleaned_text = re.sub(json_pattern, "", text, flags=re.DOTALL).strip()
-            return cleaned_text, json_spec
-    except json.JSONDecodeError:
-        pass
+# Answers to identical prompts, shared by all sessions; off unless MONDRUI_RESPONSE_CACHE is set
+response_cache = None
+if os.getenv("MONDRUI_RESPONSE_CACHE"):
+    response_cache = ResponseCache(path=os.getenv("MONDRUI_RESPONSE_CACHE"))
+    app.on_shutdown(response_cache.close)
+
+# Release the in-memory history of a page after this many seconds without a message
+IDLE_UNLOAD_SECONDS = 600
+
+
+def storage_secret() -> str:
+    """The secret signing the browser id cookie, which identifies stored conversations.
     
-    return text, None
+    Taken from STORAGE_SECRET, else generated once and kept in a file readable only by its owner.
+    """
+    secret = os.getenv("STORAGE_SECRET")
+    if secret:
+        return secret
+    path = Path(os.getenv("MONDRUI_SECRET_FILE", ".mondrui_storage_secret"))
+    if not path.exists():
+        path.touch(mode=0o600)
+        path.write_text(secrets.token_urlsafe(32))
+    return path.read_text().strip()
 
 
 def setup_form_handlers(ai_agent: AIAgent, message_container, log_element):
     """Set up form action handlers for MondrUI forms."""
     
-    # Store form data globally so handlers can access it
-    form_data_store = {}
-    
-    async def handle_form_submission(action_name: str, form_title: str = "Form"):
+    async def handle_form_submission(values: dict, action_name: str, form_title: str = "Form"):
         """Handle form submission and send data back to AI."""
         
-        # Get collected form data
-        collected_data = form_data_store.get('current_form', {})
+        # Form values are pulled from the browser by the form on submit
+        collected_data = dict(values)
         collected_data['action'] = action_name
         collected_data['timestamp'] = '2025-01-01T00:00:00Z'  # In real app, use datetime.now()
         
@@ -64,52 +69,44 @@ def setup_form_handlers(ai_agent: AIAgent, message_container, log_element):
             # Get AI response about the submitted data
             response_message = ui.chat_message(name='Bot', sent=False)
             spinner = ui.spinner(type='dots')
-
+        with response_message:
+            stream = StreamingMessage()
+        
         # Send form data to AI for processing
         form_message = f"User submitted form data: {json.dumps(collected_data, indent=2)}. Please acknowledge receipt and process this information."
         
-        response = ''
         async for chunk in ai_agent.send_message(form_message):
-            response += chunk
-            response_message.clear()
-            with response_message:
-                ui.html(response)
-            ui.run_javascript('window.scrollTo(0, document.body.scrollHeight)')
+            stream.append(chunk)
+        stream.finish()
         message_container.remove(spinner)
-        
-        # Clear form data after submission
-        form_data_store['current_form'] = {}
     
     def create_form_handler(action_name: str, form_title: str = "Form"):
-        async def handler():
-            await handle_form_submission(action_name, form_title)
+        async def handler(values: dict):
+            await handle_form_submission(values, action_name, form_title)
         return handler
     
-    def create_data_collector(field_id):
-        """Create a data collector function for a specific field"""
-        def collector(value):
-            print(f"Data collector called: field_id={field_id}, value={value}")
-            if 'current_form' not in form_data_store:
-                form_data_store['current_form'] = {}
-            form_data_store['current_form'][field_id] = value
-            print(f"Form data store updated: {form_data_store['current_form']}")
-        return collector
-    
     # Register common form actions
     register_action_handler("submit_bug", create_form_handler("submit_bug", "Bug Report"))
     register_action_handler("submit_help", create_form_handler("submit_help", "Help Request"))
     register_action_handler("submit_feedback", create_form_handler("submit_feedback", "Feedback"))
     register_action_handler("submit_form", create_form_handler("submit_form", "Form"))
-    
-    # Return both the data collector factory and form data store for use in form rendering
-    return create_data_collector, form_data_store
 
 
 @ui.page('/')
 def main():
-    ai_agent = AIAgent(model='gpt-4o-mini')
-
-    def render_any_form_with_data_collection(props: dict, data_collector_factory):
+    # Older turns are folded into a running summary once the history exceeds 8000 tokens.
+    # The conversation is stored per browser, so it survives a reload; while the
+    # page is idle, the agent releases its in-memory history.
+    ai_agent = AIAgent(model='gpt-4o-mini', summary_threshold=8000,
+                       history_backend=history_backend, session_id=app.storage.browser['id'],
+                       response_cache=response_cache)
+    
+    def unload_if_idle() -> None:
+        if time.monotonic() - ai_agent.last_active > IDLE_UNLOAD_SECONDS:
+            ai_agent.unload()
+    ui.timer(60, unload_if_idle)
+    
+    def render_any_form_with_data_collection(props: dict, form_state: FormState):
         """Render any form with data collection, works for all form types."""
         title = props.get('title', 'Form')
         fields = props.get('fields', [])
@@ -119,274 +116,311 @@ def main():
         # Create input fields with data collection
         with ui.column().classes('gap-4 w-full'):
             for field in fields:
-                field_id = field.get('id', '')
-                field_label = field.get('label', '')
-                field_type = field.get('type', 'text')
-                required = field.get('required', False)
-                
-                label_text = field_label + (' *' if required else '')
-                ui.label(label_text).classes('font-medium')
-                
-                collector = data_collector_factory(field_id)
+                render_form_field_with_data_collection(field, form_state)
+    
+    def render_form_field_with_data_collection(field: dict, form_state: FormState):
+        """Render a single form field (label and input) with data collection.
+        
+        The field's value stays in the browser until the form state pulls it
+        on submit, so editing costs no server work.
+        """
+        field_id = field.get('id', '')
+        field_label = field.get('label', '')
+        field_type = field.get('type', 'text')
+        required = field.get('required', False)
+        
+        label_text = field_label + (' *' if required else '')
+        ui.label(label_text).classes('font-medium')
+        
+        if field_type == 'textarea':
+            element = ui.textarea(placeholder=f'Enter {field_label.lower()}...').classes('w-full')
+            form_state.add_field(field_id, element)
+        elif field_type == 'select':
+            options = field.get('options', [])
+            element = ui.select(options=options).classes('w-full')
+            form_state.add_field(field_id, element)
+        elif field_type == 'number':
+            element = ui.number(placeholder=f'Enter {field_label.lower()}...').classes('w-full')
+            form_state.add_field(field_id, element)
+        elif field_type == 'email':
+            element = ui.input(placeholder=f'Enter {field_label.lower()}...').classes('w-full').props('type=email')
+            form_state.add_field(field_id, element)
+        elif field_type == 'radio':
+            # Radio button group for exclusive selection
+            options = field.get('options', {})
+            value = field.get('value')
+            inline = field.get('inline', False)
+            
+            radio = ui.radio(options, value=value)
+            if inline:
+                radio.props('inline')
+            
+            form_state.add_field(field_id, radio)
+            
+        elif field_type == 'checkboxGroup':
+            # Checkbox group for multiple selections
+            options = field.get('options', {})
+            selected_values = field.get('value', [])
+            layout = field.get('layout', 'vertical')
+            
+            if layout == 'horizontal':
+                container = ui.row()
+            else:
+                container = ui.column()
+            
+            current_selections = set(selected_values) if selected_values else set()
+            checkboxes = []
+            
+            with container:
+                for option_value, option_label in options.items():
+                    checkbox = ui.checkbox(
+                        text=option_label,
+                        value=option_value in current_selections
+                    )
+                    checkboxes.append((option_value, checkbox))
+            
+            form_state.add_field(field_id, [checkbox for _, checkbox in checkboxes],
+                                 read=lambda: [value for value, checkbox in checkboxes if checkbox.value])
+        
+        elif field_type == 'slider':
+            # Range slider for value selection
+            min_val = field.get('min', 0)
+            max_val = field.get('max', 100)
+            step = field.get('step', 1)
+            value = field.get('value', min_val)
+            min_label = field.get('minLabel')
+            max_label = field.get('maxLabel')
+            show_value = field.get('showValue', True)
+            label_always = field.get('labelAlways', False)
+            
+            with ui.column().classes('w-full'):
+                # Scale labels if provided
+                if min_label and max_label:
+                    with ui.row().classes('w-full justify-between text-sm text-gray-600'):
+                        ui.label(min_label)
+                        ui.label(max_label)
                 
-                if field_type == 'textarea':
-                    ui.textarea(
-                        placeholder=f'Enter {field_label.lower()}...',
-                        on_change=lambda e, collector=collector: collector(e.value)
-                    ).classes('w-full')
-                elif field_type == 'select':
-                    options = field.get('options', [])
-                    ui.select(
-                        options=options,
-                        on_change=lambda e, collector=collector: collector(e.value)
-                    ).classes('w-full')
-                elif field_type == 'number':
-                    ui.number(
-                        placeholder=f'Enter {field_label.lower()}...',
-                        on_change=lambda e, collector=collector: collector(e.value)
-                    ).classes('w-full')
-                elif field_type == 'email':
-                    ui.input(
-                        placeholder=f'Enter {field_label.lower()}...',
-                        on_change=lambda e, collector=collector: collector(e.value)
-                    ).classes('w-full').props('type=email')
-                elif field_type == 'radio':
-                    # Radio button group for exclusive selection
-                    options = field.get('options', {})
-                    value = field.get('value')
-                    inline = field.get('inline', False)
-                    
-                    radio = ui.radio(options, value=value)
-                    if inline:
-                        radio.props('inline')
-                    
-                    def create_radio_handler(collector):
-                        def on_radio_change():
-                            current_value = radio.value
-                            log.push(f"Radio changed: {current_value}")
-                            collector(current_value)
-                        return on_radio_change
-                    
-                    radio.on('update:model-value', create_radio_handler(collector))
-                    
-                elif field_type == 'checkboxGroup':
-                    # Checkbox group for multiple selections
-                    options = field.get('options', {})
-                    selected_values = field.get('value', [])
-                    layout = field.get('layout', 'vertical')
-                    
-                    if layout == 'horizontal':
-                        container = ui.row()
-                    else:
-                        container = ui.column()
-                    
-                    current_selections = set(selected_values) if selected_values else set()
-                    
-                    with container:
-                        for option_value, option_label in options.items():
-                            checkbox = ui.checkbox(
-                                text=option_label,
-                                value=option_value in current_selections
-                            )
-                            
-                            def create_checkbox_handler(val, collector):
-                                def on_checkbox_change():
-                                    current_value = checkbox.value
-                                    if current_value:
-                                        current_selections.add(val)
-                                    else:
-                                        current_selections.discard(val)
-                                    log.push(f"Checkbox changed: {list(current_selections)}")
-                                    collector(list(current_selections))
-                                return on_checkbox_change
-                            
-                            checkbox.on('update:model-value', create_checkbox_handler(option_value, collector))
+                # The slider itself; its value reaches the server on submit
+                slider = ui.slider(min=min_val, max=max_val, step=step, value=value)
+                form_state.add_field(field_id, slider)
                 
-                elif field_type == 'slider':
-                    # Range slider for value selection
-                    min_val = field.get('min', 0)
-                    max_val = field.get('max', 100)
-                    step = field.get('step', 1)
-                    value = field.get('value', min_val)
-                    min_label = field.get('minLabel')
-                    max_label = field.get('maxLabel')
-                    show_value = field.get('showValue', True)
-                    label_always = field.get('labelAlways', False)
-                    
-                    with ui.column().classes('w-full'):
-                        # Scale labels if provided
-                        if min_label and max_label:
-                            with ui.row().classes('w-full justify-between text-sm text-gray-600'):
-                                ui.label(min_label)
-                                ui.label(max_label)
-                        
-                        # The slider itself
-                        slider = ui.slider(min=min_val, max=max_val, step=step, value=value)
-                        
-                        if label_always:
-                            slider.props('label-always')
-                        
-                        # Value display
-                        if show_value:
-                            value_label = ui.label(f'Value: {value}').classes('text-center text-sm')
-                        
-                        # Set up event handling using direct callback binding
-                        def handle_slider_change():
-                            current_value = slider.value
-                            log.push(f"Slider changed: {current_value}")
-                            collector(current_value)
-                            if show_value:
-                                value_label.text = f'Value: {current_value}'
-                        
-                        slider.on('update:model-value', handle_slider_change)
+                if label_always:
+                    slider.props('label-always')
                 
-                else:  # text input (default)
-                    ui.input(
-                        placeholder=f'Enter {field_label.lower()}...',
-                        on_change=lambda e, collector=collector: collector(e.value)
-                    ).classes('w-full')
-
+                # Value display, updated in the browser while dragging
+                if show_value:
+                    value_label = ui.label(f'Value: {value}').classes('text-center text-sm')
+                    bind_value_readout(slider, value_label)
+        
+        else:  # text input (default)
+            element = ui.input(placeholder=f'Enter {field_label.lower()}...').classes('w-full')
+            form_state.add_field(field_id, element)
+    
     # Note: The render_custom_bug_form function has been replaced by render_any_form_with_data_collection
-
+    
+    def open_form_dialog() -> dict:
+        """Create an empty form dialog and return its parts."""
+        with ui.dialog() as form_dialog:
+            with ui.card().classes('w-full max-w-2xl') as form_card:
+                ui.label('📋 Interactive Form').classes('text-lg font-bold mb-4')
+        # Closed form dialogs are not reopened; delete them with their fields and handlers
+        form_dialog.on_value_change(lambda e: None if e.value else form_dialog.delete())
+        return {'dialog': form_dialog, 'card': form_card, 'state': FormState()}
+    
+    def render_streamed_form_part(streamed_form: dict | None, path: tuple, value) -> dict | None:
+        """Render a completed part of a streaming MondrUI spec into its form dialog, opening it first."""
+        if streamed_form is None:
+            log.push("MondrUI JSON streaming in - building form progressively")
+            streamed_form = open_form_dialog()
+            with streamed_form['card']:
+                streamed_form['title'] = ui.label('Form').classes('text-lg font-bold mb-4')
+                streamed_form['fields'] = ui.column().classes('gap-4 w-full')
+            streamed_form['dialog'].open()
+        
+        try:
+            if path == ('props', 'title'):
+                streamed_form['title'].text = str(value)
+            elif len(path) == 3 and path[:2] == ('props', 'fields') and isinstance(value, dict):
+                with streamed_form['fields']:
+                    render_form_field_with_data_collection(value, streamed_form['state'])
+        except Exception as e:
+            log.push(f"FORM RENDERING ERROR while streaming {path}: {e}")
+            streamed_form['failed'] = True
+        return streamed_form
+    
     async def send() -> None:
         question = text.value
         text.value = ''
-
+        
         with message_container:
             ui.chat_message(text=question, name='You', sent=True)
             response_message = ui.chat_message(name='Bot', sent=False)
             spinner = ui.spinner(type='dots')
-
-        response = ''
+        with response_message:
+            stream = StreamingMessage()
+        
+        # Build the form while the spec is still streaming in, and pick out
+        # complete spec blocks as they close, in one pass over each chunk
+        streamed_form = None
+        form_parts = StreamedFormParts()
+        
+        def stream_form_part(path: tuple, value) -> None:
+            nonlocal streamed_form
+            if extractor.specs:  # Only the first spec is built while streaming
+                return
+            for part_path, part_value in form_parts.feed(path, value):
+                streamed_form = render_streamed_form_part(streamed_form, part_path, part_value)
+        
+        extractor = SpecExtractor(on_value=stream_form_part)
         async for chunk in ai_agent.send_message(question, NiceGuiLogElementCallbackHandler(log)):
-            response += chunk
-            response_message.clear()
-            with response_message:
-                ui.html(response)
-            ui.run_javascript('window.scrollTo(0, document.body.scrollHeight)')
+            extractor.feed(chunk)
+            stream.append(extractor.new_prose())
         message_container.remove(spinner)
         
         # Check if response contains MondrUI JSON and render form if found
-        cleaned_response, mondrui_spec = extract_mondrui_json(response)
+        cleaned_response, specs = extractor.finish()
+        mondrui_spec = specs[0] if specs else None
         
         if mondrui_spec:
             log.push(f"MondrUI JSON detected: {mondrui_spec}")
             
             # Update the response message with cleaned text
-            response_message.clear()
-            with response_message:
-                if cleaned_response.strip():
-                    ui.html(cleaned_response)
-                else:
-                    ui.html("I've prepared a form for you:")
+            stream.finish(cleaned_response.strip() or "I've prepared a form for you:")
+            
+            # Render the MondrUI form in a dialog, unless it was built in full while streaming
+            built_while_streaming = (streamed_form is not None and not streamed_form.get('failed')
+                                     and form_parts.complete(mondrui_spec))
+            if streamed_form is None:
+                streamed_form = open_form_dialog()
+            elif not built_while_streaming:
+                log.push("Streamed form is incomplete - rendering it from the full spec")
+                streamed_form['title'].delete()
+                streamed_form['fields'].delete()
+                streamed_form['state'] = FormState()
+            form_dialog = streamed_form['dialog']
+            form_state = streamed_form['state']
             
-            # Render the MondrUI form in a dialog
-            with ui.dialog() as form_dialog:
-                with ui.card().classes('w-full max-w-2xl'):
-                    ui.label('📋 Interactive Form').classes('text-lg font-bold mb-4')
+            with streamed_form['card']:
+                try:
+                    # Log form rendering attempt
+                    log.push(f"Attempting to render MondrUI form: {mondrui_spec}")
                     
-                    try:
-                        # Log form rendering attempt
-                        log.push(f"Attempting to render MondrUI form: {mondrui_spec}")
-                        
-                        # Use unified form renderer with data collection for ALL form types
-                        # This ensures consistent behavior and data collection
+                    # Use unified form renderer with data collection for ALL form types
+                    # This ensures consistent behavior and data collection
+                    if not built_while_streaming:
                         form_props = mondrui_spec.get('props', {})
-                        render_any_form_with_data_collection(form_props, data_collector_factory)
-                        
-                        log.push("Form rendered successfully")
+                        render_any_form_with_data_collection(form_props, form_state)
+                    
+                    log.push("Form rendered successfully")
+                    
+                    # Unified submit & close button that sends all data to AI
+                    async def handle_submit_and_close():
+                        # Pull the field values from the browser in one request
+                        values = await form_state.pull()
+                        collected_data = {
+                            field_id: value for field_id, value in values.items() if value not in (None, '', [])
+                        }
+                        log.push(f"Form submission: collected_data = {collected_data}")
                         
-                        # Unified submit & close button that sends all data to AI
-                        async def handle_submit_and_close():
-                            # Get collected form data
-                            collected_data = form_data_store.get('current_form', {})
-                            log.push(f"Form submission: collected_data = {collected_data}")
+                        # Only send data if there's actually some data collected
+                        if collected_data:
+                            # Determine form type from the MondrUI spec
+                            form_title = mondrui_spec.get('props', {}).get('title', 'Form')
+                            action_name = 'submit_form'  # Default action
+                            if mondrui_spec.get('component') == 'bugReportForm':
+                                action_name = 'submit_bug'
                             
-                            # Only send data if there's actually some data collected
-                            if collected_data:
-                                # Determine form type from the MondrUI spec
-                                form_title = mondrui_spec.get('props', {}).get('title', 'Form')
-                                action_name = 'submit_form'  # Default action
-                                if mondrui_spec.get('component') == 'bugReportForm':
-                                    action_name = 'submit_bug'
-                                
-                                collected_data['action'] = action_name
-                                collected_data['timestamp'] = '2025-01-01T00:00:00Z'  # In real app, use datetime.now()
-                                
-                                # Close the dialog first
-                                form_dialog.close()
-                                
-                                # Add form submission message to chat
-                                with message_container:
-                                    ui.chat_message(
-                                        text=f"✅ {form_title} submitted with data: {json.dumps(collected_data, indent=2)}", 
-                                        name='System', 
-                                        sent=False
-                                    ).classes('bg-green-50')
-                                    
-                                    # Get AI response about the submitted data
-                                    response_message = ui.chat_message(name='Bot', sent=False)
-                                    spinner = ui.spinner(type='dots')
-
-                                # Send form data to AI for processing
-                                form_message = f"User submitted form data: {json.dumps(collected_data, indent=2)}. Please acknowledge receipt and process this information."
-                                
-                                response = ''
-                                async for chunk in ai_agent.send_message(form_message, NiceGuiLogElementCallbackHandler(log)):
-                                    response += chunk
-                                    response_message.clear()
-                                    with response_message:
-                                        ui.html(response)
-                                    ui.run_javascript('window.scrollTo(0, document.body.scrollHeight)')
-                                message_container.remove(spinner)
+                            collected_data['action'] = action_name
+                            collected_data['timestamp'] = '2025-01-01T00:00:00Z'  # In real app, use datetime.now()
+                            
+                            # Close the dialog first
+                            form_dialog.close()
+                            
+                            # Add form submission message to chat
+                            with message_container:
+                                ui.chat_message(
+                                    text=f"✅ {form_title} submitted with data: {json.dumps(collected_data, indent=2)}", 
+                                    name='System', 
+                                    sent=False
+                                ).classes('bg-green-50')
                                 
-                                # Clear form data after submission
-                                form_data_store['current_form'] = {}
-                            else:
-                                # No data collected, just close
-                                form_dialog.close()
-                                with message_container:
-                                    ui.chat_message(
-                                        text="Form was closed without submitting any data.", 
-                                        name='System', 
-                                        sent=False
-                                    ).classes('bg-gray-50')
-                        
-                        ui.button('Submit & Close', on_click=handle_submit_and_close).classes('mt-4 bg-blue-500 text-white')
-                        
-                    except Exception as e:
-                        error_msg = f'Error rendering form: {str(e)}'
-                        log.push(f"FORM RENDERING ERROR: {error_msg}")
-                        log.push(f"MondrUI spec: {mondrui_spec}")
-                        log.push(f"Exception type: {type(e).__name__}")
-                        import traceback
-                        log.push(f"Traceback: {traceback.format_exc()}")
-                        
-                        ui.label(error_msg).classes('text-red-500')
-                        ui.button('Close', on_click=form_dialog.close)
-            
+                                # Get AI response about the submitted data
+                                response_message = ui.chat_message(name='Bot', sent=False)
+                                spinner = ui.spinner(type='dots')
+                            with response_message:
+                                stream = StreamingMessage()
+                            
+                            # Send form data to AI for processing
+                            form_message = f"User submitted form data: {json.dumps(collected_data, indent=2)}. Please acknowledge receipt and process this information."
+                            
+                            async for chunk in ai_agent.send_message(form_message, NiceGuiLogElementCallbackHandler(log)):
+                                stream.append(chunk)
+                            stream.finish()
+                            message_container.remove(spinner)
+                        else:
+                            # No data collected, just close
+                            form_dialog.close()
+                            with message_container:
+                                ui.chat_message(
+                                    text="Form was closed without submitting any data.", 
+                                    name='System', 
+                                    sent=False
+                                ).classes('bg-gray-50')
+                    
+                    ui.button('Submit & Close', on_click=handle_submit_and_close).classes('mt-4 bg-blue-500 text-white')
+                    
+                except Exception as e:
+                    error_msg = f'Error rendering form: {str(e)}'
+                    log.push(f"FORM RENDERING ERROR: {error_msg}")
+                    log.push(f"MondrUI spec: {mondrui_spec}")
+                    log.push(f"Exception type: {type(e).__name__}")
+                    import traceback
+                    log.push(f"Traceback: {traceback.format_exc()}")
+                    
+                    ui.label(error_msg).classes('text-red-500')
+                    ui.button('Close', on_click=form_dialog.close)
+        
             # Open the form dialog
             form_dialog.open()
-
+        else:
+            # Show the whole response, including any code block that was not a MondrUI spec
+            stream.finish(cleaned_response)
+            if streamed_form is not None:
+                streamed_form['dialog'].delete()
+    
     async def new_chat() -> None:
         """Start a new conversation by clearing memory."""
         ai_agent.clear_memory()
         message_container.clear()
         with message_container:
             ui.markdown("*Conversation cleared. Starting fresh!*").classes('text-gray-500 italic')
-
+    
     ui.add_css(r'a:link, a:visited {color: inherit !important; text-decoration: none; font-weight: 500}')
-
+    
     # the queries below are used to expand the contend down to the footer (content can then use flex-grow to expand)
     ui.query('.q-page').classes('flex')
     ui.query('.nicegui-content').classes('w-full')
-
+    
     with ui.tabs().classes('w-full') as tabs:
         chat_tab = ui.tab('Chat')
         logs_tab = ui.tab('Logs')
         memory_tab = ui.tab('Memory')
     with ui.tab_panels(tabs, value=chat_tab).classes('w-full max-w-2xl mx-auto flex-grow items-stretch'):
         message_container = ui.tab_panel(chat_tab).classes('items-stretch')
+        # Show the restored conversation; its forms are shown read-only, as static HTML
+        with message_container:
+            for message in ai_agent.get_conversation_history():
+                if isinstance(message, HumanMessage):
+                    ui.chat_message(text=str(message.content), name='You', sent=True)
+                else:
+                    prose, specs = extract_mondrui_specs(str(message.content))
+                    with ui.chat_message(name='Bot', sent=False):
+                        ui.html(prose)
+                        for spec in specs:
+                            try:
+                                render_static(spec)
+                            except ValueError as e:
+                                ui.label(f'Form could not be shown: {e}').classes('text-gray-500 italic')
         with ui.tab_panel(logs_tab):
             log = ui.log().classes('w-full h-full')
         with ui.tab_panel(memory_tab).classes('p-4'):
@@ -408,6 +442,22 @@ def main():
                             ui.label(f'Conversation turns: {stats["conversation_turns"]}').classes('text-sm')
                             ui.label(f'Total messages: {stats["total_messages"]} / {stats["max_messages"]}').classes('text-sm')
                             ui.label(f'Memory usage: {stats["memory_usage_percent"]:.1f}%').classes('text-sm')
+                            if stats['token_budget']:
+                                ui.label(f'Prompt tokens: {stats["prompt_tokens"]} / {stats["token_budget"]} '
+                                         f'({stats["token_usage_percent"]:.1f}%)').classes('text-sm')
+                        
+                            if stats['stored_turns'] is not None:
+                                ui.label(f'Stored turns: {stats["stored_turns"]}').classes('text-sm')
+                            
+                            cache_stats = ai_agent.get_response_cache_stats()
+                            if cache_stats:
+                                ui.label(f'Cached answers: {cache_stats["hits"]} hits / {cache_stats["misses"]} misses '
+                                         f'({cache_stats["hit_rate"]:.0%})').classes('text-sm')
+                        
+                        if ai_agent.summary:
+                            with ui.card().classes('mb-4 p-3 bg-gray-50'):
+                                ui.label(f'Summary of earlier turns ({stats["compactions"]} compactions)').classes('font-bold text-sm mb-2')
+                                ui.markdown(ai_agent.summary).classes('text-sm')
                         
                         # Display conversation history
                         ui.label('Conversation History:').classes('font-bold text-sm mb-2')
@@ -422,13 +472,13 @@ def main():
             
             ui.button('Refresh Memory View', on_click=update_memory_display).classes('mb-4')
             ui.button('Clear Conversation', on_click=new_chat).classes('mb-4 bg-red-500')
-
+    
     # Set up form handlers for MondrUI forms (after log element is created)
-    data_collector_factory, form_data_store = setup_form_handlers(ai_agent, message_container, log)
+    setup_form_handlers(ai_agent, message_container, log)
     
     # Add a startup log message to verify logging is working
     log.push("MondrUI application started - logging is active")
-
+    
     with ui.footer().classes('bg-white'), ui.column().classes('w-full max-w-3xl mx-auto my-6'):
         with ui.row().classes('w-full no-wrap items-center'):
             ui.button('New Chat', on_click=new_chat).classes('mr-2').props('flat color=primary')
@@ -440,4 +490,4 @@ def main():
             .classes('text-xs self-end mr-8 m-[-1em] text-primary')
 
 
-ui.run(title='MondrUI Demo - Conversational AI with Memory')
\ No newline at end of file
+ui.run(title='MondrUI Demo - Conversational AI with Memory', storage_secret=storage_secret())
\ No newline at end of file
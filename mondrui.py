@@ -7,11 +7,27 @@ dynamically generate NiceGUI component trees from JSON specifications.
 """
 
 from nicegui import ui
-from typing import Dict, Any, List, Optional, Callable, Type, Union
+from nicegui.events import GenericEventArguments
+from nicegui.helpers import expects_arguments
+from typing import Dict, Any, List, Optional, Callable, Type, Union, Tuple, Mapping, Iterator
 import json
+import hashlib
+import inspect
+import logging
+import re
+import time
+import weakref
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from enum import Enum
+from types import MappingProxyType
+
+from lru_cache import LRUCache
+from mondrui_html import element_to_html
+from mondrui_memory import MemoryUI
+
+logger = logging.getLogger(__name__)
 
 
 class LayoutType(Enum):
@@ -33,9 +49,21 @@ class EventType(Enum):
     SLIDE = "slide"  # For slider components
 
 
-@dataclass
+class SyncPolicy(Enum):
+    """When the value of a form field is sent to the server."""
+    LAZY = "lazy"  # Only when the form is submitted
+    BLUR = "blur"  # When the field loses focus
+    DEBOUNCE = "debounce"  # After a pause in editing
+
+
+@dataclass(frozen=True, slots=True, weakref_slot=True)
 class ComponentStyle:
-    """Standardized styling properties."""
+    """Standardized styling properties.
+    
+    Instances are immutable and shared: use ComponentStyle.intern() to get
+    the canonical instance for a set of values. The joined class string and
+    the inline style mapping are computed once, on creation.
+    """
     classes: List[str] = field(default_factory=list)
     width: Optional[str] = None
     height: Optional[str] = None
@@ -44,57 +72,311 @@ class ComponentStyle:
     background: Optional[str] = None
     color: Optional[str] = None
     border: Optional[str] = None
+    class_string: str = field(init=False, repr=False, compare=False)
+    style_map: Mapping[str, str] = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        object.__setattr__(self, 'class_string', ' '.join(self.classes))
+        object.__setattr__(self, 'style_map', MappingProxyType({
+            key: getattr(self, key) for key in _STYLE_PROPERTIES if getattr(self, key)
+        }))
+    
+    @classmethod
+    def intern(cls, classes: Optional[List[str]] = None, **properties: Optional[str]) -> 'ComponentStyle':
+        """Get the shared instance for the given classes and style properties."""
+        if isinstance(classes, str):
+            classes = classes.split()
+        classes = list(classes or [])
+        key = (tuple(classes),) + tuple(properties.get(name) for name in _STYLE_PROPERTIES)
+        try:
+            style = _interned_styles.get(key)
+        except TypeError:
+            # Unhashable values cannot be interned
+            return cls(classes, *key[1:])
+        if style is None:
+            style = cls(classes, *key[1:])
+            _interned_styles[key] = style
+        return style
+    
+    def to_style_dict(self) -> Dict[str, str]:
+        """Get the inline CSS properties."""
+        return dict(self.style_map)
     
     def apply_to_element(self, element) -> None:
         """Apply styles to a NiceGUI element."""
-        if self.classes:
-            element.classes(' '.join(self.classes))
+        if self.class_string:
+            element.classes(self.class_string)
         
-        style_dict = {}
-        if self.width: style_dict['width'] = self.width
-        if self.height: style_dict['height'] = self.height
-        if self.padding: style_dict['padding'] = self.padding
-        if self.margin: style_dict['margin'] = self.margin
-        if self.background: style_dict['background'] = self.background
-        if self.color: style_dict['color'] = self.color
-        if self.border: style_dict['border'] = self.border
+        if self.style_map:
+            element.style.update(self.style_map)
+            element.update()
+    
+    def remove_from_element(self, element) -> None:
+        """Remove previously applied styles from a NiceGUI element."""
+        if self.class_string:
+            element.classes(remove=self.class_string)
         
-        if style_dict:
-            element.style(style_dict)
+        if self.style_map:
+            for key in self.style_map:
+                element.style.pop(key, None)
+            element.update()
+
+
+_STYLE_PROPERTIES = ('width', 'height', 'padding', 'margin', 'background', 'color', 'border')
 
+# Interned styles, kept alive only while some component or plan uses them
+_interned_styles: 'weakref.WeakValueDictionary[Tuple[Any, ...], ComponentStyle]' = weakref.WeakValueDictionary()
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class EventHandler:
-    """Standardized event handling."""
+    """Standardized event handling.
+    
+    debounce and throttle are windows in milliseconds, applied in the
+    browser before the event is sent to the server. leading and trailing
+    select whether the first and the last event of a burst get through.
+    """
     event: EventType
     action: str
     params: Dict[str, Any] = field(default_factory=dict)
+    debounce: float = 0
+    throttle: float = 0
+    leading: bool = True
+    trailing: bool = True
+    
+    def listener_options(self) -> Dict[str, Any]:
+        """Keyword arguments for element.on() implementing the rate limits."""
+        options: Dict[str, Any] = {}
+        if self.debounce:
+            options['js_handler'] = _debounce_js(self.debounce, self.leading, self.trailing)
+        if self.throttle:
+            options.update(throttle=self.throttle / 1000, leading_events=self.leading,
+                           trailing_events=self.trailing)
+        return options
+
+
+def _debounce_js(wait_ms: float, leading: bool, trailing: bool) -> str:
+    """Client-side handler emitting an event only after `wait_ms` without further events.
+    
+    NiceGUI evaluates it where `emit` and the listener's `event` are in scope.
+    """
+    return (
+        '(...args) => {'
+        ' const state = window["mondrui_debounce_" + event.listener_id] ||='
+        ' {timer: null, args: null};'
+        f' if (state.timer === null && {str(leading).lower()}) emit(...args); else state.args = args;'
+        ' clearTimeout(state.timer);'
+        ' state.timer = setTimeout(() => {'
+        f' state.timer = null; if ({str(trailing).lower()} && state.args) emit(...state.args); state.args = null;'
+        f' }}, {wait_ms:g});'
+        ' }'
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class EventBinding:
+    """How a MondrUI event type is wired to element events.
+    
+    `element_event` is the event listened to on the element, `args` the
+    event arguments sent to the server (None for all), and `payload`
+    extracts the positional arguments for the action handler from the
+    element and the event arguments.
+    """
+    element_event: str
+    payload: Callable[[Any, Any], Tuple[Any, ...]] = lambda element, e: ()
+    args: Optional[List[str]] = None
+
+
+def _value_payload(element: Any, e: Any) -> Tuple[Any, ...]:
+    return (element.value,)
+
+
+def _key_payload(element: Any, e: Any) -> Tuple[Any, ...]:
+    return (e.args.get('key') if isinstance(e.args, dict) else None,)
+
+
+# Default event dispatch table; extend with MondrUIRenderer.register_event_binding()
+DEFAULT_EVENT_BINDINGS: Dict[EventType, EventBinding] = {
+    EventType.CLICK: EventBinding('click', args=[]),
+    EventType.CHANGE: EventBinding('change', _value_payload, args=[]),
+    EventType.SUBMIT: EventBinding('submit', args=[]),
+    EventType.SLIDE: EventBinding('update:model-value', _value_payload, args=[]),
+    EventType.KEYDOWN: EventBinding('keydown', _key_payload, args=['key']),
+    EventType.FOCUS: EventBinding('focus', args=[]),
+    EventType.BLUR: EventBinding('blur', _value_payload, args=[]),
+}
+
+
+def canonical_spec(spec: Any) -> bytes:
+    """Return the canonical JSON encoding of a specification (sorted keys, no whitespace)."""
+    return json.dumps(spec, sort_keys=True, separators=(',', ':'), default=repr).encode('utf-8')
+
+
+def spec_fingerprint(spec: Any, canonical: Optional[bytes] = None) -> str:
+    """Return a canonical hash of a specification, independent of key order.
+    
+    Pass the spec's canonical_spec() encoding if it is already at hand.
+    """
+    if canonical is None:
+        canonical = canonical_spec(spec)
+    return hashlib.blake2b(canonical, digest_size=16).hexdigest()
+
+
+def _read_only(self, *args, **kwargs):
+    raise TypeError(f"'{type(self).__name__}' object is read-only")
+
+
+class FrozenDict(dict):
+    """A dict that cannot be changed, for the props of compiled plans.
+    
+    It stays a dict, so components and NiceGUI elements can use it as one;
+    copy() returns a plain, mutable dict.
+    """
+    
+    __slots__ = ()
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+    
+    def __reduce__(self):
+        return type(self), (dict(self),)
+
+
+class FrozenList(list):
+    """A list that cannot be changed, for the props of compiled plans; copy() returns a plain list."""
+    
+    __slots__ = ()
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = extend = insert = pop = remove = clear = sort = reverse = _read_only
+    
+    def __reduce__(self):
+        return type(self), (list(self),)
+
+
+def freeze(value: Any) -> Any:
+    """Return a deep, read-only copy of a spec value (dicts and lists all the way down)."""
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return FrozenList(freeze(item) for item in value)
+    return value
+
+
+# Compiled render plans shared by every renderer in the process, keyed by
+# (component/template registry, spec fingerprint) and bounded by the size of
+# the specs' canonical JSON
+SHARED_PLAN_CACHE = LRUCache(maxsize=4096, maxbytes=16 * 1024 * 1024)
+
+
+class SpecValidationError(ValueError):
+    """Raised when a specification does not match the component schemas."""
+    
+    def __init__(self, errors: List[str]):
+        self.errors = list(errors)
+        super().__init__('; '.join(self.errors))
+
+
+NUMBER = (int, float)
+
+
+@dataclass(frozen=True)
+class PropRule:
+    """Schema rule for a single component property.
+    
+    None values are accepted for props that are not required.
+    """
+    types: Tuple[type, ...] = ()
+    choices: Optional[Tuple[Any, ...]] = None
+    required: bool = False
+    items: Tuple[type, ...] = ()  # Allowed types of list items
+    item_schema: Optional[Dict[str, 'PropRule']] = None  # Schema for dict list items
+
+
+Validator = Callable[[Mapping[str, Any], str, List[str]], None]
+
+
+def compile_validator(schema: Mapping[str, PropRule]) -> Validator:
+    """Compile a props schema into a function validator(props, path, errors)."""
+    checks = [_compile_rule(name, rule) for name, rule in schema.items()]
+    
+    def validate(props: Mapping[str, Any], path: str, errors: List[str]) -> None:
+        for check in checks:
+            check(props, path, errors)
+    return validate
+
+
+def _compile_rule(name: str, rule: PropRule) -> Validator:
+    """Compile a single PropRule into a check closure."""
+    types = rule.types
+    type_names = ' or '.join(t.__name__ for t in types)
+    choices = rule.choices
+    items = rule.items
+    item_names = ' or '.join(t.__name__ for t in items)
+    item_validator = compile_validator(rule.item_schema) if rule.item_schema else None
+    
+    def check(props: Mapping[str, Any], path: str, errors: List[str]) -> None:
+        value = props.get(name)
+        if value is None:
+            if rule.required:
+                errors.append(f"{path}: missing required prop '{name}'")
+            return
+        if types and not isinstance(value, types):
+            errors.append(f"{path}.{name}: expected {type_names}, got {type(value).__name__}")
+        elif choices is not None and value not in choices:
+            errors.append(f"{path}.{name}: must be one of {', '.join(map(str, choices))}")
+        elif (items or item_validator) and isinstance(value, list):
+            for index, item in enumerate(value):
+                item_path = f"{path}.{name}[{index}]"
+                if items and not isinstance(item, items):
+                    errors.append(f"{item_path}: expected {item_names}, got {type(item).__name__}")
+                elif item_validator and isinstance(item, dict):
+                    item_validator(item, item_path, errors)
+    return check
+
+
+# Props of components that can be fields of a Form
+_FIELD_SCHEMA = {
+    'sync': PropRule((str,), choices=tuple(policy.value for policy in SyncPolicy)),
+    'debounce': PropRule(NUMBER),
+}
+
+# Props that are diffed separately from a component's own props
+_STRUCTURAL_PROPS = frozenset({'children', 'style', 'events'})
 
 
 class BaseComponent(ABC):
     """Abstract base class for all MondrUI components."""
     
-    def __init__(self, component_type: str, props: Dict[str, Any]):
+    __slots__ = ('type', 'props', 'style', 'events', 'children')
+    
+    # Schema of the props, merged with those of the base classes
+    props_schema: Dict[str, PropRule] = {
+        'id': PropRule((str, int)),
+        'style': PropRule((dict,)),
+        'events': PropRule((dict,)),
+        'children': PropRule((list,), items=(dict,)),
+    }
+    
+    def __init__(self, component_type: str, props: Mapping[str, Any], *,
+                 style: Optional[ComponentStyle] = None,
+                 events: Optional[List[EventHandler]] = None,
+                 children: Optional[Any] = None):
         self.type = component_type
         self.props = props
-        self.style = self._parse_style(props.get('style', {}))
-        self.events = self._parse_events(props.get('events', {}))
-        self.children = props.get('children', [])
-        
-    def _parse_style(self, style_props: Dict[str, Any]) -> ComponentStyle:
+        # Pre-parsed values are supplied when rendering from a compiled RenderPlan
+        self.style = style if style is not None else self._parse_style(props.get('style', {}))
+        self.events = events if events is not None else self._parse_events(props.get('events', {}))
+        self.children = children if children is not None else props.get('children', [])
+    
+    @staticmethod
+    def _parse_style(style_props: Dict[str, Any]) -> ComponentStyle:
         """Parse style properties into ComponentStyle object."""
-        return ComponentStyle(
-            classes=style_props.get('classes', []),
-            width=style_props.get('width'),
-            height=style_props.get('height'),
-            padding=style_props.get('padding'),
-            margin=style_props.get('margin'),
-            background=style_props.get('background'),
-            color=style_props.get('color'),
-            border=style_props.get('border')
+        return ComponentStyle.intern(
+            style_props.get('classes', []),
+            **{name: style_props.get(name) for name in _STYLE_PROPERTIES}
         )
     
-    def _parse_events(self, event_props: Dict[str, Any]) -> List[EventHandler]:
+    @staticmethod
+    def _parse_events(event_props: Dict[str, Any]) -> List[EventHandler]:
         """Parse event properties into EventHandler objects."""
         events = []
         for event_name, action in event_props.items():
@@ -106,7 +388,11 @@ class BaseComponent(ABC):
                     events.append(EventHandler(
                         event_type, 
                         action.get('action', ''),
-                        action.get('params', {})
+                        action.get('params', {}),
+                        debounce=action.get('debounce', 0),
+                        throttle=action.get('throttle', 0),
+                        leading=action.get('leading', True),
+                        trailing=action.get('trailing', True)
                     ))
             except ValueError:
                 # Skip unknown event types
@@ -118,41 +404,98 @@ class BaseComponent(ABC):
         """Render the component and return the NiceGUI element."""
         pass
     
+    @classmethod
+    def validator(cls) -> Validator:
+        """Get the compiled validator for this component's props schema."""
+        validator = cls.__dict__.get('_validator')
+        if validator is None:
+            schema: Dict[str, PropRule] = {}
+            for klass in reversed(cls.__mro__):
+                schema.update(vars(klass).get('props_schema', {}))
+            validator = compile_validator(schema)
+            cls._validator = validator
+        return validator
+    
     def validate_props(self) -> bool:
-        """Validate component properties. Override in subclasses."""
+        """Validate component properties against the props schema."""
+        errors: List[str] = []
+        self.validator()(self.props, self.type, errors)
+        return not errors
+    
+    # Whether every child spec is rendered directly into the returned element,
+    # so children can be reconciled by key on update
+    keyed_children = False
+    
+    def patch(self, element: Any, props: Mapping[str, Any]) -> bool:
+        """Update a rendered element in place for new props.
+        
+        Only called when props other than children, style and events changed.
+        Return False if the component has to be re-rendered instead.
+        """
+        return False
+    
+    def reset(self, element: Any, props: Mapping[str, Any]) -> bool:
+        """Discard user input held by a reused element, restoring the values given in props.
+        
+        Return False if the component has to be refilled or re-rendered instead.
+        """
         return True
     
+    def refill(self, element: Any, props: Mapping[str, Any], renderer: 'MondrUIRenderer') -> bool:
+        """Re-render the content of a rendered element for new props, keeping the element.
+        
+        Called when patch() declines; components render the new content
+        with the renderer as in render(). Return False, before changing
+        anything, if the component has to be re-rendered instead.
+        """
+        return False
+    
+    def _changed_props(self, props: Mapping[str, Any]) -> set:
+        """Names of props (other than children, style and events) that differ."""
+        return {
+            key for key in set(self.props) | set(props)
+            if key not in _STRUCTURAL_PROPS and self.props.get(key) != props.get(key)
+        }
+    
     def apply_styling_and_events(self, element: Any, renderer: 'MondrUIRenderer') -> None:
         """Apply styling and event handlers to the rendered element."""
         self.style.apply_to_element(element)
         
         for event in self.events:
-            if event.action in renderer.action_handlers:
-                handler = renderer.action_handlers[event.action]
-                
-                if event.event == EventType.CLICK:
-                    element.on('click', lambda h=handler, p=event.params: h(**p))
-                elif event.event == EventType.CHANGE:
-                    element.on('change', lambda h=handler, p=event.params: h(element.value, **p))
-                elif event.event == EventType.SUBMIT:
-                    element.on('submit', lambda h=handler, p=event.params: h(**p))
-                elif event.event == EventType.SLIDE:
-                    element.on('update:model-value', lambda h=handler, p=event.params: h(element.value, **p))
-                # Add more event types as needed
+            binding = renderer.event_bindings.get(event.event)
+            handler = renderer.action_handlers.get(event.action)
+            if binding is None or handler is None:
+                continue
+            
+            element.on(
+                binding.element_event,
+                lambda e, h=handler, b=binding, p=event.params: h(*b.payload(element, e), **p),
+                binding.args,
+                **event.listener_options()
+            )
 
 
 class ContainerComponent(BaseComponent):
     """Generic container component with flexible layout."""
     
+    __slots__ = ()
+    
+    props_schema = {
+        'layout': PropRule((str,)),
+        'columns': PropRule((int,)),
+    }
+    
+    keyed_children = True
+    
     def render(self, renderer: 'MondrUIRenderer') -> Any:
         layout = self.props.get('layout', LayoutType.VERTICAL.value)
         
         if layout == LayoutType.HORIZONTAL.value:
-            container = ui.row()
+            container = renderer.ui.row()
         elif layout == LayoutType.GRID.value:
-            container = ui.grid(columns=self.props.get('columns', 2))
+            container = renderer.ui.grid(columns=self.props.get('columns', 2))
         else:  # Default to vertical
-            container = ui.column()
+            container = renderer.ui.column()
         
         self.apply_styling_and_events(container, renderer)
         
@@ -167,24 +510,53 @@ class ContainerComponent(BaseComponent):
 class TextComponent(BaseComponent):
     """Generic text component (labels, headings, etc.)."""
     
+    __slots__ = ()
+    
+    props_schema = {
+        'text': PropRule((str, int, float)),
+        'variant': PropRule((str,)),
+    }
+    
     def render(self, renderer: 'MondrUIRenderer') -> Any:
         text = self.props.get('text', '')
         variant = self.props.get('variant', 'body')  # body, h1, h2, h3, caption
         
         if variant.startswith('h'):
-            element = ui.html(f'<{variant}>{text}</{variant}>')
+            element = renderer.ui.html(f'<{variant}>{text}</{variant}>')
         elif variant == 'caption':
-            element = ui.label(text).classes('text-sm text-gray-500')
+            element = renderer.ui.label(text).classes('text-sm text-gray-500')
         else:
-            element = ui.label(text)
+            element = renderer.ui.label(text)
         
         self.apply_styling_and_events(element, renderer)
         return element
+    
+    def patch(self, element: Any, props: Mapping[str, Any]) -> bool:
+        if self._changed_props(props) != {'text'}:
+            return False
+        
+        text = props.get('text', '')
+        variant = props.get('variant', 'body')
+        if variant.startswith('h'):
+            element.content = f'<{variant}>{text}</{variant}>'
+        else:
+            element.text = text
+        return True
 
 
 class InputComponent(BaseComponent):
     """Generic input component supporting various input types."""
     
+    __slots__ = ()
+    
+    props_schema = {
+        'inputType': PropRule((str,)),
+        'placeholder': PropRule((str,)),
+        'required': PropRule((bool,)),
+        'options': PropRule((list, dict)),
+        **_FIELD_SCHEMA,
+    }
+    
     def render(self, renderer: 'MondrUIRenderer') -> Any:
         input_type = self.props.get('inputType', 'text')
         placeholder = self.props.get('placeholder', '')
@@ -193,32 +565,64 @@ class InputComponent(BaseComponent):
         options = self.props.get('options', [])
         
         if input_type == 'textarea':
-            element = ui.textarea(value=value, placeholder=placeholder)
+            element = renderer.ui.textarea(value=value, placeholder=placeholder)
         elif input_type == 'select':
-            element = ui.select(options=options, value=value)
+            # An empty selection is None; '' is not one of the options
+            element = renderer.ui.select(options=options, value=self.props.get('value'))
         elif input_type == 'checkbox':
-            element = ui.checkbox(value=bool(value))
+            element = renderer.ui.checkbox(value=bool(value))
         elif input_type == 'number':
-            element = ui.number(value=value, placeholder=placeholder)
+            element = renderer.ui.number(value=value, placeholder=placeholder)
         else:  # Default to text
-            element = ui.input(value=value, placeholder=placeholder)
+            element = renderer.ui.input(value=value, placeholder=placeholder)
         
         if required:
             element.props('required')
         
+        renderer.bind_field(self, element)
         self.apply_styling_and_events(element, renderer)
         return element
+    
+    def patch(self, element: Any, props: Mapping[str, Any]) -> bool:
+        changed = self._changed_props(props)
+        if not changed <= {'value', 'placeholder'}:
+            return False
+        
+        if 'value' in changed:
+            value = props.get('value', '')
+            element.value = bool(value) if props.get('inputType') == 'checkbox' else value
+        if 'placeholder' in changed:
+            element.props['placeholder'] = props.get('placeholder', '')
+            element.update()
+        return True
+    
+    def reset(self, element: Any, props: Mapping[str, Any]) -> bool:
+        input_type = props.get('inputType')
+        if input_type == 'select':
+            element.value = props.get('value')
+        else:
+            value = props.get('value', '')
+            element.value = bool(value) if input_type == 'checkbox' else value
+        return True
 
 
 class ButtonComponent(BaseComponent):
     """Generic button component."""
     
+    __slots__ = ()
+    
+    props_schema = {
+        'label': PropRule((str, int, float)),
+        'icon': PropRule((str,)),
+        'variant': PropRule((str,)),
+    }
+    
     def render(self, renderer: 'MondrUIRenderer') -> Any:
         label = self.props.get('label', '')
         icon = self.props.get('icon')
         variant = self.props.get('variant', 'default')  # default, primary, secondary, danger
         
-        element = ui.button(label, icon=icon)
+        element = renderer.ui.button(label, icon=icon)
         
         # Apply variant-specific styling
         if variant == 'primary':
@@ -230,29 +634,58 @@ class ButtonComponent(BaseComponent):
         
         self.apply_styling_and_events(element, renderer)
         return element
+    
+    def patch(self, element: Any, props: Mapping[str, Any]) -> bool:
+        if self._changed_props(props) != {'label'}:
+            return False
+        
+        element.text = props.get('label', '')
+        return True
 
 
 class RadioComponent(BaseComponent):
     """Radio button group for exclusive selection."""
     
+    __slots__ = ()
+    
+    props_schema = {
+        'options': PropRule((dict, list)),
+        'inline': PropRule((bool,)),
+        **_FIELD_SCHEMA,
+    }
+    
     def render(self, renderer: 'MondrUIRenderer') -> Any:
         options = self.props.get('options', {})  # {'value': 'label'} format
         value = self.props.get('value')
         field_id = self.props.get('id', '')
         inline = self.props.get('inline', False)
         
-        element = ui.radio(options, value=value)
+        element = renderer.ui.radio(options, value=value)
         
         if inline:
             element.props('inline')
         
+        renderer.bind_field(self, element)
         self.apply_styling_and_events(element, renderer)
         return element
+    
+    def reset(self, element: Any, props: Mapping[str, Any]) -> bool:
+        element.value = props.get('value')
+        return True
 
 
 class CheckboxGroupComponent(BaseComponent):
     """Checkbox group for multiple selections."""
     
+    __slots__ = ()
+    
+    props_schema = {
+        'options': PropRule((dict,)),
+        'value': PropRule((list,)),
+        'layout': PropRule((str,)),
+        **_FIELD_SCHEMA,
+    }
+    
     def render(self, renderer: 'MondrUIRenderer') -> Any:
         options = self.props.get('options', {})  # {'value': 'label'} format
         selected_values = self.props.get('value', [])  # List of selected values
@@ -260,15 +693,16 @@ class CheckboxGroupComponent(BaseComponent):
         layout = self.props.get('layout', 'vertical')  # vertical or horizontal
         
         if layout == 'horizontal':
-            container = ui.row()
+            container = renderer.ui.row()
         else:
-            container = ui.column()
+            container = renderer.ui.column()
             
         current_selections = set(selected_values) if selected_values else set()
+        checkboxes = []
         
         with container:
             for option_value, option_label in options.items():
-                checkbox = ui.checkbox(
+                checkbox = renderer.ui.checkbox(
                     text=option_label, 
                     value=option_value in current_selections
                 )
@@ -283,14 +717,162 @@ class CheckboxGroupComponent(BaseComponent):
                     return on_checkbox_change
                 
                 checkbox.on('change', create_checkbox_handler(option_value))
+                checkboxes.append((option_value, checkbox))
         
+        renderer.bind_field(self, [checkbox for _, checkbox in checkboxes],
+                            read=lambda: [value for value, checkbox in checkboxes if checkbox.value])
         self.apply_styling_and_events(container, renderer)
         return container
+    
+    def reset(self, element: Any, props: Mapping[str, Any]) -> bool:
+        return False
+
+
+def _value_listener(element: Any) -> Any:
+    """NiceGUI's own listener that updates a value element's value, if any."""
+    value_prop = getattr(element, 'VALUE_PROP', None)
+    if value_prop is None:
+        return None
+    event_type = 'update:' + re.sub(r'-(\w)', lambda m: m.group(1).upper(), value_prop)
+    for listener in getattr(element, '_event_listeners', {}).values():
+        if listener.type == event_type:
+            return listener
+    return None
+
+
+def sync_value_on_change(element: Any) -> None:
+    """Send a value element's value to the server on `change` only.
+    
+    NiceGUI value elements report every `update:model-value` to the server;
+    for a slider that is every step of a drag. The model value is updated
+    in the browser instead, and the server learns the committed value when
+    the slider is released.
+    """
+    listener = _value_listener(element)
+    if listener is None:
+        return
+    listener.type = 'change'
+    element.on(f'update:{element.VALUE_PROP}',
+               js_handler=f'(value) => {{ element.props[{json.dumps(element.VALUE_PROP)}] = value; }}')
+
+
+def bind_value_readout(element: Any, label: Any, template: str = 'Value: {value}') -> None:
+    """Show an element's value in a label, updated in the browser as it changes.
+    
+    The label text on the server is updated on `change`, so a re-rendered
+    label shows the committed value.
+    """
+    prefix, _, suffix = template.partition('{value}')
+    element.on('update:model-value', js_handler=(
+        f'(value) => {{ getHtmlElement({label.id}).textContent = '
+        f'{json.dumps(prefix)} + value + {json.dumps(suffix)}; }}'
+    ))
+    
+    def update_label(e: Any) -> None:
+        label.text = template.format(value=e.args)
+    
+    element.on('change', update_label, [None])
+
+
+def defer_value_sync(element: Any, policy: SyncPolicy = SyncPolicy.LAZY, debounce: float = 300) -> None:
+    """Keep a value element's edits in the browser until they are needed.
+    
+    The element's value is recorded on the client, where FormState.pull()
+    collects it, and is only sent to the server on blur or after `debounce`
+    milliseconds without edits, depending on the policy. Elements that are
+    not NiceGUI value elements are left alone.
+    """
+    listener = _value_listener(element)
+    if listener is None:
+        return
+    record = (f'element.props[{json.dumps(element.VALUE_PROP)}] = args[0];'
+              f' (window.mondrui_pending ||= {{}})[{element.id}] = args[0];')
+    if policy is SyncPolicy.DEBOUNCE:
+        listener.js_handler = f'(...args) => {{ {record} ({_debounce_js(debounce, False, True)})(...args); }}'
+    else:
+        listener.js_handler = f'(...args) => {{ {record} }}'
+    if policy is SyncPolicy.BLUR:
+        element.on('blur', listener.handler, [None], js_handler=(
+            f'() => {{ const pending = window.mondrui_pending || {{}};'
+            f' if ({element.id} in pending) emit(pending[{element.id}]); }}'
+        ))
+
+
+class FormState:
+    """The values of a rendered form, pulled from the browser when needed.
+    
+    Fields are added with the value elements that hold them; their edits
+    stay in the browser according to their SyncPolicy, and pull() fetches
+    all pending values in one request, e.g. when the form is submitted.
+    Elements of other backends (such as MemoryUI) are read directly.
+    """
+    
+    def __init__(self):
+        # field id -> (value elements, function reading the field value)
+        self.fields: Dict[Any, Tuple[List[Any], Callable[[], Any]]] = {}
+    
+    def add_field(self, field_id: Any, elements: Any, read: Optional[Callable[[], Any]] = None,
+                  policy: SyncPolicy = SyncPolicy.LAZY, debounce: float = 300) -> None:
+        """Add a field held by one element (read from its value) or several (read with `read`)."""
+        elements = list(elements) if isinstance(elements, (list, tuple)) else [elements]
+        for element in elements:
+            defer_value_sync(element, policy, debounce)
+        self.fields[field_id] = (elements, read or (lambda: elements[0].value))
+    
+    @property
+    def values(self) -> Dict[Any, Any]:
+        """The field values as last synced to the server."""
+        return {field_id: read() for field_id, (_, read) in self.fields.items()}
+    
+    async def pull(self, timeout: float = 1.0) -> Dict[Any, Any]:
+        """Fetch the pending edits of all fields from the browser and return the values.
+        
+        If the browser does not answer within timeout seconds, the values
+        last synced to the server are returned.
+        """
+        listeners = {
+            element.id: (element, listener)
+            for elements, _ in self.fields.values() for element in elements
+            if (listener := _value_listener(element)) is not None
+        }
+        if listeners:
+            client = next(iter(listeners.values()))[0].client
+            try:
+                pending = await client.run_javascript(
+                    f'const pending = window.mondrui_pending || {{}}; const values = {{}};'
+                    f' for (const id of {json.dumps(list(listeners))})'
+                    f' if (id in pending) {{ values[id] = pending[id]; delete pending[id]; }}'
+                    f' return values;',
+                    timeout=timeout
+                )
+            except TimeoutError:
+                # A slow connection must not lose the submission; use the values last synced
+                logger.warning('Pulling form values timed out after %.1f s; using the synced values', timeout)
+                pending = {}
+            for element_id, args in (pending or {}).items():
+                element, listener = listeners[int(element_id)]
+                # Apply the value as NiceGUI would have on `update:model-value`
+                listener.handler(GenericEventArguments(sender=element, client=client, args=args))
+        return self.values
 
 
 class SliderComponent(BaseComponent):
     """Slider for range value selection."""
     
+    __slots__ = ()
+    
+    props_schema = {
+        'min': PropRule(NUMBER),
+        'max': PropRule(NUMBER),
+        'step': PropRule(NUMBER),
+        'value': PropRule(NUMBER),
+        'minLabel': PropRule((str,)),
+        'maxLabel': PropRule((str,)),
+        'showValue': PropRule((bool,)),
+        'labelAlways': PropRule((bool,)),
+        **_FIELD_SCHEMA,
+    }
+    
     def render(self, renderer: 'MondrUIRenderer') -> Any:
         min_val = self.props.get('min', 0)
         max_val = self.props.get('max', 100)
@@ -304,75 +886,153 @@ class SliderComponent(BaseComponent):
         show_value = self.props.get('showValue', True)
         label_always = self.props.get('labelAlways', False)
         
-        with ui.column() as container:
+        with renderer.ui.column() as container:
             # Scale labels if provided
             if min_label and max_label:
-                with ui.row().classes('w-full justify-between text-sm text-gray-600'):
-                    ui.label(min_label)
-                    ui.label(max_label)
+                with renderer.ui.row().classes('w-full justify-between text-sm text-gray-600'):
+                    renderer.ui.label(min_label)
+                    renderer.ui.label(max_label)
             
-            # The slider itself
-            slider = ui.slider(min=min_val, max=max_val, step=step, value=value)
+            # The slider itself; its value reaches the server when released,
+            # or as its form's sync policy says
+            slider = renderer.ui.slider(min=min_val, max=max_val, step=step, value=value)
+            if not renderer.bind_field(self, slider):
+                sync_value_on_change(slider)
             
             if label_always:
                 slider.props('label-always')
             
-            # Value display
+            # Value display, updated in the browser while dragging
             if show_value:
-                value_label = ui.label(f'Value: {value}').classes('text-center text-sm')
-                
-                def update_value_display(e):
-                    value_label.text = f'Value: {e.value}'
-                
-                slider.on('update:model-value', update_value_display)
+                value_label = renderer.ui.label(f'Value: {value}').classes('text-center text-sm')
+                bind_value_readout(slider, value_label)
         
         self.apply_styling_and_events(container, renderer)
         return container
+    
+    def reset(self, element: Any, props: Mapping[str, Any]) -> bool:
+        return False
 
 
 class FormComponent(BaseComponent):
     """Generic form component that can render any form structure."""
     
+    __slots__ = ()
+    
+    props_schema = {
+        'title': PropRule((str,)),
+        'layout': PropRule((str,)),
+        'fields': PropRule((list,), items=(dict,), item_schema={
+            'id': PropRule((str, int)),
+            'label': PropRule((str,)),
+            'type': PropRule((str,)),
+            'required': PropRule((bool,)),
+            'placeholder': PropRule((str,)),
+            'options': PropRule((dict, list)),
+            'min': PropRule(NUMBER),
+            'max': PropRule(NUMBER),
+            'step': PropRule(NUMBER),
+            'minLabel': PropRule((str,)),
+            'maxLabel': PropRule((str,)),
+            'showValue': PropRule((bool,)),
+            'labelAlways': PropRule((bool,)),
+            'inline': PropRule((bool,)),
+            'layout': PropRule((str,)),
+            **_FIELD_SCHEMA,
+        }),
+        'actions': PropRule((list,), items=(dict,), item_schema={
+            'label': PropRule((str,)),
+            'action': PropRule((str,)),
+            'variant': PropRule((str,)),
+        }),
+    }
+    
     def render(self, renderer: 'MondrUIRenderer') -> Any:
         title = self.props.get('title', '')
-        fields = self.props.get('fields', [])
         actions = self.props.get('actions', [])
         layout = self.props.get('layout', 'vertical')
         
-        with ui.card() as form_card:
+        with renderer.ui.card() as form_card:
             if title:
-                ui.label(title).classes('text-xl font-bold mb-4')
+                renderer.ui.label(title).classes('text-xl font-bold mb-4')
             
             # Create form layout
             if layout == 'horizontal':
-                field_container = ui.row()
+                field_container = renderer.ui.row()
             else:
-                field_container = ui.column()
-            
-            with field_container:
-                # Render form fields
-                for field in fields:
-                    self._render_form_field(field, renderer)
+                field_container = renderer.ui.column()
             
             # Render action buttons
-            if actions:
-                with ui.row().classes('w-full justify-end mt-4 gap-2'):
-                    for action in actions:
-                        action_spec = {
-                            'component': 'Button',
-                            'props': {
-                                'label': action.get('label', ''),
-                                'variant': action.get('variant', 'default'),
-                                'events': {
-                                    'click': action.get('action', '')
-                                }
-                            }
-                        }
-                        renderer.render_component(action_spec)
+            action_row = renderer.ui.row().classes('w-full justify-end mt-4 gap-2') if actions else None
+            
+            self._render_content(self.props, field_container, action_row, renderer)
         
         self.apply_styling_and_events(form_card, renderer)
         return form_card
     
+    def reset(self, element: Any, props: Mapping[str, Any]) -> bool:
+        # Fresh fields and form state come from refill()
+        return False
+    
+    def refill(self, element: Any, props: Mapping[str, Any], renderer: 'MondrUIRenderer') -> bool:
+        """Keep the card, title, field container and action row; re-render fields and buttons."""
+        if (props.get('layout', 'vertical') != self.props.get('layout', 'vertical')
+                or bool(props.get('title')) != bool(self.props.get('title'))
+                or bool(props.get('actions')) != bool(self.props.get('actions'))):
+            return False
+        
+        parts = list(element.default_slot.children)
+        if props.get('title'):
+            title_label = parts.pop(0)
+            title_label.text = props['title']
+        field_container = parts[0]
+        action_row = parts[1] if props.get('actions') else None
+        
+        field_container.clear()
+        if action_row is not None:
+            action_row.clear()
+        self._render_content(props, field_container, action_row, renderer)
+        return True
+    
+    def _render_content(self, props: Mapping[str, Any], field_container: Any, action_row: Any,
+                        renderer: 'MondrUIRenderer') -> None:
+        """Render the fields and action buttons into the form's containers."""
+        # Field values stay in the browser until an action pulls them
+        state = FormState()
+        
+        with field_container, renderer.collect_fields(state):
+            for field in props.get('fields', []):
+                self._render_form_field(field, renderer)
+        
+        if action_row is None:
+            return
+        with action_row:
+            for action in props.get('actions', []):
+                action_spec = {
+                    'component': 'Button',
+                    'props': {
+                        'label': action.get('label', ''),
+                        'variant': action.get('variant', 'default')
+                    }
+                }
+                button = renderer.render_component(action_spec)
+                handler = renderer.action_handlers.get(action.get('action', ''))
+                if handler is not None:
+                    button.on('click', self._submit_handler(state, handler), [])
+    
+    @staticmethod
+    def _submit_handler(state: FormState, handler: Callable) -> Callable:
+        """Click handler pulling the form values and passing them to an action handler.
+        
+        Handlers that take no arguments are called without the values.
+        """
+        async def submit() -> None:
+            values = await state.pull()
+            result = handler(values) if expects_arguments(handler) else handler()
+            if inspect.isawaitable(result):
+                await result
+        return submit
+    
     def _render_form_field(self, field: Dict[str, Any], renderer: 'MondrUIRenderer') -> None:
         """Render a single form field with label."""
         label = field.get('label', '')
@@ -382,7 +1042,7 @@ class FormComponent(BaseComponent):
         
         # Render label
         label_text = f"{label}{'*' if required else ''}"
-        ui.label(label_text).classes('text-sm font-medium mb-1')
+        renderer.ui.label(label_text).classes('text-sm font-medium mb-1')
         
         # Render field based on type
         if field_type == 'radio':
@@ -435,6 +1095,9 @@ class FormComponent(BaseComponent):
         
         if field_id:
             input_spec['props']['id'] = field_id
+        for key in _FIELD_SCHEMA:
+            if key in field:
+                input_spec['props'][key] = field[key]
         
         renderer.render_component(input_spec)
 
@@ -442,14 +1105,22 @@ class FormComponent(BaseComponent):
 class CardComponent(BaseComponent):
     """Generic card component."""
     
+    __slots__ = ()
+    
+    props_schema = {
+        'title': PropRule((str,)),
+    }
+    
+    keyed_children = True
+    
     def render(self, renderer: 'MondrUIRenderer') -> Any:
         title = self.props.get('title')
         
-        card = ui.card()
+        card = renderer.ui.card()
         
         with card:
             if title:
-                ui.label(title).classes('text-lg font-bold mb-2')
+                renderer.ui.label(title).classes('text-lg font-bold mb-2')
             
             # Render children
             for child_spec in self.children:
@@ -459,57 +1130,633 @@ class CardComponent(BaseComponent):
         return card
 
 
+def _css_pixels(value: Any, default: float) -> float:
+    """Convert a number or 'NNNpx' CSS length to pixels, else return default."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str) and value.endswith('px'):
+        try:
+            return float(value[:-2])
+        except ValueError:
+            pass
+    return default
+
+
+class VirtualListWindow:
+    """Scrollable viewport that materializes only the visible rows of a list.
+    
+    Rows are keyed by item index. Rows scrolled out of the window are cleared
+    and recycled for the rows scrolled into it, while two spacers stand in for
+    the estimated height of all rows that are not materialized.
+    """
+    
+    def __init__(self, items: List[Any], render_row: Callable[[Any], Any],
+                 row_height: float = 48, overscan: int = 5, height: Any = '400px',
+                 backend: Any = None):
+        self.ui = backend if backend is not None else ui
+        self.items = items
+        self.render_row = render_row
+        self.row_height = row_height
+        self.overscan = overscan
+        self.rows: Dict[int, Any] = {}
+        self._free_rows: List[Any] = []
+        self.start = 0
+        self.end = 0
+        
+        css_height = f'{height}px' if isinstance(height, (int, float)) else height
+        self.scroll_area = self.ui.scroll_area().style(f'height: {css_height}')
+        self.scroll_area.on('scroll', self._handle_scroll,
+                            args=['verticalPosition', 'verticalContainerSize'], throttle=0.05)
+        with self.scroll_area:
+            with self.ui.column().classes('w-full gap-0'):
+                self.top_spacer = self.ui.element('div')
+                self.row_container = self.ui.column().classes('w-full gap-0')
+                self.bottom_spacer = self.ui.element('div')
+        
+        self.update_window(0, _css_pixels(height, 10 * row_height))
+    
+    def compute_window(self, position: float, container_size: float) -> Tuple[int, int]:
+        """Return the [start, end) item range to materialize for a scroll position."""
+        first = int(position // self.row_height)
+        visible = int(container_size // self.row_height) + 1
+        start = max(0, first - self.overscan)
+        end = min(len(self.items), first + visible + self.overscan)
+        return start, end
+    
+    def update_window(self, position: float, container_size: float) -> None:
+        """Materialize the rows for a scroll position, recycling the others."""
+        start, end = self.compute_window(position, container_size)
+        if (start, end) == (self.start, self.end) and self.rows:
+            return
+        
+        for index in [i for i in self.rows if not start <= i < end]:
+            row = self.rows.pop(index)
+            row.clear()
+            row.set_visibility(False)
+            self._free_rows.append(row)
+        
+        for index in range(start, end):
+            if index in self.rows:
+                continue
+            if self._free_rows:
+                row = self._free_rows.pop()
+                row.set_visibility(True)
+            else:
+                with self.row_container:
+                    row = self.ui.column().classes('w-full')
+            with row:
+                self.render_row(self.items[index])
+            self.rows[index] = row
+        
+        # Keep rows in item order, with recycled spares at the end
+        ordered = [self.rows[i] for i in range(start, end)] + self._free_rows
+        children = self.row_container.default_slot.children
+        for position_index, row in enumerate(ordered):
+            if children[position_index] is not row:
+                row.move(target_index=position_index)
+        
+        self.top_spacer.style(f'height: {start * self.row_height}px')
+        self.bottom_spacer.style(f'height: {(len(self.items) - end) * self.row_height}px')
+        self.start, self.end = start, end
+    
+    def _handle_scroll(self, e: Any) -> None:
+        self.update_window(e.args['verticalPosition'], e.args['verticalContainerSize'])
+
+
 class ListComponent(BaseComponent):
-    """Generic list component."""
+    """Generic list component.
+    
+    Set the `virtual` prop to only materialize the rows in view; `rowHeight`
+    (px estimate), `overscan` (rows) and `height` tune the viewport.
+    """
+    
+    __slots__ = ()
+    
+    props_schema = {
+        'items': PropRule((list,)),
+        'itemTemplate': PropRule((dict, str)),
+        'emptyMessage': PropRule((str,)),
+        'virtual': PropRule((bool,)),
+        'rowHeight': PropRule(NUMBER),
+        'overscan': PropRule((int,)),
+        'height': PropRule((str, int, float)),
+    }
     
     def render(self, renderer: 'MondrUIRenderer') -> Any:
         items = self.props.get('items', [])
         item_template = self.props.get('itemTemplate', {})
         empty_message = self.props.get('emptyMessage', 'No items')
+        binder = ItemTemplateBinder(item_template) if item_template else None
         
-        with ui.column() as list_container:
-            if not items:
-                ui.label(empty_message).classes('text-gray-500 italic')
+        def render_row(item: Any) -> None:
+            if binder:
+                # Merge item data with template
+                renderer.render_component(binder.bind_item(item), cache=False)
             else:
-                for item in items:
-                    if item_template:
-                        # Merge item data with template
-                        item_spec = self._merge_item_with_template(item, item_template)
-                        renderer.render_component(item_spec)
-                    else:
-                        # Default to simple text representation
-                        ui.label(str(item))
+                # Default to simple text representation
+                renderer.ui.label(str(item))
+        
+        if items and self.props.get('virtual', False):
+            window = VirtualListWindow(
+                items,
+                render_row,
+                row_height=self.props.get('rowHeight', 48),
+                overscan=self.props.get('overscan', 5),
+                height=self.props.get('height', '400px'),
+                backend=renderer.ui
+            )
+            list_container = window.scroll_area
+        else:
+            with renderer.ui.column() as list_container:
+                if not items:
+                    renderer.ui.label(empty_message).classes('text-gray-500 italic')
+                else:
+                    for item in items:
+                        render_row(item)
         
         self.apply_styling_and_events(list_container, renderer)
         return list_container
     
     def _merge_item_with_template(self, item: Any, template: Dict[str, Any]) -> Dict[str, Any]:
         """Merge item data with template specification."""
-        # Simple template variable replacement
-        spec = json.loads(json.dumps(template))  # Deep copy
-        
-        def replace_variables(obj):
-            if isinstance(obj, str) and obj.startswith('{{') and obj.endswith('}}'):
-                var_name = obj[2:-2].strip()
-                return item.get(var_name, obj) if isinstance(item, dict) else str(item)
-            elif isinstance(obj, dict):
-                return {k: replace_variables(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [replace_variables(v) for v in obj]
-            return obj
+        return ItemTemplateBinder(template).bind_item(item)
+
+
+_SLOT_PATTERN = re.compile(r'\{\{\s*([^{}]+?)\s*\}\}')
+_MISSING = object()
+
+
+def _slot_name(value: str) -> Optional[str]:
+    """Return the variable name if value is a `{{var}}` slot, else None."""
+    match = _SLOT_PATTERN.fullmatch(value)
+    return match.group(1) if match else None
+
+
+class _TextSlot:
+    """A string with `{{var}}` placeholders embedded in literal text."""
+    
+    __slots__ = ('parts',)
+    
+    def __init__(self, value: str):
+        # Alternating literal text and variable names, starting with text
+        self.parts = _SLOT_PATTERN.split(value)
+    
+    @property
+    def names(self) -> List[str]:
+        return self.parts[1::2]
+    
+    def render(self, resolve: Callable[[str], Any]) -> str:
+        pieces = []
+        for index, part in enumerate(self.parts):
+            if index % 2:
+                value = resolve(part)
+                pieces.append('{{' + part + '}}' if value is _MISSING else str(value))
+            else:
+                pieces.append(part)
+        return ''.join(pieces)
+
+
+class CompiledTemplate:
+    """Template specification precompiled into an index of its `{{var}}` slots.
+    
+    Binding only visits the recorded slot paths and copies the dicts and
+    lists along them; every subtree without slots is shared with the template,
+    so expanded specs must be treated as read-only. With interpolate=True,
+    placeholders embedded in longer strings are filled in as text as well.
+    """
+    
+    def __init__(self, spec: Any, interpolate: bool = False):
+        self.spec = spec
+        self.interpolate = interpolate
+        self.slots: List[Tuple[Tuple[Any, ...], str]] = []
+        self._slot_tree = self._index(spec, ())
+        self._filler = self._compile_filler(self._slot_tree) if self._slot_tree else None
+    
+    @property
+    def variables(self) -> List[str]:
+        """Names of all variables referenced by the template."""
+        return list(dict.fromkeys(name for _, name in self.slots))
+    
+    def _index(self, obj: Any, path: Tuple[Any, ...]) -> Any:
+        """Record slot paths below obj; return a nested key -> slot mapping."""
+        if isinstance(obj, str):
+            var_name = _slot_name(obj)
+            if var_name is not None:
+                self.slots.append((path, var_name))
+                return var_name
+            if self.interpolate and '{{' in obj:
+                text_slot = _TextSlot(obj)
+                if text_slot.names:
+                    self.slots.extend((path, name) for name in text_slot.names)
+                    return text_slot
+            return None
+        if isinstance(obj, dict):
+            items = obj.items()
+        elif isinstance(obj, list):
+            items = enumerate(obj)
+        else:
+            return None
+        
+        tree = {}
+        for key, value in items:
+            subtree = self._index(value, path + (key,))
+            if subtree is not None:
+                tree[key] = subtree
+        return tree or None
+    
+    def expand(self, values: Mapping[str, Any]) -> Any:
+        """Fill the slots from values; unknown variables are left untouched."""
+        return self.bind(lambda name: values.get(name, _MISSING))
+    
+    def bind(self, resolve: Callable[[str], Any]) -> Any:
+        """Fill the slots with resolve(name), which returns _MISSING if unknown."""
+        if self._filler is None:
+            return self.spec
+        return self._filler(self.spec, resolve)
+    
+    @classmethod
+    def _compile_filler(cls, tree: Any) -> Callable[[Any, Callable[[str], Any]], Any]:
+        """Turn a slot tree into nested closures that copy along slot paths."""
+        if isinstance(tree, str):
+            name = tree
+            
+            def fill_slot(node: Any, resolve: Callable[[str], Any]) -> Any:
+                value = resolve(name)
+                return node if value is _MISSING else value
+            return fill_slot
+        
+        if isinstance(tree, _TextSlot):
+            return lambda node, resolve: tree.render(resolve)
+        
+        fillers = [(key, cls._compile_filler(subtree)) for key, subtree in tree.items()]
+        
+        def fill_container(node: Any, resolve: Callable[[str], Any]) -> Any:
+            copy = node.copy()
+            for key, filler in fillers:
+                copy[key] = filler(node[key], resolve)
+            return copy
+        return fill_container
+
+
+class ItemTemplateBinder(CompiledTemplate):
+    """List item template compiled once and bound to each item in turn.
+    
+    Variables may be dotted paths into the item (e.g. `{{user.name}}` or
+    `{{tags.0}}`). Non-dict items replace every variable with str(item).
+    """
+    
+    def __init__(self, template: Any):
+        super().__init__(template, interpolate=True)
+        self._paths = {name: tuple(name.split('.')) for name in self.variables}
+    
+    def bind_item(self, item: Any) -> Dict[str, Any]:
+        """Return the component specification for one item."""
+        if isinstance(item, dict):
+            paths = self._paths
+            result = self.bind(
+                lambda name: item[name] if name in item else _lookup_path(item, paths[name])
+            )
+        else:
+            text = str(item)
+            result = self.bind(lambda name: text)
         
-        result = replace_variables(spec)
         # Ensure we return a dictionary
         if not isinstance(result, dict):
             return {'component': 'Text', 'props': {'text': str(result)}}
         return result
 
 
+def _lookup_path(item: Any, path: Tuple[str, ...]) -> Any:
+    """Resolve a dotted path in nested dicts and lists, or return _MISSING."""
+    value = item
+    for key in path:
+        if isinstance(value, dict):
+            value = value.get(key, _MISSING)
+        elif isinstance(value, list) and key.isdigit() and int(key) < len(value):
+            value = value[int(key)]
+        else:
+            return _MISSING
+        if value is _MISSING:
+            return _MISSING
+    return value
+
+
+@dataclass(frozen=True, slots=True)
+class RenderPlan:
+    """Immutable, pre-resolved rendering instructions for a component tree.
+    
+    Templates are already expanded, the component class is resolved and the
+    style and event declarations are parsed, so rendering a plan does no
+    specification parsing at all. Plans made by MondrUIRenderer.compile()
+    are validated, so their props are not checked again on render.
+    """
+    component: str
+    component_class: Type[BaseComponent]
+    props: Mapping[str, Any]
+    style: ComponentStyle
+    events: Tuple[EventHandler, ...]
+    children: Any = ()  # Tuple of child RenderPlans, or the raw value if not a list
+    validated: bool = field(default=False, compare=False)
+
+
+class RenderedNode:
+    """A rendered component: its plan, component instance, element and child nodes."""
+    
+    __slots__ = ('plan', 'component', 'element', 'children')
+    
+    def __init__(self, plan: RenderPlan, component: BaseComponent):
+        self.plan = plan
+        self.component = component
+        self.element: Any = None
+        self.children: List['RenderedNode'] = []
+    
+    @property
+    def key(self) -> Any:
+        """Identity used to match this node against a new spec on update."""
+        return _plan_key(self.plan)
+
+
+def _plan_key(plan: RenderPlan) -> Any:
+    """Return the explicit `key` or `id` prop of a plan, or None."""
+    key = plan.props.get('key')
+    return key if key is not None else plan.props.get('id')
+
+
+def _unique_keys(keys: List[Any]) -> bool:
+    """Whether the explicit keys among a list of child keys are all different."""
+    explicit = [key for key in keys if key is not None]
+    try:
+        return len(set(explicit)) == len(explicit)
+    except TypeError:  # Unhashable keys cannot be matched by key
+        return False
+
+
+@dataclass(frozen=True, slots=True)
+class RenderTiming:
+    """Measurements of one rendered component, including its descendants."""
+    component: str
+    depth: int
+    wall_time: float  # Seconds
+    elements: int  # NiceGUI elements created
+
+
+class RenderHook:
+    """Base class for render instrumentation hooks.
+    
+    Hooks are only called while at least one is registered with
+    MondrUIRenderer.add_render_hook(); override the methods of interest.
+    """
+    
+    def before_render(self, plan: RenderPlan, depth: int) -> None:
+        """Called before a component is rendered."""
+    
+    def after_render(self, plan: RenderPlan, timing: RenderTiming) -> None:
+        """Called after a component and its children are rendered."""
+    
+    def after_template(self, name: str, wall_time: float) -> None:
+        """Called after a template is expanded."""
+
+
+class ProfileFrame:
+    """One rendered component in a profile tree."""
+    
+    __slots__ = ('component', 'depth', 'wall_time', 'elements', 'children')
+    
+    def __init__(self, component: str, depth: int):
+        self.component = component
+        self.depth = depth
+        self.wall_time = 0.0
+        self.elements = 0
+        self.children: List['ProfileFrame'] = []
+    
+    @property
+    def self_time(self) -> float:
+        """Time spent in this component, excluding its child components."""
+        return max(self.wall_time - sum(child.wall_time for child in self.children), 0.0)
+    
+    @property
+    def self_elements(self) -> int:
+        """Elements created by this component itself."""
+        return self.elements - sum(child.elements for child in self.children)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Nested {name, value, children} dict, as used by flamegraph viewers."""
+        return {
+            'name': self.component,
+            'value': self.wall_time,
+            'elements': self.elements,
+            'children': [child.to_dict() for child in self.children]
+        }
+
+
+class RenderProfile(RenderHook):
+    """Profile report collected by MondrUIRenderer.profile()."""
+    
+    def __init__(self):
+        self.roots: List[ProfileFrame] = []
+        self.template_time = 0.0
+        self.template_expansions = 0
+        self.max_depth = 0
+        self.wall_time = 0.0
+        self._stack: List[ProfileFrame] = []
+    
+    def before_render(self, plan: RenderPlan, depth: int) -> None:
+        frame = ProfileFrame(plan.component, depth)
+        (self._stack[-1].children if self._stack else self.roots).append(frame)
+        self._stack.append(frame)
+        self.max_depth = max(self.max_depth, depth)
+    
+    def after_render(self, plan: RenderPlan, timing: RenderTiming) -> None:
+        frame = self._stack.pop()
+        frame.wall_time = timing.wall_time
+        frame.elements = timing.elements
+    
+    def after_template(self, name: str, wall_time: float) -> None:
+        self.template_time += wall_time
+        self.template_expansions += 1
+    
+    def frames(self) -> List[ProfileFrame]:
+        """All frames, depth first."""
+        result: List[ProfileFrame] = []
+        stack = list(reversed(self.roots))
+        while stack:
+            frame = stack.pop()
+            result.append(frame)
+            stack.extend(reversed(frame.children))
+        return result
+    
+    def by_component(self) -> Dict[str, Dict[str, Any]]:
+        """Aggregate count, self time and self element count per component type."""
+        totals: Dict[str, Dict[str, Any]] = {}
+        for frame in self.frames():
+            entry = totals.setdefault(frame.component, {'count': 0, 'self_time': 0.0, 'elements': 0})
+            entry['count'] += 1
+            entry['self_time'] += frame.self_time
+            entry['elements'] += frame.self_elements
+        return totals
+    
+    def collapsed_stacks(self) -> List[str]:
+        """Folded stack lines ("Form;Input 1234", in microseconds) for flamegraph tools."""
+        lines = []
+        
+        def walk(frame: ProfileFrame, prefix: str) -> None:
+            stack = f'{prefix};{frame.component}' if prefix else frame.component
+            lines.append(f'{stack} {round(frame.self_time * 1e6)}')
+            for child in frame.children:
+                walk(child, stack)
+        
+        for root in self.roots:
+            walk(root, '')
+        return lines
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Structured report: the frame tree plus summary figures."""
+        return {
+            'wall_time': self.wall_time,
+            'template_time': self.template_time,
+            'template_expansions': self.template_expansions,
+            'max_depth': self.max_depth,
+            'elements': sum(root.elements for root in self.roots),
+            'components': self.by_component(),
+            'tree': [root.to_dict() for root in self.roots]
+        }
+
+
+class RenderHandle:
+    """A rendered MondrUI tree that can be updated in place and disposed of."""
+    
+    def __init__(self, renderer: 'MondrUIRenderer', spec: Dict[str, Any], node: RenderedNode,
+                 client: Any = None):
+        self.renderer = renderer
+        self.spec = spec
+        self.node = node
+        # Weak, like a NiceGUI element's, so trees kept by the renderer do not keep their client alive
+        self._client = weakref.ref(client) if client is not None else None
+        self.disposed = False
+    
+    @property
+    def client(self) -> Any:
+        """The client the tree was rendered for, or None once it is gone."""
+        return self._client() if self._client is not None else None
+    
+    @property
+    def element(self) -> Any:
+        """The root NiceGUI element."""
+        return self.node.element
+    
+    @property
+    def is_live(self) -> bool:
+        """Whether the tree is neither disposed of nor deleted with its parent."""
+        element = self.node.element
+        return not self.disposed and element is not None and not element.is_deleted
+    
+    def update(self, spec: Dict[str, Any]) -> 'RenderHandle':
+        """Patch the rendered tree to match a new specification."""
+        return self.renderer.update(self, spec)
+    
+    def dispose(self) -> None:
+        """Delete the rendered elements and drop the references to them and their handlers.
+        
+        Disposing of a disposed handle does nothing.
+        """
+        if self.disposed:
+            return
+        self.disposed = True
+        self.renderer._untrack(self)
+        _dispose_nodes(self.node)
+    
+    def release(self) -> None:
+        """Give the tree back to the renderer's pool for reuse, or dispose of it if it does not pool."""
+        self.renderer.release(self)
+    
+    def dispose_on_close(self, dialog: Any, delete_dialog: bool = True, recycle: bool = False) -> 'RenderHandle':
+        """Dispose of the tree when a dialog is closed, deleting the dialog as well by default.
+        
+        With recycle=True the tree is released for reuse instead.
+        """
+        def on_close(e: Any) -> None:
+            if e.value:
+                return
+            if recycle:
+                self.release()
+            else:
+                self.dispose()
+            if delete_dialog and not dialog.is_deleted:
+                dialog.delete()
+        
+        dialog.on_value_change(on_close)
+        return self
+
+
+def _drop_event_handlers(element: Any) -> None:
+    """Forget the event listeners of a deleted element, and the closures they hold."""
+    listeners = getattr(element, '_event_listeners', None)
+    if listeners is None:
+        listeners = getattr(element, 'handlers', None)
+    if listeners is not None:
+        listeners.clear()
+
+
+def _dispose_nodes(node: RenderedNode) -> None:
+    """Delete the elements of a tree of nodes and drop the references to them."""
+    element = node.element
+    if element is not None:
+        elements = list(element.descendants(include_self=True))
+        if not element.is_deleted:
+            element.delete()
+        for deleted in elements:
+            _drop_event_handlers(deleted)
+    _release_nodes(node)
+
+
+def _shape(value: Any) -> Any:
+    """The structure of a spec value, with scalars replaced by their type names."""
+    if isinstance(value, Mapping):
+        return {key: _shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_shape(item) for item in value]
+    return type(value).__name__
+
+
+def _structure_key(plan: RenderPlan) -> str:
+    """Key under which trees of structurally identical plans are pooled."""
+    return spec_fingerprint([plan.component, plan.events, _shape(plan.props)])
+
+
+def _release_nodes(node: RenderedNode) -> None:
+    """Drop the element and child references of a disposed tree of nodes."""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        stack.extend(node.children)
+        node.children = []
+        node.element = None
+
+
 class MondrUIRenderer:
     """Generic, extensible UI renderer."""
     
-    def __init__(self):
-        """Initialize with standard component registry."""
+    def __init__(self, plan_cache_size: int = 256, backend: Any = None,
+                 max_live_trees: Optional[int] = None, pool_size: int = 0,
+                 shared_cache: Optional[LRUCache] = SHARED_PLAN_CACHE):
+        """Initialize with standard component registry.
+        
+        Components create their elements through `self.ui`, which is
+        `nicegui.ui` unless another element backend is given (such as
+        mondrui_memory.MemoryUI for headless rendering).
+        
+        Plans missing from the renderer's own plan cache are looked up in
+        shared_cache, which by default is shared by all renderers in the
+        process; renderers with the same components and templates then
+        hold one copy of each compiled spec. Pass None to opt out.
+        
+        With max_live_trees set, rendering a tree disposes of the oldest
+        live trees of the same client beyond that number. With pool_size
+        set, up to that many trees per client given back with release()
+        are kept hidden and reused by render_ui() for structurally
+        identical specs, patching their props instead of rebuilding them.
+        """
+        self.ui = backend if backend is not None else ui
         self.component_registry: Dict[str, Type[BaseComponent]] = {
             'Container': ContainerComponent,
             'Text': TextComponent,
@@ -525,10 +1772,41 @@ class MondrUIRenderer:
         
         # Register template components
         self.template_registry: Dict[str, Dict[str, Any]] = {}
+        self._compiled_templates: Dict[str, CompiledTemplate] = {}
         self._register_builtin_templates()
         
         self.action_handlers: Dict[str, Callable] = {}
+        self.event_bindings: Dict[EventType, EventBinding] = dict(DEFAULT_EVENT_BINDINGS)
         self.theme: Dict[str, Any] = self._default_theme()
+        
+        # Compiled render plans and validation verdicts keyed by canonical spec hash
+        self.plan_cache = LRUCache(plan_cache_size)
+        self.verdict_cache = LRUCache(plan_cache_size)
+        self.html_cache = LRUCache(plan_cache_size)
+        self.shared_cache = shared_cache
+        self._update_registry_key()
+        
+        # Nodes currently being rendered, innermost last
+        self._node_stack: List[RenderedNode] = []
+        
+        # States of the forms whose fields are being rendered, innermost last
+        self._form_states: List[FormState] = []
+        
+        # Instrumentation; rendering takes the uninstrumented path while empty
+        self._render_hooks: List[RenderHook] = []
+        
+        # Trees returned by render_ui() and not disposed of yet, oldest first, per client;
+        # handles refer to their client weakly, so entries go away with it
+        self.max_live_trees = max_live_trees
+        self._live_trees: 'weakref.WeakKeyDictionary[Any, List[RenderHandle]]' = weakref.WeakKeyDictionary()
+        
+        # Released trees per client as (structure key, node), oldest first,
+        # kept in a hidden container per client
+        self.pool_size = pool_size
+        self._pools: 'weakref.WeakKeyDictionary[Any, List[Tuple[str, RenderedNode]]]' = weakref.WeakKeyDictionary()
+        self._pool_holders: 'weakref.WeakKeyDictionary[Any, Any]' = weakref.WeakKeyDictionary()
+        self._pool_hits = 0
+        self._pool_misses = 0
     
     def _default_theme(self) -> Dict[str, Any]:
         """Default theme configuration."""
@@ -586,34 +1864,570 @@ class MondrUIRenderer:
                 ]
             }
         }
+        
+        self._compile_templates()
     
     def register_component(self, name: str, component_class: Type[BaseComponent]):
         """Register a new component type."""
         if not issubclass(component_class, BaseComponent):
             raise ValueError("Component must inherit from BaseComponent")
         self.component_registry[name] = component_class
+        self._update_registry_key()
+        self.plan_cache.clear()
+        self.verdict_cache.clear()
+        self.html_cache.clear()
     
     def register_template(self, name: str, template_spec: Dict[str, Any]):
         """Register a new template."""
+        previous = self.template_registry.get(name)
         self.template_registry[name] = template_spec
+        # Recompile all templates, since others may reference this one
+        try:
+            self._compile_templates()
+        except ValueError:
+            if previous is None:
+                del self.template_registry[name]
+            else:
+                self.template_registry[name] = previous
+            self._compile_templates()
+            raise
+        self._update_registry_key()
+        self.plan_cache.clear()
+        self.verdict_cache.clear()
+        self.html_cache.clear()
     
     def register_action_handler(self, action: str, handler: Callable):
         """Register an action handler."""
         self.action_handlers[action] = handler
     
+    def register_event_binding(self, event_type: EventType, binding: EventBinding):
+        """Register how an event type is wired to element events."""
+        self.event_bindings[event_type] = binding
+    
     def set_theme(self, theme: Dict[str, Any]):
         """Set custom theme."""
         self.theme.update(theme)
     
-    def render_ui(self, spec: Dict[str, Any]) -> Any:
-        """Render a UI component tree from specification."""
+    def render_ui(self, spec: Dict[str, Any]) -> RenderHandle:
+        """Render a UI component tree from specification.
+        
+        Returns a handle to the rendered tree, which can be passed to update().
+        """
+        if spec.get('type') != 'ui.render':
+            raise ValueError("Specification must have type 'ui.render'")
+        
+        plan = self.compile(spec)
+        client = self.ui.context.client
+        node = self._acquire(plan, client) if self.pool_size else None
+        if node is None:
+            node = self._render_node(plan)
+        handle = RenderHandle(self, spec, node, client)
+        self._track(handle)
+        return handle
+    
+    def release(self, handle: RenderHandle) -> None:
+        """Give a rendered tree back for reuse by render_ui().
+        
+        The tree is hidden and kept in the client's pool; the handle is
+        disposed of, but its elements live on. Without pooling the tree is
+        disposed of.
+        """
+        if handle.disposed:
+            return
+        node = handle.node
+        if not self.pool_size or node.element is None or node.element.is_deleted or handle.client is None:
+            handle.dispose()
+            return
+        
+        handle.disposed = True
+        self._untrack(handle)
+        handle.node = RenderedNode(node.plan, node.component)
+        node.element.move(target_container=self._pool_holder(handle.client))
+        
+        pool = self._pools.setdefault(handle.client, [])
+        pool.append((_structure_key(node.plan), node))
+        while len(pool) > self.pool_size:
+            _dispose_nodes(pool.pop(0)[1])
+    
+    def _pool_holder(self, client: Any) -> Any:
+        """The hidden container of a client's pooled trees."""
+        holder = self._pool_holders.get(client)
+        if holder is None or holder.is_deleted:
+            with client.layout:
+                holder = self.ui.element('div')
+            holder.set_visibility(False)
+            self._pool_holders[client] = holder
+        return holder
+    
+    def _acquire(self, plan: RenderPlan, client: Any) -> Optional[RenderedNode]:
+        """Take a pooled tree of the same structure, move it here and patch it to match the plan."""
+        pool = self._pools.get(client, [])
+        pool[:] = [(key, node) for key, node in pool if not node.element.is_deleted]
+        key = _structure_key(plan)
+        index = next((index for index, (pooled_key, _) in enumerate(pool) if pooled_key == key), None)
+        if index is None:
+            self._pool_misses += 1
+            return None
+        
+        self._pool_hits += 1
+        _, node = pool.pop(index)
+        node.element.move(target_container=self.ui.context.slot.parent)
+        return self._reconcile(node, plan, reset=True)
+    
+    def render_html(self, spec: Dict[str, Any]) -> str:
+        """Render a specification as static, read-only HTML.
+        
+        The spec is rendered into an in-memory tree and serialized with the
+        NiceGUI/Tailwind classes of the live elements. Markup is cached by
+        canonical spec hash.
+        """
+        if spec.get('type') != 'ui.render':
+            raise ValueError("Specification must have type 'ui.render'")
+        
+        key = spec_fingerprint(spec)
+        markup = self.html_cache.get(key)
+        if markup is None:
+            plan = self.compile(spec)
+            backend, self.ui = self.ui, MemoryUI()
+            node_stack, self._node_stack = self._node_stack, []
+            form_states, self._form_states = self._form_states, []
+            try:
+                markup = element_to_html(self._render_node(plan).element)
+            finally:
+                self.ui = backend
+                self._node_stack = node_stack
+                self._form_states = form_states
+            self.html_cache.put(key, markup)
+        return markup
+    
+    def render_static(self, spec: Dict[str, Any]) -> Any:
+        """Render a read-only view of a specification, e.g. for transcripts.
+        
+        Creates a single HTML element instead of a live element tree.
+        """
+        return self.ui.html(self.render_html(spec))
+    
+    def render_prerendered(self, spec: Dict[str, Any],
+                           on_hydrated: Optional[Callable[[RenderHandle], Any]] = None) -> Any:
+        """Show static HTML for a specification at once, then hydrate it.
+        
+        The live elements are rendered by a one-shot timer after the static
+        markup has been sent, and replace it in the returned container.
+        on_hydrated receives the handle of the live tree.
+        """
         if spec.get('type') != 'ui.render':
             raise ValueError("Specification must have type 'ui.render'")
         
-        return self.render_component(spec)
+        container = self.ui.element('div')
+        with container:
+            placeholder = self.ui.html(self.render_html(spec))
+        
+        def hydrate() -> None:
+            with container:
+                handle = self.render_ui(spec)
+            placeholder.delete()
+            if on_hydrated:
+                on_hydrated(handle)
+        
+        self.ui.timer(0, hydrate, once=True)
+        return container
     
-    def render_component(self, spec: Dict[str, Any]) -> Any:
-        """Render a single component from specification."""
+    def update(self, handle: RenderHandle, spec: Dict[str, Any]) -> RenderHandle:
+        """Update a rendered tree to match a new specification.
+        
+        The new spec is diffed against the rendered one. Components are matched
+        by their `key` or `id` prop (else, or if keys repeat among siblings,
+        by position and type), and only the elements whose props, styles,
+        events or children changed are patched or re-rendered.
+        """
+        if spec.get('type') != 'ui.render':
+            raise ValueError("Specification must have type 'ui.render'")
+        if handle.disposed:
+            raise ValueError("Cannot update a disposed render handle")
+        
+        handle.node = self._reconcile(handle.node, self.compile(spec))
+        handle.spec = spec
+        return handle
+    
+    def render_component(self, spec: Union[Dict[str, Any], RenderPlan], cache: bool = True) -> Any:
+        """Render a single component from specification or compiled plan.
+        
+        Set cache=False for one-off specs (e.g. per-item list rows) that
+        would only evict reusable plans from the cache.
+        """
+        plan = spec if isinstance(spec, RenderPlan) else self.compile(spec, cache=cache)
+        return self.render_plan(plan)
+    
+    def render_plan(self, plan: RenderPlan) -> Any:
+        """Render a compiled plan."""
+        return self._render_node(plan).element
+    
+    @contextmanager
+    def collect_fields(self, state: FormState) -> Iterator[FormState]:
+        """Add the fields rendered inside the block to a form state."""
+        self._form_states.append(state)
+        try:
+            yield state
+        finally:
+            self._form_states.pop()
+    
+    def bind_field(self, component: BaseComponent, elements: Any,
+                   read: Optional[Callable[[], Any]] = None) -> bool:
+        """Add a component's value element(s) to the enclosing form as a field.
+        
+        The field is keyed by the component's `id` and synced according to
+        its `sync` and `debounce` props. Returns False (and does nothing) for
+        components without an id or outside a form.
+        """
+        field_id = component.props.get('id')
+        if not self._form_states or field_id in (None, ''):
+            return False
+        self._form_states[-1].add_field(
+            field_id, elements, read,
+            policy=SyncPolicy(component.props.get('sync') or SyncPolicy.LAZY.value),
+            debounce=component.props.get('debounce') or 300
+        )
+        return True
+    
+    def add_render_hook(self, hook: RenderHook) -> None:
+        """Register an instrumentation hook called around every component render."""
+        self._render_hooks.append(hook)
+    
+    def remove_render_hook(self, hook: RenderHook) -> None:
+        """Unregister an instrumentation hook."""
+        self._render_hooks.remove(hook)
+    
+    @contextmanager
+    def profile(self) -> Iterator[RenderProfile]:
+        """Profile the renders inside the block.
+        
+        Usage:
+            with renderer.profile() as report:
+                renderer.render_ui(spec)
+            print(report.to_dict())
+        """
+        report = RenderProfile()
+        self.add_render_hook(report)
+        start = time.perf_counter()
+        try:
+            yield report
+        finally:
+            report.wall_time = time.perf_counter() - start
+            self.remove_render_hook(report)
+    
+    def _render_node(self, plan: RenderPlan) -> RenderedNode:
+        """Render a plan, through the render hooks if any are registered."""
+        if self._render_hooks:
+            return self._render_node_instrumented(plan)
+        return self._build_node(plan)
+    
+    def _build_node(self, plan: RenderPlan) -> RenderedNode:
+        """Render a plan and record it in the tree of the enclosing render."""
+        component = plan.component_class(
+            plan.component, plan.props,
+            style=plan.style, events=list(plan.events), children=plan.children
+        )
+        
+        if not plan.validated and not component.validate_props():
+            raise ValueError(f"Invalid properties for component: {plan.component}")
+        
+        node = RenderedNode(plan, component)
+        parent = self._node_stack[-1] if self._node_stack else None
+        self._node_stack.append(node)
+        try:
+            node.element = component.render(self)
+        finally:
+            self._node_stack.pop()
+        
+        if parent is not None:
+            parent.children.append(node)
+        return node
+    
+    def _render_node_instrumented(self, plan: RenderPlan) -> RenderedNode:
+        """Render a plan, calling the render hooks around it."""
+        hooks = list(self._render_hooks)
+        depth = len(self._node_stack)
+        for hook in hooks:
+            hook.before_render(plan, depth)
+        
+        client = self.ui.context.client
+        first_id = client.next_element_id
+        start = time.perf_counter()
+        try:
+            return self._build_node(plan)
+        finally:
+            timing = RenderTiming(plan.component, depth, time.perf_counter() - start,
+                                  client.next_element_id - first_id)
+            for hook in hooks:
+                hook.after_render(plan, timing)
+    
+    def _reconcile(self, node: RenderedNode, plan: RenderPlan, reset: bool = False) -> RenderedNode:
+        """Patch a rendered node to match a plan; return the node now in place.
+        
+        With reset=True (for reused trees) user input held by the elements
+        is discarded as well.
+        """
+        old = node.plan
+        if old == plan and not reset:
+            return node
+        if old.component_class is not plan.component_class or old.events != plan.events:
+            return self._replace_node(node, plan)
+        
+        component = node.component
+        refilled = False
+        if ((component._changed_props(plan.props) and not component.patch(node.element, plan.props))
+                or (reset and not component.reset(node.element, plan.props))):
+            if not self._refill_node(node, plan):
+                return self._replace_node(node, plan)
+            refilled = True
+        
+        if old.children != plan.children:
+            if not (component.keyed_children and isinstance(plan.children, tuple)
+                    and isinstance(old.children, tuple)):
+                return self._replace_node(node, plan)
+            self._reconcile_children(node, plan.children, reset)
+        elif reset and not refilled:
+            node.children = [self._reconcile(child, child.plan, reset=True) for child in node.children]
+        
+        if old.style != plan.style:
+            old.style.remove_from_element(node.element)
+            plan.style.apply_to_element(node.element)
+        
+        node.plan = plan
+        component.props = plan.props
+        component.style = plan.style
+        component.children = plan.children
+        return node
+    
+    def _reconcile_children(self, node: RenderedNode, plans: Tuple[Any, ...], reset: bool = False) -> None:
+        """Match child nodes to new child plans by key, then patch, add, remove and reorder."""
+        container = node.element
+        old_keys = [child.key for child in node.children]
+        new_keys = [_plan_key(plan) for plan in plans]
+        # Duplicate keys cannot identify children; match them all by position then
+        keyed = _unique_keys(old_keys) and _unique_keys(new_keys)
+        
+        def match_key(key: Any, index: int, component: str) -> Any:
+            return ('key', key) if keyed and key is not None else ('index', index, component)
+        
+        remaining: Dict[Any, RenderedNode] = {}
+        for index, (child, key) in enumerate(zip(node.children, old_keys)):
+            remaining[match_key(key, index, child.plan.component)] = child
+        
+        new_children = []
+        for index, (plan, key) in enumerate(zip(plans, new_keys)):
+            match = remaining.pop(match_key(key, index, plan.component), None)
+            if match is not None:
+                new_children.append(self._reconcile(match, plan, reset))
+            else:
+                with container:
+                    new_children.append(self._render_node(plan))
+        
+        for child in remaining.values():
+            _dispose_nodes(child)
+        
+        # Put the child elements in spec order, after any elements the
+        # component renders itself (such as a card title)
+        children_elements = {id(child.element) for child in new_children}
+        slot_children = container.default_slot.children
+        offset = sum(1 for element in slot_children if id(element) not in children_elements)
+        for index, child in enumerate(new_children):
+            if slot_children[offset + index] is not child.element:
+                child.element.move(target_index=offset + index)
+        
+        node.children = new_children
+    
+    def _refill_node(self, node: RenderedNode, plan: RenderPlan) -> bool:
+        """Let a node's component re-render its content in place; the new content becomes its children."""
+        children, node.children = node.children, []
+        self._node_stack.append(node)
+        try:
+            refilled = node.component.refill(node.element, plan.props, self)
+        finally:
+            self._node_stack.pop()
+        if not refilled:
+            node.children = children
+        return refilled
+    
+    def _replace_node(self, node: RenderedNode, plan: RenderPlan) -> RenderedNode:
+        """Re-render a node from scratch at the same position."""
+        element = node.element
+        parent_slot = element.parent_slot
+        index = parent_slot.children.index(element)
+        with parent_slot:
+            new_node = self._render_node(plan)
+        _dispose_nodes(node)
+        new_node.element.move(target_index=index)
+        return new_node
+    
+    def compile(self, spec: Dict[str, Any], cache: bool = True) -> RenderPlan:
+        """Compile a specification into an immutable render plan.
+        
+        The whole spec is validated first, so an invalid spec raises a
+        SpecValidationError before any element is created. Plans are cached
+        by canonical spec hash, so rendering the same specification again
+        skips all validation, template expansion and parsing. Plans hold a
+        frozen copy of the spec, so later changes to it cannot leak into
+        the cache or into other renderers sharing it.
+        """
+        if not cache:
+            errors: List[str] = []
+            self._validate_spec(spec, 'spec', errors)
+            if errors:
+                raise SpecValidationError(errors)
+            return self._compile_spec(spec)
+        
+        canonical = canonical_spec(spec)
+        key = spec_fingerprint(spec, canonical)
+        plan = self.plan_cache.get(key)
+        if plan is None:
+            shared_key = (self._registry_key, key)
+            if self.shared_cache is not None:
+                plan = self.shared_cache.get(shared_key)
+            if plan is None:
+                errors = self._cached_verdict(spec, key)
+                if errors:
+                    raise SpecValidationError(errors)
+                plan = self._compile_spec(spec)
+                if self.shared_cache is not None:
+                    self.shared_cache.put(shared_key, plan, len(canonical))
+            self.plan_cache.put(key, plan)
+        return plan
+    
+    def validate(self, spec: Dict[str, Any]) -> List[str]:
+        """Validate a whole specification tree in one pass.
+        
+        Returns a list of error messages (empty if the spec is valid).
+        Verdicts are cached by canonical spec hash.
+        """
+        return list(self._cached_verdict(spec, spec_fingerprint(spec)))
+    
+    def _cached_verdict(self, spec: Dict[str, Any], key: str) -> Tuple[str, ...]:
+        errors = self.verdict_cache.get(key)
+        if errors is None:
+            found: List[str] = []
+            self._validate_spec(spec, 'spec', found)
+            errors = tuple(found)
+            self.verdict_cache.put(key, errors)
+        return errors
+    
+    def _validate_spec(self, spec: Any, path: str, errors: List[str]) -> None:
+        """Check a spec and its children against the component schemas."""
+        if not isinstance(spec, dict):
+            errors.append(f"{path}: component specification must be an object")
+            return
+        
+        component_name = spec.get('component')
+        if not component_name:
+            errors.append(f"{path}: Component specification must include component name")
+            return
+        
+        props = spec.get('props', {})
+        if not isinstance(props, dict):
+            errors.append(f"{path}.props: expected dict, got {type(props).__name__}")
+            return
+        
+        if component_name in self.template_registry:
+            try:
+                expanded = self._expand_template(component_name, props)
+            except ValueError as e:
+                errors.append(f"{path}: {e}")
+                return
+            self._validate_spec(expanded, path, errors)
+            return
+        
+        component_class = self.component_registry.get(component_name)
+        if not component_class:
+            errors.append(f"{path}: Unknown component: {component_name}")
+            return
+        
+        component_class.validator()(props, f"{path}.props", errors)
+        
+        children = props.get('children')
+        if isinstance(children, list):
+            for index, child in enumerate(children):
+                if isinstance(child, dict):
+                    self._validate_spec(child, f"{path}.props.children[{index}]", errors)
+    
+    def get_plan_cache_stats(self) -> Dict[str, Any]:
+        """Get render plan cache statistics."""
+        return self.plan_cache.stats()
+    
+    def get_shared_cache_stats(self) -> Dict[str, Any]:
+        """Get statistics of the process-wide plan cache (empty if not shared)."""
+        return self.shared_cache.stats() if self.shared_cache is not None else {}
+    
+    def get_validation_cache_stats(self) -> Dict[str, Any]:
+        """Get validation verdict cache statistics."""
+        return self.verdict_cache.stats()
+    
+    def get_html_cache_stats(self) -> Dict[str, Any]:
+        """Get static HTML cache statistics."""
+        return self.html_cache.stats()
+    
+    def live_trees(self, client: Any = None) -> List[RenderHandle]:
+        """The live rendered trees of a client (by default the current one), oldest first."""
+        if client is None:
+            client = self.ui.context.client
+        handles = self._live_trees.get(client)
+        if not handles:
+            return []
+        # Trees deleted along with a parent element are no longer live
+        handles[:] = [handle for handle in handles if handle.is_live]
+        return list(handles)
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get element pool statistics."""
+        total = self._pool_hits + self._pool_misses
+        return {
+            'hits': self._pool_hits,
+            'misses': self._pool_misses,
+            'size': sum(len(pool) for pool in list(self._pools.values())),
+            'maxsize': self.pool_size,
+            'hit_rate': (self._pool_hits / total) if total else 0.0
+        }
+    
+    def get_live_tree_stats(self) -> Dict[str, Any]:
+        """Get the number of live rendered trees in total and per client."""
+        per_client = {
+            getattr(client, 'id', id(client)): len(self.live_trees(client))
+            for client in list(self._live_trees)
+        }
+        return {'clients': len(per_client), 'trees': sum(per_client.values()), 'per_client': per_client}
+    
+    def _track(self, handle: RenderHandle) -> None:
+        """Count a new tree as live and apply the max_live_trees policy.
+        
+        Trees deleted along with a parent element are forgotten here as well,
+        so callers clearing containers themselves do not keep them reachable.
+        """
+        handles = self._live_trees.setdefault(handle.client, [])
+        handles[:] = [live for live in handles if live.is_live]
+        handles.append(handle)
+        if self.max_live_trees is not None:
+            for old in handles[:max(0, len(handles) - self.max_live_trees)]:
+                old.dispose()
+    
+    def _untrack(self, handle: RenderHandle) -> None:
+        if handle.client is None:
+            return
+        handles = self._live_trees.get(handle.client)
+        if handles and handle in handles:
+            handles.remove(handle)
+    
+    def _update_registry_key(self) -> None:
+        """Identify the registries plans are compiled against, for the shared cache.
+        
+        The component classes themselves are part of the key, so a class
+        cannot be mistaken for a later one reusing its id.
+        """
+        self._registry_key = (
+            tuple(sorted(self.component_registry.items(), key=lambda item: item[0])),
+            spec_fingerprint(self.template_registry)
+        )
+    
+    def _compile_spec(self, spec: Dict[str, Any]) -> RenderPlan:
+        """Resolve templates, component class, styles and events for a spec tree."""
         component_name = spec.get('component')
         if not component_name:
             raise ValueError("Component specification must include component name")
@@ -622,38 +2436,73 @@ class MondrUIRenderer:
         
         # Check if this is a template
         if component_name in self.template_registry:
-            template_spec = self._expand_template(component_name, props)
-            return self.render_component(template_spec)
+            return self._compile_spec(self._expand_template(component_name, props))
         
         # Get component class
         component_class = self.component_registry.get(component_name)
         if not component_class:
             raise ValueError(f"Unknown component: {component_name}")
         
-        # Create and render component
-        component = component_class(component_name, props)
+        # Plans are cached and shared, so they must not see later changes to the spec
+        props = freeze(props)
+        children = props.get('children', [])
+        if isinstance(children, list):
+            children = tuple(
+                self._compile_spec(child) if isinstance(child, dict) else child
+                for child in children
+            )
         
-        if not component.validate_props():
-            raise ValueError(f"Invalid properties for component: {component_name}")
+        return RenderPlan(
+            component=component_name,
+            component_class=component_class,
+            props=props,
+            style=component_class._parse_style(props.get('style', {})),
+            events=tuple(component_class._parse_events(props.get('events', {}))),
+            children=children,
+            validated=True  # compile() validates the whole spec before compiling it
+        )
+    
+    def _compile_templates(self) -> None:
+        """Precompile every registered template."""
+        self._compiled_templates = {}
+        for name in self.template_registry:
+            self._compiled_templates[name] = self._compile_template(name)
+    
+    def _compile_template(self, name: str) -> CompiledTemplate:
+        """Flatten references to other templates and index the slots."""
+        return CompiledTemplate(self._flatten_template(self.template_registry[name], (name,)))
+    
+    def _flatten_template(self, obj: Any, resolving: Tuple[str, ...]) -> Any:
+        """Inline nested template references so expansion is a single pass."""
+        if isinstance(obj, list):
+            return [self._flatten_template(value, resolving) for value in obj]
+        if not isinstance(obj, dict):
+            return obj
         
-        return component.render(self)
+        flat = {key: self._flatten_template(value, resolving) for key, value in obj.items()}
+        name = flat.get('component')
+        if isinstance(name, str) and name in self.template_registry:
+            if name in resolving:
+                raise ValueError(f"Template {name} references itself")
+            inner = self._flatten_template(self.template_registry[name], resolving + (name,))
+            return CompiledTemplate(inner).expand(flat.get('props', {}))
+        return flat
     
     def _expand_template(self, template_name: str, props: Dict[str, Any]) -> Dict[str, Any]:
         """Expand a template with provided properties."""
-        template = self.template_registry[template_name]
-        
-        # Simple variable replacement
-        def replace_variables(obj):
-            if isinstance(obj, str) and obj.startswith('{{') and obj.endswith('}}'):
-                var_name = obj[2:-2].strip()
-                return props.get(var_name, obj)
-            elif isinstance(obj, dict):
-                return {k: replace_variables(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [replace_variables(v) for v in obj]
-            return obj
+        compiled = self._compiled_templates.get(template_name)
+        if compiled is None:
+            # Template was added to the registry directly
+            compiled = self._compiled_templates[template_name] = self._compile_template(template_name)
         
-        result = replace_variables(template)
+        if self._render_hooks:
+            start = time.perf_counter()
+            result = compiled.expand(props)
+            elapsed = time.perf_counter() - start
+            for hook in list(self._render_hooks):
+                hook.after_template(template_name, elapsed)
+        else:
+            result = compiled.expand(props)
         # Ensure we return a dictionary
         if not isinstance(result, dict):
             raise ValueError(f"Template {template_name} must expand to a dictionary")
@@ -664,11 +2513,37 @@ class MondrUIRenderer:
 _renderer = MondrUIRenderer()
 
 
-def render_ui(spec: Dict[str, Any]) -> Any:
+def render_ui(spec: Dict[str, Any]) -> RenderHandle:
     """Render a UI component tree from a MondrUI specification."""
     return _renderer.render_ui(spec)
 
 
+def update_ui(handle: RenderHandle, spec: Dict[str, Any]) -> RenderHandle:
+    """Update a rendered UI tree to match a new MondrUI specification."""
+    return _renderer.update(handle, spec)
+
+
+def render_html(spec: Dict[str, Any]) -> str:
+    """Render a MondrUI specification as static, read-only HTML."""
+    return _renderer.render_html(spec)
+
+
+def render_static(spec: Dict[str, Any]) -> Any:
+    """Render a read-only view of a MondrUI specification."""
+    return _renderer.render_static(spec)
+
+
+def render_prerendered(spec: Dict[str, Any],
+                       on_hydrated: Optional[Callable[[RenderHandle], Any]] = None) -> Any:
+    """Show static HTML for a MondrUI specification at once, then hydrate it."""
+    return _renderer.render_prerendered(spec, on_hydrated)
+
+
+def validate_spec(spec: Dict[str, Any]) -> List[str]:
+    """Validate a MondrUI specification; return a list of error messages."""
+    return _renderer.validate(spec)
+
+
 def register_component(name: str, component_class: Type[BaseComponent]):
     """Register a new component type globally."""
     _renderer.register_component(name, component_class)
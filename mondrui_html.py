@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+MondrUI static HTML rendering.
+
+Serializes an in-memory element tree (see mondrui_memory) into static,
+read-only HTML using the same NiceGUI/Quasar/Tailwind classes as the live
+elements, so a spec can be shown as a first paint before its NiceGUI
+elements exist, or in transcript views that never need interactivity.
+"""
+
+from html import escape
+from typing import Any, Callable, Dict, List
+
+from mondrui_memory import MemoryElement
+
+
+# Classes NiceGUI adds to its own elements
+DEFAULT_CLASSES: Dict[str, str] = {
+    'row': 'nicegui-row row',
+    'column': 'nicegui-column',
+    'grid': 'nicegui-grid',
+    'card': 'q-card nicegui-card',
+    'scroll_area': 'nicegui-scroll-area overflow-auto',
+    'button': 'q-btn q-btn--standard q-btn--rectangle bg-primary text-white q-px-md q-py-xs',
+}
+
+
+def element_to_html(element: MemoryElement) -> str:
+    """Render an element and its descendants as static HTML."""
+    parts: List[str] = []
+    _write(element, parts)
+    return ''.join(parts)
+
+
+def _write(element: MemoryElement, parts: List[str]) -> None:
+    if not element.visible:
+        return
+    writer = _WRITERS.get(element.tag, _write_container)
+    writer(element, parts)
+
+
+def _attributes(element: MemoryElement, extra_classes: str = '', extra_style: str = '',
+                **attributes: Any) -> str:
+    """Class, style and extra attributes of an element, escaped."""
+    classes = ' '.join(filter(None, [DEFAULT_CLASSES.get(element.tag, ''), extra_classes, ' '.join(element.classes)]))
+    style = '; '.join(filter(None, [extra_style] + [f'{key}: {value}' for key, value in element.style.items()]))
+    result = ''
+    if classes:
+        result += f' class="{escape(classes)}"'
+    if style:
+        result += f' style="{escape(style)}"'
+    for name, value in attributes.items():
+        if value is None or value is False:
+            continue
+        result += f' {name}' if value is True else f' {name}="{escape(str(value))}"'
+    return result
+
+
+def _write_children(element: MemoryElement, parts: List[str]) -> None:
+    for child in element.default_slot.children:
+        _write(child, parts)
+
+
+def _write_container(element: MemoryElement, parts: List[str]) -> None:
+    columns = element.props.get('columns') if element.tag == 'grid' else None
+    extra_style = f'grid-template-columns: repeat({columns}, minmax(0, 1fr))' if columns else ''
+    parts.append(f'<div{_attributes(element, extra_style=extra_style)}>')
+    _write_children(element, parts)
+    parts.append('</div>')
+
+
+def _write_label(element: MemoryElement, parts: List[str]) -> None:
+    parts.append(f'<div{_attributes(element)}>{escape(element.text or "")}</div>')
+
+
+def _write_html(element: MemoryElement, parts: List[str]) -> None:
+    # ui.html content is inserted verbatim by the live element as well
+    parts.append(f'<div{_attributes(element)}>{element.content or ""}</div>')
+
+
+def _write_button(element: MemoryElement, parts: List[str]) -> None:
+    parts.append(f'<button type="button"{_attributes(element, disabled=True)}>{escape(element.text or "")}</button>')
+
+
+def _write_input(element: MemoryElement, parts: List[str]) -> None:
+    input_type = 'number' if element.tag == 'number' else 'text'
+    attributes = _attributes(element, 'border rounded px-2 py-1', value=element.value,
+                             placeholder=element.props.get('placeholder') or None,
+                             required=bool(element.props.get('required')), disabled=True)
+    parts.append(f'<input type="{input_type}"{attributes}>')
+
+
+def _write_textarea(element: MemoryElement, parts: List[str]) -> None:
+    attributes = _attributes(element, 'border rounded px-2 py-1', placeholder=element.props.get('placeholder') or None,
+                             required=bool(element.props.get('required')), disabled=True)
+    parts.append(f'<textarea{attributes}>{escape(str(element.value or ""))}</textarea>')
+
+
+def _options(options: Any) -> List[tuple]:
+    """(value, label) pairs from a list or {value: label} mapping."""
+    if isinstance(options, dict):
+        return list(options.items())
+    return [(option, option) for option in options or []]
+
+
+def _write_select(element: MemoryElement, parts: List[str]) -> None:
+    parts.append(f'<select{_attributes(element, "border rounded px-2 py-1", disabled=True)}>')
+    for value, label in _options(element.props.get('options')):
+        selected = ' selected' if value == element.value else ''
+        parts.append(f'<option value="{escape(str(value))}"{selected}>{escape(str(label))}</option>')
+    parts.append('</select>')
+
+
+def _write_radio(element: MemoryElement, parts: List[str]) -> None:
+    inline = 'flex gap-4' if element.props.get('inline') else 'flex flex-col'
+    parts.append(f'<div{_attributes(element, inline)}>')
+    name = f'mondrui-radio-{element.id}'
+    for value, label in _options(element.props.get('options')):
+        checked = ' checked' if value == element.value else ''
+        parts.append(f'<label><input type="radio" name="{name}" value="{escape(str(value))}"{checked} disabled> '
+                     f'{escape(str(label))}</label>')
+    parts.append('</div>')
+
+
+def _write_checkbox(element: MemoryElement, parts: List[str]) -> None:
+    checked = ' checked' if element.value else ''
+    parts.append(f'<label{_attributes(element)}><input type="checkbox"{checked} disabled> '
+                 f'{escape(element.text or "")}</label>')
+
+
+def _write_slider(element: MemoryElement, parts: List[str]) -> None:
+    props = element.props
+    attributes = _attributes(element, 'w-full', min=props.get('min'), max=props.get('max'),
+                             step=props.get('step'), value=element.value, disabled=True)
+    parts.append(f'<input type="range"{attributes}>')
+
+
+def _write_nothing(element: MemoryElement, parts: List[str]) -> None:
+    pass
+
+
+_WRITERS: Dict[str, Callable[[MemoryElement, List[str]], None]] = {
+    'timer': _write_nothing,
+    'label': _write_label,
+    'html': _write_html,
+    'button': _write_button,
+    'input': _write_input,
+    'number': _write_input,
+    'textarea': _write_textarea,
+    'select': _write_select,
+    'radio': _write_radio,
+    'checkbox': _write_checkbox,
+    'slider': _write_slider,
+}
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+MondrUI in-memory rendering backend.
+
+A stand-in for `nicegui.ui` that builds a lightweight tree of MemoryElement
+objects instead of NiceGUI elements. It needs no client, page or server, so
+specs can be rendered, inspected and snapshot-compared in tests and batch
+jobs, and benchmarked without NiceGUI element overhead.
+
+Usage:
+    renderer = MondrUIRenderer(backend=MemoryUI())
+    handle = renderer.render_ui(spec)
+    assert handle.element.snapshot() == expected
+"""
+
+import asyncio
+import inspect
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from nicegui.classes import Classes
+from nicegui.helpers import expects_arguments
+from nicegui.props import Props
+from nicegui.style import Style
+
+
+class MemorySlot:
+    """The children of a MemoryElement; entering it makes it the parent of new elements."""
+    
+    __slots__ = ('parent', 'children')
+    
+    def __init__(self, parent: 'MemoryElement'):
+        self.parent = parent
+        self.children: List['MemoryElement'] = []
+    
+    def __enter__(self) -> 'MemorySlot':
+        self.parent.backend.slot_stack.append(self)
+        return self
+    
+    def __exit__(self, *_) -> None:
+        self.parent.backend.slot_stack.pop()
+
+
+class MemoryEventArguments:
+    """Arguments passed to handlers by MemoryElement.trigger()."""
+    
+    __slots__ = ('sender', 'args', 'value')
+    
+    def __init__(self, sender: 'MemoryElement', args: Any, value: Any):
+        self.sender = sender
+        self.args = args
+        self.value = value
+
+
+class MemoryElement:
+    """An element of the in-memory tree, with the element API MondrUI uses.
+    
+    Classes, style and props behave like their NiceGUI counterparts (they
+    are the same classes). Event handlers are recorded in `handlers` and can
+    be invoked with trigger().
+    """
+    
+    __slots__ = ('backend', 'id', 'tag', 'parent_slot', 'default_slot', 'text', 'content', 'value',
+                 'visible', 'handlers', 'is_deleted', '_classes', '_style', '_props', '__weakref__')
+    
+    def __init__(self, backend: 'MemoryUI', tag: str, *, text: Optional[str] = None,
+                 content: Optional[str] = None, value: Any = None, **props: Any):
+        self.backend = backend
+        self.id = backend.next_element_id
+        backend.next_element_id += 1
+        self.tag = tag
+        self.text = text
+        self.content = content
+        self.value = value
+        self.visible = True
+        self.handlers: Dict[str, List[Dict[str, Any]]] = {}
+        self.is_deleted = False
+        self._classes: Classes = Classes(element=self)
+        self._style: Style = Style(element=self)
+        self._props: Props = Props({key: value for key, value in props.items() if value is not None}, element=self)
+        self.default_slot = MemorySlot(self)
+        
+        self.parent_slot: Optional[MemorySlot] = backend.slot_stack[-1] if backend.slot_stack else None
+        if self.parent_slot is not None:
+            self.parent_slot.children.append(self)
+    
+    @property
+    def classes(self) -> Classes:
+        return self._classes
+    
+    @property
+    def style(self) -> Style:
+        return self._style
+    
+    @property
+    def props(self) -> Props:
+        return self._props
+    
+    def __enter__(self) -> 'MemoryElement':
+        self.default_slot.__enter__()
+        return self
+    
+    def __exit__(self, *_) -> None:
+        self.default_slot.__exit__()
+    
+    def on(self, type: str, handler: Optional[Callable[..., Any]] = None, args: Any = None, *,
+           throttle: float = 0.0, leading_events: bool = True, trailing_events: bool = True,
+           js_handler: Optional[str] = None) -> 'MemoryElement':
+        """Record an event listener."""
+        self.handlers.setdefault(type, []).append({
+            'handler': handler, 'args': args, 'throttle': throttle, 'js_handler': js_handler
+        })
+        return self
+    
+    def trigger(self, type: str, args: Any = None) -> None:
+        """Call the handlers registered for an event, as a browser event would.
+        
+        Async handlers are run to completion, or scheduled on the running
+        event loop if there is one.
+        """
+        arguments = MemoryEventArguments(self, args, self.value)
+        for listener in list(self.handlers.get(type, [])):
+            handler = listener['handler']
+            if handler is None:
+                continue
+            result = handler(arguments) if expects_arguments(handler) else handler()
+            if inspect.isawaitable(result):
+                try:
+                    asyncio.get_running_loop().create_task(result)
+                except RuntimeError:
+                    asyncio.run(result)
+    
+    def update(self) -> None:
+        """Nothing to send; the tree is the state."""
+    
+    def set_visibility(self, visible: bool) -> None:
+        self.visible = visible
+    
+    def move(self, target_container: Optional['MemoryElement'] = None, target_index: int = -1) -> None:
+        """Move the element to another container or position."""
+        target_slot = target_container.default_slot if target_container is not None else self.parent_slot
+        if self.parent_slot is not None:
+            self.parent_slot.children.remove(self)
+        if target_index < 0:
+            target_slot.children.append(self)
+        else:
+            target_slot.children.insert(target_index, self)
+        self.parent_slot = target_slot
+    
+    def remove(self, element: 'MemoryElement') -> None:
+        """Remove a child element."""
+        element.delete()
+    
+    def delete(self) -> None:
+        """Remove the element and its descendants from the tree."""
+        self.clear()
+        if self.parent_slot is not None:
+            self.parent_slot.children.remove(self)
+            self.parent_slot = None
+        self.is_deleted = True
+    
+    def clear(self) -> None:
+        """Remove all child elements."""
+        for child in list(self.default_slot.children):
+            child.delete()
+    
+    def descendants(self, include_self: bool = False) -> Iterator['MemoryElement']:
+        """Iterate over the descendants, depth first."""
+        if include_self:
+            yield self
+        for child in self.default_slot.children:
+            yield from child.descendants(include_self=True)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Plain-data representation of the subtree, for inspection and snapshot tests.
+        
+        Empty attributes are left out, and handlers are reduced to the names
+        of the events they listen to.
+        """
+        data: Dict[str, Any] = {'tag': self.tag}
+        for name in ('text', 'content', 'value'):
+            value = getattr(self, name)
+            if value is not None:
+                data[name] = value
+        if self._props:
+            data['props'] = dict(self._props)
+        if self._classes:
+            data['classes'] = list(self._classes)
+        if self._style:
+            data['style'] = dict(self._style)
+        if self.handlers:
+            data['events'] = sorted(self.handlers)
+        if not self.visible:
+            data['visible'] = False
+        if self.default_slot.children:
+            data['children'] = [child.snapshot() for child in self.default_slot.children]
+        return data
+    
+    def __repr__(self) -> str:
+        return f'<MemoryElement {self.tag} #{self.id}>'
+
+
+class MemoryContext:
+    """Stand-in for `nicegui.ui.context`: the backend is its own client."""
+    
+    __slots__ = ('client',)
+    
+    def __init__(self, backend: 'MemoryUI'):
+        self.client = backend
+    
+    @property
+    def slot(self) -> MemorySlot:
+        """The slot new elements are added to."""
+        return self.client.slot_stack[-1]
+
+
+class MemoryUI:
+    """Element backend creating MemoryElements; mirrors the `nicegui.ui` factories MondrUI uses.
+    
+    New elements are added to the innermost entered element or slot, or
+    else to `root`, which plays the part of the page; root.clear() discards
+    everything rendered so far.
+    """
+    
+    def __init__(self):
+        self.next_element_id = 0
+        self.slot_stack: List[MemorySlot] = []
+        self.timers: List[Tuple[MemoryElement, Callable[..., Any]]] = []
+        # Code passed to run_javascript(), oldest first
+        self.javascript: List[str] = []
+        self.root = MemoryElement(self, 'root')
+        self.slot_stack.append(self.root.default_slot)
+        # The page's top-level element, as `Client.layout`
+        self.layout = self.root
+        # Profiling reads `ui.context.client.next_element_id`
+        self.context = MemoryContext(self)
+    
+    def element(self, tag: str = 'div') -> MemoryElement:
+        return MemoryElement(self, tag)
+    
+    def row(self) -> MemoryElement:
+        return MemoryElement(self, 'row')
+    
+    def column(self) -> MemoryElement:
+        return MemoryElement(self, 'column')
+    
+    def grid(self, *, rows: Optional[int] = None, columns: Optional[int] = None) -> MemoryElement:
+        return MemoryElement(self, 'grid', rows=rows, columns=columns)
+    
+    def card(self) -> MemoryElement:
+        return MemoryElement(self, 'card')
+    
+    def scroll_area(self) -> MemoryElement:
+        return MemoryElement(self, 'scroll_area')
+    
+    def label(self, text: Any = '') -> MemoryElement:
+        return MemoryElement(self, 'label', text=str(text))
+    
+    def html(self, content: str = '') -> MemoryElement:
+        return MemoryElement(self, 'html', content=content)
+    
+    def button(self, text: str = '', *, icon: Optional[str] = None, **_: Any) -> MemoryElement:
+        return MemoryElement(self, 'button', text=text, icon=icon)
+    
+    def input(self, label: Optional[str] = None, *, placeholder: Optional[str] = None,
+              value: str = '', **_: Any) -> MemoryElement:
+        return MemoryElement(self, 'input', value=value, label=label, placeholder=placeholder)
+    
+    def textarea(self, label: Optional[str] = None, *, placeholder: Optional[str] = None,
+                 value: str = '', **_: Any) -> MemoryElement:
+        return MemoryElement(self, 'textarea', value=value, label=label, placeholder=placeholder)
+    
+    def number(self, label: Optional[str] = None, *, placeholder: Optional[str] = None,
+               value: Any = None, **_: Any) -> MemoryElement:
+        return MemoryElement(self, 'number', value=value, label=label, placeholder=placeholder)
+    
+    def select(self, options: Any, *, label: Optional[str] = None, value: Any = None,
+               **_: Any) -> MemoryElement:
+        return MemoryElement(self, 'select', value=value, label=label, options=options)
+    
+    def radio(self, options: Any, *, value: Any = None, **_: Any) -> MemoryElement:
+        return MemoryElement(self, 'radio', value=value, options=options)
+    
+    def checkbox(self, text: str = '', *, value: bool = False, **_: Any) -> MemoryElement:
+        return MemoryElement(self, 'checkbox', text=text or None, value=value)
+    
+    def timer(self, interval: float, callback: Callable[..., Any], *, active: bool = True,
+              once: bool = False, immediate: bool = True) -> MemoryElement:
+        """Record a timer; run_timers() calls the pending callbacks."""
+        element = MemoryElement(self, 'timer', interval=interval, once=once)
+        self.timers.append((element, callback))
+        return element
+    
+    def run_timers(self) -> None:
+        """Call the callback of every timer once, dropping once-only and deleted timers.
+        
+        A timer deleted by its own callback is dropped as well.
+        """
+        timers, self.timers = self.timers, []
+        for element, callback in timers:
+            if element.is_deleted:
+                continue
+            with element.parent_slot or self.root.default_slot:
+                callback()
+            if element.props.get('once'):
+                element.delete()
+            elif not element.is_deleted:
+                self.timers.append((element, callback))
+    
+    def run_javascript(self, code: str, *, timeout: float = 1.0) -> None:
+        """Record JavaScript sent to the page, as `Client.run_javascript`."""
+        self.javascript.append(code)
+    
+    def slider(self, *, min: float, max: float, step: float = 1.0, value: Any = None,
+               **_: Any) -> MemoryElement:
+        return MemoryElement(self, 'slider', value=value, min=min, max=max, step=step)
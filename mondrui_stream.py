@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+"""
+MondrUI streaming support.
+
+Extracts MondrUI JSON specifications from a streamed or complete response
+in a single pass, parsing them incrementally while the LLM response is
+still streaming, so completed parts of a spec (the form title, each
+finished entry in `fields`, ...) can be rendered as soon as they are
+closed:
+
+    extractor = SpecExtractor(on_value=lambda path, value: ...)
+    async for chunk in agent.send_message(question):
+        extractor.feed(chunk)
+        stream.append(extractor.new_prose())
+    prose, specs = extractor.finish()
+"""
+
+import json
+import re
+from bisect import bisect_right
+from typing import Any, Callable, List, Optional, Tuple
+
+
+JSONPath = Tuple[Any, ...]
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = re.compile(r'[ \t\r\n]*')
+_STRING_SPECIAL = re.compile(r'[\\"]')  # Ends or escapes within a string
+_STRUCTURAL = re.compile(r'[{}\[\],:"]|[ \t\r\n]+')  # Everything else is part of a scalar
+
+
+class _Frame:
+    """An open JSON object or array."""
+    
+    __slots__ = ('is_object', 'start', 'path', 'key', 'index', 'expecting_key')
+    
+    def __init__(self, is_object: bool, start: int, path: JSONPath):
+        self.is_object = is_object
+        self.start = start
+        self.path = path
+        self.key: Any = None
+        self.index = 0
+        self.expecting_key = is_object
+    
+    def child_path(self) -> JSONPath:
+        return self.path + ((self.key,) if self.is_object else (self.index,))
+
+
+class IncrementalJSONParser:
+    """Incremental JSON parser fed with arbitrary text chunks.
+    
+    Every value that completes at a depth of at most max_depth is reported
+    as a (path, value) pair, e.g. (('props', 'fields', 0), {...}) for the
+    first form field. Chunks are kept as received and positions are
+    absolute offsets into them, so feeding is linear in the input: regular
+    expressions skip to the next structural character or string quote, and
+    only the slices of the reported values are joined and decoded. With
+    max_depth 0, a root value that arrives whole in one chunk is decoded
+    directly.
+    """
+    
+    def __init__(self, max_depth: int = 3):
+        self.max_depth = max_depth
+        self.done = False
+        self.result: Any = None
+        self._chunks: List[str] = []
+        self._starts: List[int] = []  # Absolute offset of each chunk
+        self._length = 0
+        self._stack: List[_Frame] = []
+        self._in_string = False
+        self._escaped = False
+        self._token_start: Optional[int] = None  # Start of the current string or scalar
+    
+    @property
+    def buffer(self) -> str:
+        """The text consumed so far, up to the end of the root value."""
+        return ''.join(self._chunks)
+    
+    def feed(self, chunk: str) -> Tuple[List[Tuple[JSONPath, Any]], str]:
+        """Parse a chunk of text.
+        
+        Returns the values completed by this chunk and any text that follows
+        the end of the root value (which is not consumed).
+        """
+        if self.done:
+            return [], chunk
+        if not chunk:
+            return [], ''
+        
+        completed: List[Tuple[JSONPath, Any]] = []
+        base = self._length
+        self._chunks.append(chunk)
+        self._starts.append(base)
+        self._length += len(chunk)
+        stack = self._stack
+        
+        pos = 0
+        end = len(chunk)
+        if self.max_depth == 0 and not stack and self._token_start is None:
+            pos = self._decode_whole(chunk, completed)
+        
+        while pos < end and not self.done:
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                    pos += 1
+                    continue
+                match = _STRING_SPECIAL.search(chunk, pos)
+                if match is None:
+                    break
+                pos = match.start()
+                if chunk[pos] == '\\':
+                    self._escaped = True
+                else:
+                    self._in_string = False
+                    self._close_string(base + pos, completed)
+                pos += 1
+                continue
+            
+            match = _STRUCTURAL.search(chunk, pos)
+            if match is None:
+                if self._token_start is None:
+                    self._token_start = base + pos
+                break
+            if match.start() > pos and self._token_start is None:
+                self._token_start = base + pos
+            pos = match.start()
+            char = chunk[pos]
+            
+            if self._token_start is not None and char not in '"{[':
+                self._close_scalar(base + pos, completed)
+            
+            if char == '"':
+                self._in_string = True
+                self._token_start = base + pos
+            elif char == '{' or char == '[':
+                path = stack[-1].child_path() if stack else ()
+                stack.append(_Frame(char == '{', base + pos, path))
+            elif char == '}' or char == ']':
+                if stack:
+                    frame = stack.pop()
+                    self._complete(frame.path, frame.start, base + pos + 1, completed)
+                    if not stack:
+                        pos += 1
+                        break
+            elif char == ',':
+                if stack:
+                    frame = stack[-1]
+                    if frame.is_object:
+                        frame.expecting_key = True
+                    else:
+                        frame.index += 1
+            pos = match.end()
+        
+        if self.done:
+            self._chunks[-1] = chunk[:pos]
+            self._length = base + pos
+            return completed, chunk[pos:]
+        return completed, ''
+    
+    def _decode_whole(self, chunk: str, completed: List[Tuple[JSONPath, Any]]) -> int:
+        """Decode a root object or array held entirely by chunk; return where scanning resumes."""
+        start = _WHITESPACE.match(chunk).end()
+        if start == len(chunk) or chunk[start] not in '{[':
+            return 0
+        try:
+            self.result, end = _DECODER.raw_decode(chunk, start)
+        except json.JSONDecodeError:
+            return 0  # Incomplete or invalid: scan it instead
+        self.done = True
+        completed.append(((), self.result))
+        return end
+    
+    def _slice(self, start: int, end: int) -> str:
+        """The consumed text between two absolute offsets."""
+        chunks = self._chunks
+        starts = self._starts
+        first = bisect_right(starts, start) - 1
+        last = bisect_right(starts, end - 1) - 1
+        if first == last:
+            offset = starts[first]
+            return chunks[first][start - offset:end - offset]
+        parts = [chunks[first][start - starts[first]:]]
+        parts.extend(chunks[first + 1:last])
+        parts.append(chunks[last][:end - starts[last]])
+        return ''.join(parts)
+    
+    def _close_string(self, pos: int, completed: List[Tuple[JSONPath, Any]]) -> None:
+        start = self._token_start
+        self._token_start = None
+        frame = self._stack[-1] if self._stack else None
+        if frame is not None and frame.is_object and frame.expecting_key:
+            frame.key = json.loads(self._slice(start, pos + 1))
+            frame.expecting_key = False
+            return
+        path = frame.child_path() if frame is not None else ()
+        self._complete(path, start, pos + 1, completed)
+    
+    def _close_scalar(self, pos: int, completed: List[Tuple[JSONPath, Any]]) -> None:
+        start = self._token_start
+        self._token_start = None
+        frame = self._stack[-1] if self._stack else None
+        path = frame.child_path() if frame is not None else ()
+        self._complete(path, start, pos, completed)
+    
+    def _complete(self, path: JSONPath, start: int, end: int,
+                  completed: List[Tuple[JSONPath, Any]]) -> None:
+        if not path:
+            self.result = json.loads(self._slice(start, end))
+            self.done = True
+            completed.append((path, self.result))
+        elif len(path) <= self.max_depth:
+            completed.append((path, json.loads(self._slice(start, end))))
+
+
+def _is_spec(value: Any) -> bool:
+    """Whether a decoded JSON block is a MondrUI specification."""
+    return isinstance(value, dict) and value.get('type') == 'ui.render' and 'component' in value
+
+
+def _held_backticks(text: str, start: int) -> int:
+    """Length of a possible partial fence (one or two backticks) ending text[start:]."""
+    count = 0
+    while count < 2 and len(text) - count > start and text[len(text) - count - 1] == '`':
+        count += 1
+    return count
+
+
+class SpecExtractor:
+    """Single-pass extractor of MondrUI specs from a response fed in chunks.
+    
+    Tracks fenced code blocks across chunks; the JSON of ```json blocks is
+    followed by brace depth with an IncrementalJSONParser. Blocks holding
+    a `ui.render` spec are removed from the text and returned by feed() as
+    soon as their closing fence arrives; all other text, including other
+    code blocks, is kept in `prose`. Every character is scanned once, and
+    only the open block is buffered besides the prose.
+    
+    While a block streams in, on_value(path, value) is called for each of
+    its values that completes at a depth of at most max_depth, e.g. with
+    (('props', 'fields', 0), {...}) for the first form field.
+    """
+    
+    FENCE = '```'
+    JSON_FENCE = '```json'
+    
+    def __init__(self, on_value: Optional[Callable[[JSONPath, Any], Any]] = None, max_depth: int = 3):
+        self.on_value = on_value
+        self.max_depth = max_depth if on_value is not None else 0
+        self.specs: List[Any] = []
+        self._prose: List[str] = []
+        self._shown = 0  # Prose parts already returned by new_prose()
+        self._pending = ''  # Text held back until the next chunk decides what it is
+        self._state = 'prose'  # prose -> json -> closing -> prose, or prose -> code -> prose
+        self._parser: Optional[IncrementalJSONParser] = None
+        self._closing = ''  # Whitespace between a block's JSON and its closing fence
+    
+    @property
+    def prose(self) -> str:
+        """The text outside spec blocks received so far."""
+        return ''.join(self._prose)
+    
+    def new_prose(self) -> str:
+        """The prose received since the last call, e.g. to stream it to the chat."""
+        parts = self._prose[self._shown:]
+        self._shown = len(self._prose)
+        return ''.join(parts)
+    
+    def feed(self, chunk: str) -> List[Any]:
+        """Consume a chunk of the response; return the specs completed by it."""
+        completed: List[Any] = []
+        text = self._pending + chunk
+        self._pending = ''
+        pos = 0
+        while pos < len(text):
+            if self._state == 'prose':
+                pos = self._scan_prose(text, pos)
+            elif self._state == 'code':
+                pos = self._scan_code(text, pos)
+            elif self._state == 'json':
+                text, pos = self._scan_json(text, pos)
+            else:
+                text, pos = self._scan_closing(text, pos, completed)
+        return completed
+    
+    def finish(self) -> Tuple[str, List[Any]]:
+        """Flush held-back text at the end of the stream; return the prose and all specs.
+        
+        An unterminated block is kept in the prose as it was received.
+        """
+        if self._state in ('json', 'closing'):
+            self._prose.append(self.JSON_FENCE + self._parser.buffer + self._closing)
+            self._parser = None
+            self._closing = ''
+        self._prose.append(self._pending)
+        self._pending = ''
+        self._state = 'prose'
+        return self.prose, self.specs
+    
+    def _scan_prose(self, text: str, pos: int) -> int:
+        index = text.find(self.FENCE, pos)
+        if index < 0:
+            held = _held_backticks(text, pos)
+            self._prose.append(text[pos:len(text) - held])
+            self._pending = text[len(text) - held:]
+            return len(text)
+        
+        self._prose.append(text[pos:index])
+        tag_start = index + len(self.FENCE)
+        tag = text[tag_start:tag_start + 5]
+        if len(tag) < 5 and 'json'.startswith(tag[:4]):
+            # Not yet known whether this opens a ```json block
+            self._pending = text[index:]
+            return len(text)
+        if tag.startswith('json') and (tag[4].isspace() or tag[4] == '{'):
+            self._state = 'json'
+            self._parser = IncrementalJSONParser(max_depth=self.max_depth)
+            return tag_start + 4
+        self._state = 'code'
+        self._prose.append(self.FENCE)
+        return tag_start
+    
+    def _scan_code(self, text: str, pos: int) -> int:
+        index = text.find(self.FENCE, pos)
+        if index < 0:
+            held = _held_backticks(text, pos)
+            self._prose.append(text[pos:len(text) - held])
+            self._pending = text[len(text) - held:]
+            return len(text)
+        end = index + len(self.FENCE)
+        self._prose.append(text[pos:end])
+        self._state = 'prose'
+        return end
+    
+    def _scan_json(self, text: str, pos: int) -> Tuple[str, int]:
+        parser = self._parser
+        try:
+            values, rest = parser.feed(text[pos:])
+        except json.JSONDecodeError:
+            return self._as_code_block()
+        if self.on_value is not None:
+            for path, value in values:
+                self.on_value(path, value)
+        if not parser.done:
+            return text, len(text)
+        self._state = 'closing'
+        return rest, 0
+    
+    def _scan_closing(self, text: str, pos: int, completed: List[Any]) -> Tuple[str, int]:
+        start = pos
+        end = len(text)
+        while pos < end and text[pos].isspace():
+            pos += 1
+        self._closing += text[start:pos]
+        if pos == end:
+            return text, pos
+        
+        if not text.startswith(self.FENCE, pos):
+            if self.FENCE.startswith(text[pos:]):
+                self._pending = text[pos:]  # Fence may still be incomplete
+                return text, end
+            # Text between the JSON and the closing fence: not a spec block
+            buffered, _ = self._as_code_block()
+            return buffered + text[pos:], 0
+        
+        if _is_spec(self._parser.result):
+            completed.append(self._parser.result)
+            self.specs.append(self._parser.result)
+        else:
+            self._prose.append(self.JSON_FENCE + self._parser.buffer + self._closing + self.FENCE)
+        self._parser = None
+        self._closing = ''
+        self._state = 'prose'
+        return text, pos + len(self.FENCE)
+    
+    def _as_code_block(self) -> Tuple[str, int]:
+        """Treat the open ```json block as an ordinary code block; return the text to rescan."""
+        buffered = self._parser.buffer + self._closing
+        self._prose.append(self.JSON_FENCE)
+        self._parser = None
+        self._closing = ''
+        self._state = 'code'
+        return buffered, 0
+
+
+class StreamedFormParts:
+    """Decides which streamed values of a ```json block to build a form from.
+    
+    Keys may arrive in any order, so the title and fields of a spec can
+    complete before its `type`. Values are held back until the block is
+    known to describe a component (its `component` completes, or `type` is
+    `ui.render`), then released together; a block ending without that is
+    forgotten. complete() tells whether a finished spec was built in full.
+    """
+    
+    def __init__(self):
+        self.started = False
+        self.title = False
+        self.fields: set = set()
+        self._held: List[Tuple[JSONPath, Any]] = []
+    
+    def feed(self, path: JSONPath, value: Any) -> List[Tuple[JSONPath, Any]]:
+        """Take a completed value; return the values to render now, in order."""
+        if path == ():
+            # End of a block; values of a block that never became a spec are dropped
+            self._held.clear()
+            return []
+        if not self.started:
+            self._held.append((path, value))
+            if path != ('component',) and (path, value) != (('type',), 'ui.render'):
+                return []
+            self.started = True
+            released, self._held = self._held, []
+        else:
+            released = [(path, value)]
+        for part_path, part_value in released:
+            if part_path == ('props', 'title'):
+                self.title = True
+            elif len(part_path) == 3 and part_path[:2] == ('props', 'fields') and isinstance(part_value, dict):
+                self.fields.add(part_path[2])
+        return released
+    
+    def complete(self, spec: Any) -> bool:
+        """Whether the title and every field of a finished spec were released."""
+        props = spec.get('props', {}) if isinstance(spec, dict) else {}
+        fields = props.get('fields', [])
+        return (self.started and (self.title or 'title' not in props)
+                and self.fields == set(range(len(fields) if isinstance(fields, list) else 0)))
+
+
+def extract_mondrui_specs(text: str) -> Tuple[str, List[Any]]:
+    """Extract all MondrUI specs from a complete response.
+    
+    Returns (cleaned_text, specs), where cleaned_text is the response
+    without the spec blocks.
+    """
+    extractor = SpecExtractor()
+    extractor.feed(text)
+    prose, specs = extractor.finish()
+    return prose.strip(), specs
+
+
+def extract_mondrui_json(text: str) -> tuple[str, dict | None]:
+    """
+    Extract MondrUI JSON from AI response text.
+    Returns (cleaned_text, json_spec) where json_spec is None if no valid JSON found.
+    """
+    cleaned_text, specs = extract_mondrui_specs(text)
+    if not specs:
+        return text, None
+    return cleaned_text, specs[0]
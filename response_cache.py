@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Cache of model answers for the AI agent.
+
+Answers are keyed on the model, the system prompt, the history sent with
+the message and the message itself, and stored as the chunks they were
+streamed in, so a cached answer can be replayed through the same
+streaming code path. An in-memory LRU tier sits in front of an optional
+SQLite tier that survives restarts; it keeps the newest max_disk_entries
+answers, and answers older than max_age seconds are not replayed:
+
+    cache = ResponseCache(maxsize=256, path='responses.sqlite3', max_age=7 * 24 * 3600)
+    agent = AIAgent(response_cache=cache)
+"""
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import time
+from typing import Any, AsyncIterator, Dict, Iterable, Optional, Sequence, Tuple
+
+from langchain_core.messages import BaseMessage
+
+from lru_cache import LRUCache
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def response_key(model: str, system_prompt: str, history: Iterable[BaseMessage], message: str) -> str:
+    """Key of the answer to a message, given the model, system prompt and history it is sent with."""
+    history_hash = hashlib.sha256()
+    for entry in history:
+        history_hash.update(json.dumps([entry.type, str(entry.content)]).encode('utf-8'))
+    return _digest(json.dumps([model, _digest(system_prompt), history_hash.hexdigest(), message]))
+
+
+async def replay(chunks: Sequence[str], delay: float = 0.0) -> AsyncIterator[str]:
+    """Yield cached chunks as a stream, giving the event loop a turn (and delay seconds) before each."""
+    for chunk in chunks:
+        await asyncio.sleep(delay)
+        yield chunk
+
+
+class ResponseCache:
+    """Two-tier cache of streamed answers: an in-memory LRU in front of an optional SQLite table.
+    
+    Answers found on disk are promoted to the memory tier. Without a path
+    the cache lives in memory only.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            chunks TEXT NOT NULL,
+            created REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS responses_created ON responses (created);
+    """
+    
+    def __init__(self, maxsize: int = 256, path: Optional[str] = None, replay_delay: float = 0.0,
+                 max_disk_entries: Optional[int] = 10000, max_age: Optional[float] = None):
+        self.memory = LRUCache(maxsize)
+        self.path = path
+        self.replay_delay = replay_delay
+        self.max_disk_entries = max_disk_entries
+        self.max_age = max_age
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.disk_evictions = 0
+        self._connection: Optional[sqlite3.Connection] = None
+        self._disk_entries = 0
+        if path is not None:
+            self._connection = sqlite3.connect(path)
+            self._connection.executescript(self.SCHEMA)
+            self._disk_entries = self._connection.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+            self._prune()
+    
+    def _fresh(self, created: float) -> bool:
+        return self.max_age is None or time.time() - created <= self.max_age
+    
+    def get(self, key: str) -> Optional[Tuple[str, ...]]:
+        """Return the cached chunks of an answer, or None (also if it is older than max_age)."""
+        entry = self.memory.get(key)
+        if entry is not None:
+            if self._fresh(entry[0]):
+                self.memory_hits += 1
+                return entry[1]
+            entry = None
+        if self._connection is not None:
+            row = self._connection.execute('SELECT created, chunks FROM responses WHERE key = ?', (key,)).fetchone()
+            if row is not None and self._fresh(row[0]):
+                entry = (row[0], tuple(json.loads(row[1])))
+                self.memory.put(key, entry)
+                self.disk_hits += 1
+                return entry[1]
+        self.misses += 1
+        return None
+    
+    def put(self, key: str, chunks: Sequence[str]) -> None:
+        """Store the chunks of an answer in both tiers, evicting the oldest answers on disk if full."""
+        entry = (time.time(), tuple(chunks))
+        self.memory.put(key, entry)
+        if self._connection is not None:
+            with self._connection:
+                stored = self._connection.execute('SELECT 1 FROM responses WHERE key = ?', (key,)).fetchone()
+                self._connection.execute(
+                    'INSERT OR REPLACE INTO responses (key, chunks, created) VALUES (?, ?, ?)',
+                    (key, json.dumps(entry[1]), entry[0])
+                )
+            self._disk_entries += stored is None
+            if self.max_disk_entries is not None and self._disk_entries > self.max_disk_entries:
+                self._prune()
+    
+    def _prune(self) -> None:
+        """Delete expired answers and all but the newest max_disk_entries from disk."""
+        with self._connection:
+            deleted = 0
+            if self.max_age is not None:
+                deleted += self._connection.execute(
+                    'DELETE FROM responses WHERE created < ?', (time.time() - self.max_age,)
+                ).rowcount
+            if self.max_disk_entries is not None:
+                deleted += self._connection.execute(
+                    'DELETE FROM responses WHERE key IN'
+                    ' (SELECT key FROM responses ORDER BY created DESC LIMIT -1 OFFSET ?)',
+                    (self.max_disk_entries,)
+                ).rowcount
+            self._disk_entries = self._connection.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+        self.disk_evictions += deleted
+    
+    def replay(self, chunks: Sequence[str]) -> AsyncIterator[str]:
+        """Stream cached chunks with the cache's replay delay."""
+        return replay(chunks, self.replay_delay)
+    
+    def clear(self) -> None:
+        """Drop all cached answers (counters are kept)."""
+        self.memory.clear()
+        if self._connection is not None:
+            with self._connection:
+                self._connection.execute('DELETE FROM responses')
+            self._disk_entries = 0
+    
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get cache statistics; answers older than max_age count as misses."""
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            'hits': hits,
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'size': len(self.memory),
+            'maxsize': self.memory.maxsize,
+            'disk_size': self._disk_entries if self._connection is not None else None,
+            'disk_evictions': self.disk_evictions,
+            'hit_rate': (hits / lookups) if lookups else 0.0
+        }
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Streaming chat message bodies.
+
+Re-rendering a message with the whole accumulated answer for every chunk
+sends O(n²) bytes to the browser and creates an element per chunk. A
+StreamingMessage keeps one element, buffers the chunks and sends only the
+new text, at most `fps` times a second, together with a single scroll.
+
+Usage:
+    with response_message:
+        stream = StreamingMessage()
+    async for chunk in agent.send_message(question):
+        stream.append(chunk)
+    stream.finish()
+"""
+
+import json
+from typing import Any, List, Optional
+
+from nicegui import ui
+
+
+# Appends a delta to the element, or keeps it in a per-element buffer until
+# the element is mounted. Filled in with the element id, delta and scroll code.
+APPEND_JS = '''
+const buffers = (window.mondrui_streams ??= {{}});
+buffers[{id}] = (buffers[{id}] ?? '') + {delta};
+const target = getHtmlElement({id});
+if (target) {{ target.append(buffers[{id}]); buffers[{id}] = ''; }}
+{scroll}
+'''
+
+SCROLL_JS = 'window.scrollTo(0, document.body.scrollHeight);'
+
+
+class StreamingMessage:
+    """An HTML element whose text streams in with linear bandwidth.
+    
+    While streaming, the text is appended on the client as plain text;
+    finish() sets the final content as HTML, the only time the whole text
+    is sent. Elements are created through `backend`, `nicegui.ui` by
+    default, in the current context.
+    """
+    
+    def __init__(self, fps: float = 20, scroll: bool = True, backend: Any = None):
+        self.ui = backend if backend is not None else ui
+        self.client = self.ui.context.client
+        self.scroll = scroll
+        self.element = self.ui.html('')
+        self.length = 0
+        self.flushes = 0
+        self.finished = False
+        self._parts: List[str] = []
+        self._pending: List[str] = []
+        self._timer = self.ui.timer(1 / fps, self.flush)
+    
+    @property
+    def text(self) -> str:
+        """The text received so far."""
+        return ''.join(self._parts)
+    
+    def append(self, delta: str) -> None:
+        """Add text; it is sent with the next frame."""
+        if self.finished or not delta:
+            return
+        self._parts.append(delta)
+        self._pending.append(delta)
+        self.length += len(delta)
+    
+    def update(self, text: str) -> None:
+        """Show text that extends the text received so far; only the new part is sent."""
+        self.append(text[self.length:])
+    
+    def flush(self) -> None:
+        """Send the text buffered since the last frame, if any."""
+        if self.element.is_deleted:
+            self._stop()
+            return
+        if not self._pending:
+            return
+        delta = ''.join(self._pending)
+        self._pending.clear()
+        self.client.run_javascript(APPEND_JS.format(
+            id=self.element.id, delta=json.dumps(delta), scroll=SCROLL_JS if self.scroll else ''
+        ))
+        self.flushes += 1
+    
+    def finish(self, content: Optional[str] = None) -> None:
+        """Stop streaming and show content (by default the received text) as HTML."""
+        if self.finished:
+            return
+        self._stop()
+        self._pending.clear()
+        if self.element.is_deleted:
+            return
+        self.element.content = self.text if content is None else content
+        self.client.run_javascript(
+            f'delete window.mondrui_streams?.[{self.element.id}];' + (SCROLL_JS if self.scroll else '')
+        )
+    
+    def _stop(self) -> None:
+        self.finished = True
+        if not self._timer.is_deleted:
+            self._timer.delete()
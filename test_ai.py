@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Tests for the conversation memory of the AI agent (no API calls are made).
+"""
+
+import asyncio
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from ai import AIAgent, estimate_tokens, MESSAGE_OVERHEAD_TOKENS
+from conversation_store import SQLiteHistoryBackend
+from response_cache import ResponseCache
+
+
+def count_characters(message):
+    """Token counter for tests: one token per character, the system prompt is free."""
+    return 0 if isinstance(message, SystemMessage) else len(str(message.content))
+
+
+def make_agent(monkeypatch, **kwargs):
+    monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+    kwargs.setdefault('token_counter', count_characters)
+    return AIAgent(**kwargs)
+
+
+async def achat(agent, message, answer):
+    """Like chat(), on the running event loop."""
+    agent.llm = GenericFakeChatModel(messages=iter([AIMessage(content=answer)]))
+    return ''.join([chunk async for chunk in agent.send_message(message)])
+
+
+def summarizer(*summaries):
+    """A fake model answering summary requests with the given summaries, recording the requests."""
+    model = GenericFakeChatModel(messages=iter([AIMessage(content=summary) for summary in summaries]))
+    requests = []
+    original = model.ainvoke
+    
+    async def ainvoke(messages, *args, **kwargs):
+        requests.append(messages)
+        return await original(messages, *args, **kwargs)
+    object.__setattr__(model, 'ainvoke', ainvoke)
+    return model, requests
+
+
+def chat(agent, message, answer):
+    """Send a message to a fake model answering with the given text; return the streamed answer."""
+    agent.llm = GenericFakeChatModel(messages=iter([AIMessage(content=answer)]))
+    
+    async def collect():
+        return ''.join([chunk async for chunk in agent.send_message(message)])
+    return asyncio.run(collect())
+
+
+class TestTokenBudget:
+    """Test trimming the history to a token budget."""
+    
+    def test_tokens_are_counted_once_per_message(self, monkeypatch):
+        calls = []
+        
+        def counter(message):
+            calls.append(message.content)
+            return count_characters(message)
+        agent = make_agent(monkeypatch, token_counter=counter)
+        
+        assert chat(agent, 'hello', 'hi there') == 'hi there'
+        agent.get_memory_stats()
+        agent._trim_messages_if_needed()
+        
+        assert calls[1:] == ['hello', 'hi there']
+        assert agent.get_history_tokens() == len('hello') + len('hi there')
+    
+    def test_oldest_turns_are_dropped_to_fit_budget(self, monkeypatch):
+        agent = make_agent(monkeypatch, token_budget=25)
+        chat(agent, 'aaaaa', 'AAAAA')
+        chat(agent, 'bbbbb', 'BBBBB')
+        chat(agent, 'ccccc', 'CCCCC')
+        
+        assert [message.content for message in agent.chat_history] == ['bbbbb', 'BBBBB', 'ccccc', 'CCCCC']
+        assert agent.get_history_tokens() == 20
+    
+    def test_history_makes_room_for_new_message(self, monkeypatch):
+        agent = make_agent(monkeypatch, token_budget=30)
+        chat(agent, 'aaaaa', 'AAAAA')
+        chat(agent, 'bbbbb', 'BBBBB')
+        
+        prompts = []
+        agent.llm = GenericFakeChatModel(messages=iter([AIMessage(content='ok')]))
+        original = agent.llm.astream
+        
+        def spy(messages, **kwargs):
+            prompts.append([message.content for message in messages])
+            return original(messages, **kwargs)
+        object.__setattr__(agent.llm, 'astream', spy)
+        
+        async def send():
+            return [chunk async for chunk in agent.send_message('x' * 15)]
+        asyncio.run(send())
+        
+        # 20 history tokens and the 15 of the new message exceed the budget
+        assert prompts[0][1:] == ['bbbbb', 'BBBBB', 'x' * 15]
+    
+    def test_turns_stay_intact(self, monkeypatch):
+        agent = make_agent(monkeypatch, token_budget=12)
+        chat(agent, 'a', 'A' * 10)
+        chat(agent, 'b', 'B')
+        
+        assert [type(message) for message in agent.chat_history] == [HumanMessage, AIMessage]
+        assert agent.chat_history[0].content == 'b'
+    
+    def test_system_prompt_is_reserved(self, monkeypatch):
+        agent = make_agent(monkeypatch, token_counter=lambda message: len(str(message.content)))
+        agent.token_budget = agent.system_tokens + 10
+        chat(agent, 'aaaaa', 'AAAAA')
+        chat(agent, 'bb', 'BB')
+        
+        assert [message.content for message in agent.chat_history] == ['bb', 'BB']
+    
+    def test_no_budget_keeps_message_limit(self, monkeypatch):
+        agent = make_agent(monkeypatch, token_budget=None, max_messages=4)
+        for index in range(3):
+            chat(agent, f'q{index}', 'x' * 1000)
+        
+        assert [message.content for message in agent.chat_history][::2] == ['q1', 'q2']
+    
+    def test_memory_stats_report_tokens(self, monkeypatch):
+        agent = make_agent(monkeypatch, token_budget=100)
+        chat(agent, 'hello', 'hi there')
+        stats = agent.get_memory_stats()
+        
+        assert stats['total_messages'] == 2
+        assert stats['history_tokens'] == 13
+        assert stats['system_tokens'] == 0
+        assert stats['prompt_tokens'] == 13
+        assert stats['token_budget'] == 100
+        assert stats['token_usage_percent'] == pytest.approx(13.0)
+    
+    def test_clear_memory_resets_tokens(self, monkeypatch):
+        agent = make_agent(monkeypatch)
+        chat(agent, 'hello', 'hi there')
+        agent.clear_memory()
+        
+        assert agent.get_history_tokens() == 0
+    
+    def test_estimate_tokens(self):
+        assert estimate_tokens(HumanMessage(content='')) == MESSAGE_OVERHEAD_TOKENS
+        assert estimate_tokens(HumanMessage(content='x' * 9)) == 3 + MESSAGE_OVERHEAD_TOKENS
+
+
+class TestCompaction:
+    """Test folding older turns into a running summary."""
+    
+    def test_turns_above_threshold_are_folded_in_background(self, monkeypatch):
+        agent = make_agent(monkeypatch, summary_threshold=25, summary_keep_turns=1)
+        agent.summary_llm, requests = summarizer('User asked about a and b.')
+        
+        async def conversation():
+            await achat(agent, 'aaaaa', 'AAAAA')
+            await achat(agent, 'bbbbb', 'BBBBB')
+            assert agent.compactions == 0
+            await achat(agent, 'ccccc', 'CCCCC')
+            # The turn completes before the summary is written
+            assert len(agent.chat_history) == 6
+            await agent.wait_for_compaction()
+        asyncio.run(conversation())
+        
+        assert [message.content for message in agent.chat_history] == ['ccccc', 'CCCCC']
+        assert agent.summary == 'User asked about a and b.'
+        assert agent.compactions == 1
+        assert 'User: aaaaa\n\nAssistant: AAAAA\n\nUser: bbbbb' in requests[0][1].content
+    
+    def test_summary_is_sent_and_extended(self, monkeypatch):
+        agent = make_agent(monkeypatch, summary_threshold=15, summary_keep_turns=1,
+                           token_counter=lambda message: len(str(message.content)))
+        agent.summary_llm, requests = summarizer('First summary.', 'Second summary.')
+        prompts = []
+        
+        async def conversation():
+            await achat(agent, 'aaaaa', 'AAAAA')
+            await achat(agent, 'bbbbb', 'BBBBB')
+            await agent.wait_for_compaction()
+            agent.llm = GenericFakeChatModel(messages=iter([AIMessage(content='CCCCC')]))
+            original = agent.llm.astream
+            
+            def spy(messages, **kwargs):
+                prompts.append(list(messages))
+                return original(messages, **kwargs)
+            object.__setattr__(agent.llm, 'astream', spy)
+            [chunk async for chunk in agent.send_message('ccccc')]
+            await agent.wait_for_compaction()
+        asyncio.run(conversation())
+        
+        assert isinstance(prompts[0][1], SystemMessage)
+        assert 'First summary.' in prompts[0][1].content
+        assert [message.content for message in prompts[0][2:]] == ['bbbbb', 'BBBBB', 'ccccc']
+        assert 'Summary so far:\nFirst summary.' in requests[1][1].content
+        assert agent.summary == 'Second summary.'
+        assert agent.get_memory_stats()['summary_tokens'] == len(prompts[0][1].content) - len('First') + len('Second')
+    
+    def test_turns_added_meanwhile_are_kept(self, monkeypatch):
+        agent = make_agent(monkeypatch, summary_keep_turns=1)
+        agent.summary_llm, _ = summarizer('Summary.')
+        
+        async def conversation():
+            await achat(agent, 'aaaaa', 'AAAAA')
+            await achat(agent, 'bbbbb', 'BBBBB')
+            compaction = asyncio.create_task(agent.compact())
+            await asyncio.sleep(0)
+            agent._drop_oldest(2)
+            await achat(agent, 'ccccc', 'CCCCC')
+            return await compaction
+        assert asyncio.run(conversation())
+        
+        assert [message.content for message in agent.chat_history] == ['bbbbb', 'BBBBB', 'ccccc', 'CCCCC']
+    
+    def test_clearing_discards_summary_in_flight(self, monkeypatch):
+        agent = make_agent(monkeypatch, summary_keep_turns=0)
+        agent.summary_llm, _ = summarizer('Summary.')
+        
+        async def conversation():
+            await achat(agent, 'aaaaa', 'AAAAA')
+            compaction = asyncio.create_task(agent.compact())
+            await asyncio.sleep(0)
+            agent.clear_memory()
+            return await compaction
+        
+        assert not asyncio.run(conversation())
+        assert agent.summary == ''
+    
+    def test_failed_summary_keeps_history(self, monkeypatch):
+        agent = make_agent(monkeypatch, summary_keep_turns=0)
+        agent.summary_llm = GenericFakeChatModel(messages=iter([]))
+        
+        async def conversation():
+            await achat(agent, 'aaaaa', 'AAAAA')
+            return await agent.compact()
+        
+        assert not asyncio.run(conversation())
+        assert len(agent.chat_history) == 2
+    
+    def test_disabled_by_default(self, monkeypatch):
+        agent = make_agent(monkeypatch)
+        for index in range(5):
+            chat(agent, f'q{index}', 'x' * 1000)
+        
+        assert agent.compactions == 0
+        assert len(agent.chat_history) == 10
+
+
+class TestPersistentHistory:
+    """Test storing the conversation in a history backend."""
+    
+    def test_history_is_restored_by_a_new_agent(self, monkeypatch):
+        backend = SQLiteHistoryBackend()
+        agent = make_agent(monkeypatch, history_backend=backend, session_id='s')
+        chat(agent, 'hello', 'hi there')
+        
+        restored = make_agent(monkeypatch, history_backend=backend, session_id='s')
+        assert [message.content for message in restored.get_conversation_history()] == ['hello', 'hi there']
+        assert restored.get_history_tokens() == len('hello') + len('hi there')
+        assert len(make_agent(monkeypatch, history_backend=backend, session_id='other').get_conversation_history()) == 0
+    
+    def test_loading_is_lazy_and_counts_are_not_recomputed(self, monkeypatch):
+        backend = SQLiteHistoryBackend()
+        chat(make_agent(monkeypatch, history_backend=backend), 'hello', 'hi there')
+        calls = []
+        
+        def counter(message):
+            calls.append(message.content)
+            return count_characters(message)
+        agent = make_agent(monkeypatch, history_backend=backend, token_counter=counter)
+        assert agent._loaded is False
+        
+        assert agent.get_memory_stats()['stored_turns'] == 1
+        assert len(agent.chat_history) == 2
+        assert 'hello' not in calls and 'hi there' not in calls
+    
+    def test_only_recent_window_is_loaded(self, monkeypatch):
+        backend = SQLiteHistoryBackend()
+        agent = make_agent(monkeypatch, history_backend=backend, max_messages=4)
+        for index in range(5):
+            chat(agent, f'q{index}', f'a{index}')
+        
+        restored = make_agent(monkeypatch, history_backend=backend, max_messages=4)
+        assert [message.content for message in restored.get_conversation_history()] == ['q3', 'a3', 'q4', 'a4']
+        older = restored.load_older_turns(2)
+        assert [(turn, message.content) for turn, message, _ in older] == [(1, 'q1'), (1, 'a1'), (2, 'q2'), (2, 'a2')]
+        assert [message.content for _, message, _ in restored.load_older_turns(5, before=older[0][0])] == ['q0', 'a0']
+    
+    def test_turns_continue_after_restore(self, monkeypatch):
+        backend = SQLiteHistoryBackend()
+        chat(make_agent(monkeypatch, history_backend=backend), 'q0', 'a0')
+        chat(make_agent(monkeypatch, history_backend=backend), 'q1', 'a1')
+        
+        assert [turn for turn, _, _ in backend.load_turns('default', 0)] == [0, 0, 1, 1]
+    
+    def test_unload_releases_and_reloads(self, monkeypatch):
+        backend = SQLiteHistoryBackend(batch_size=100)
+        agent = make_agent(monkeypatch, history_backend=backend)
+        chat(agent, 'hello', 'hi there')
+        agent.unload()
+        
+        assert len(agent.chat_history) == 0
+        assert [message.content for message in agent.get_conversation_history()] == ['hello', 'hi there']
+    
+    def test_unload_while_streaming_is_deferred(self, monkeypatch):
+        backend = SQLiteHistoryBackend()
+        agent = make_agent(monkeypatch, history_backend=backend)
+        chat(agent, 'q1', 'first answer')
+        agent.llm = GenericFakeChatModel(messages=iter([AIMessage(content='second answer here')]))
+        
+        async def unload_midway():
+            stream = agent.send_message('q2')
+            chunks = [await anext(stream)]
+            agent.unload()
+            assert agent._loaded
+            chunks += [chunk async for chunk in stream]
+            return ''.join(chunks)
+        assert asyncio.run(unload_midway()) == 'second answer here'
+        
+        assert agent._loaded is False
+        contents = [message.content for message in agent.get_conversation_history()]
+        assert contents == ['q1', 'first answer', 'q2', 'second answer here']
+        assert agent._first_turn_in_memory() == 0
+    
+    def test_agents_sharing_a_session_get_distinct_turns(self, monkeypatch):
+        backend = SQLiteHistoryBackend()
+        first = make_agent(monkeypatch, history_backend=backend, session_id='s')
+        second = make_agent(monkeypatch, history_backend=backend, session_id='s')
+        chat(first, 'q0', 'a0')
+        chat(second, 'q1', 'a1')
+        chat(first, 'q2', 'a2')
+        
+        assert [turn for turn, _, _ in backend.load_turns('s', 0)] == [0, 0, 1, 1, 2, 2]
+        assert list(first._turns) == [0, 2]
+        assert first.load_older_turns(1) == []
+        restored = make_agent(monkeypatch, history_backend=backend, session_id='s')
+        contents = [message.content for message in restored.get_conversation_history()]
+        assert contents == ['q0', 'a0', 'q1', 'a1', 'q2', 'a2']
+    
+    def test_summary_is_restored_without_folded_turns(self, monkeypatch):
+        backend = SQLiteHistoryBackend()
+        agent = make_agent(monkeypatch, history_backend=backend, summary_threshold=15, summary_keep_turns=1)
+        agent.summary_llm, _ = summarizer('Summary of a.')
+        
+        async def conversation():
+            await achat(agent, 'aaaaa', 'AAAAA')
+            await achat(agent, 'bbbbb', 'BBBBB')
+            await agent.wait_for_compaction()
+        asyncio.run(conversation())
+        
+        restored = make_agent(monkeypatch, history_backend=backend)
+        assert [message.content for message in restored.get_conversation_history()] == ['bbbbb', 'BBBBB']
+        assert restored.summary == 'Summary of a.'
+    
+    def test_clear_memory_deletes_stored_conversation(self, monkeypatch):
+        backend = SQLiteHistoryBackend()
+        agent = make_agent(monkeypatch, history_backend=backend)
+        chat(agent, 'hello', 'hi there')
+        agent.clear_memory()
+        
+        assert len(make_agent(monkeypatch, history_backend=backend).get_conversation_history()) == 0
+        assert backend.last_turn('default') == -1
+
+
+class TestResponseCache:
+    """Test replaying cached answers to identical prompts."""
+    
+    def test_identical_prompt_is_answered_from_cache(self, monkeypatch):
+        cache = ResponseCache()
+        first = make_agent(monkeypatch, response_cache=cache)
+        assert chat(first, 'hello', 'hi there friend') == 'hi there friend'
+        
+        second = make_agent(monkeypatch, response_cache=cache)
+        second.llm = GenericFakeChatModel(messages=iter([]))  # Fails if called
+        
+        async def collect():
+            return [chunk async for chunk in second.send_message('hello')]
+        chunks = asyncio.run(collect())
+        
+        assert chunks == ['hi', ' ', 'there', ' ', 'friend']
+        assert [message.content for message in second.chat_history] == ['hello', 'hi there friend']
+        assert second.get_response_cache_stats()['hits'] == 1
+    
+    def test_different_history_misses(self, monkeypatch):
+        cache = ResponseCache()
+        agent = make_agent(monkeypatch, response_cache=cache)
+        chat(agent, 'hello', 'first')
+        
+        assert chat(agent, 'hello', 'second') == 'second'
+        assert cache.stats()['hits'] == 0
+        assert cache.stats()['misses'] == 2
+    
+    def test_cache_is_opt_in(self, monkeypatch):
+        agent = make_agent(monkeypatch)
+        chat(agent, 'hello', 'first')
+        
+        assert chat(make_agent(monkeypatch), 'hello', 'second') == 'second'
+        assert agent.get_response_cache_stats() == {}
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for the benchmark suite's generators and statistics.
+"""
+
+import pytest
+from mondrui import MondrUIRenderer
+from benchmark_mondrui import (
+    Case,
+    compare,
+    make_form_spec,
+    make_list_spec,
+    make_nested_spec,
+    make_response_text,
+    measure,
+    percentile,
+    summarize,
+)
+from mondrui_stream import extract_mondrui_json
+
+
+class TestGenerators:
+    """Test the synthetic specification generators."""
+    
+    @pytest.mark.parametrize('spec', [
+        make_nested_spec(3, 2),
+        make_form_spec(20),
+        make_form_spec(5, 'bugReportForm'),
+        make_list_spec(10),
+        make_list_spec(10, virtual=True),
+    ])
+    def test_generated_specs_are_valid(self, spec):
+        assert MondrUIRenderer().validate(spec) == []
+    
+    def test_nested_spec_shape(self):
+        spec = make_nested_spec(2, 3)
+        assert len(spec['props']['children']) == 3
+        assert spec['props']['children'][0]['props']['children'][2]['component'] == 'Text'
+    
+    def test_response_text_contains_spec(self):
+        _, spec = extract_mondrui_json(make_response_text(4, 2))
+        assert spec == make_form_spec(4)
+
+
+class TestStatistics:
+    """Test latency statistics and run comparison."""
+    
+    def test_percentile_interpolates(self):
+        assert percentile([1.0, 2.0, 3.0, 4.0, 5.0], 0.5) == 3.0
+        assert percentile([1.0, 2.0], 0.5) == 1.5
+        assert percentile([7.0], 0.99) == 7.0
+    
+    def test_summarize(self):
+        summary = summarize([0.001, 0.002, 0.003, 0.004])
+        assert summary['iterations'] == 4
+        assert summary['ops_per_sec'] == pytest.approx(400)
+        assert summary['latency_ms']['min'] == pytest.approx(1)
+        assert summary['latency_ms']['p50'] == pytest.approx(2.5)
+        assert summary['latency_ms']['max'] == pytest.approx(4)
+    
+    def test_compare_pairs_by_name_and_params(self):
+        def result(name, params, p50):
+            return {'name': name, 'params': params, 'latency_ms': {'p50': p50}}
+        
+        rows = compare(
+            [result('render', {'fields': 10}, 3.0), result('render', {'fields': 50}, 9.0)],
+            [result('render', {'fields': 10}, 2.0), result('extract', {}, 1.0)]
+        )
+        assert rows == [('render[fields=10]', 2.0, 3.0, 1.5)]
+    
+    def test_measure_renders_headless(self):
+        renderer = MondrUIRenderer()
+        spec = make_form_spec(3)
+        case = Case('form', {'fields': 3}, lambda: renderer.render_component(spec), renders=True)
+        
+        result = measure(case, min_time=0, min_iterations=3, max_iterations=3, warmup=1)
+        assert result['name'] == 'form'
+        assert result['iterations'] == 3
+        assert result['latency_ms']['p99'] >= result['latency_ms']['p50'] > 0
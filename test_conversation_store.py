@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Tests for the ring-buffer conversation store.
+"""
+
+import sqlite3
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from conversation_store import ConversationView, RingBufferStore, SQLiteHistoryBackend
+
+
+def contents(messages):
+    return [message.content for message in messages]
+
+
+def filled(capacity, count):
+    store = RingBufferStore(capacity)
+    for index in range(count):
+        store.append(HumanMessage(content=f'm{index}'), tokens=index)
+    return store
+
+
+class TestRingBufferStore:
+    """Test appending, dropping and reading messages."""
+    
+    def test_keeps_order_and_tokens(self):
+        store = filled(4, 3)
+        
+        assert contents(store) == ['m0', 'm1', 'm2']
+        assert store.tokens(2) == 2
+        assert store.total_tokens == 3
+        assert [tokens for _, tokens in store.items()] == [0, 1, 2]
+    
+    def test_full_store_overwrites_oldest(self):
+        store = filled(3, 5)
+        
+        assert contents(store) == ['m2', 'm3', 'm4']
+        assert store.total_tokens == 9
+        assert store[0].content == 'm2' and store[-1].content == 'm4'
+    
+    def test_drop_oldest_wraps_around(self):
+        store = filled(3, 4)
+        store.drop_oldest(2)
+        store.append(AIMessage(content='a'), tokens=10)
+        store.append(AIMessage(content='b'), tokens=20)
+        
+        assert contents(store) == ['m3', 'a', 'b']
+        assert store.total_tokens == 33
+        assert contents(store[1:]) == ['a', 'b']
+    
+    def test_dropped_messages_are_released(self):
+        store = filled(3, 3)
+        store.drop_oldest(5)
+        
+        assert len(store) == 0 and store.total_tokens == 0
+        assert store._messages == [None, None, None]
+    
+    def test_index_out_of_range(self):
+        store = filled(3, 2)
+        with pytest.raises(IndexError):
+            store[2]
+        with pytest.raises(IndexError):
+            store[-3]
+    
+    def test_clear(self):
+        store = filled(3, 5)
+        store.clear()
+        store.append(HumanMessage(content='new'), tokens=1)
+        
+        assert contents(store) == ['new']
+        assert store.total_tokens == 1
+    
+    def test_capacity_must_be_positive(self):
+        with pytest.raises(ValueError):
+            RingBufferStore(0)
+
+
+class TestViews:
+    """Test the read-only views of a store."""
+    
+    def test_view_is_live_and_read_only(self):
+        store = filled(4, 2)
+        view = store.view()
+        store.append(HumanMessage(content='m2'))
+        
+        assert isinstance(view, ConversationView)
+        assert contents(view) == ['m0', 'm1', 'm2']
+        assert len(view) == 3 and view[-1].content == 'm2'
+        assert not hasattr(view, 'append')
+        with pytest.raises(TypeError):
+            view[0] = HumanMessage(content='x')
+    
+    def test_prompt_joins_without_copying_history(self):
+        store = filled(3, 4)
+        system = SystemMessage(content='system')
+        user = HumanMessage(content='question')
+        prompt = store.prompt([system], [user])
+        
+        assert len(prompt) == 5
+        assert contents(prompt) == ['system', 'm1', 'm2', 'm3', 'question']
+        assert [prompt[index].content for index in range(-5, 5)] == contents(prompt) * 2
+        assert contents(prompt[1:4]) == ['m1', 'm2', 'm3']
+        with pytest.raises(IndexError):
+            prompt[5]
+
+
+def turn_entries(turn):
+    return [(turn, HumanMessage(content=f'q{turn}'), 3), (turn, AIMessage(content=f'a{turn}'), 5)]
+
+
+class TestSQLiteHistoryBackend:
+    """Test persisting and loading histories in SQLite."""
+    
+    def test_appends_are_written_in_batches(self, tmp_path):
+        path = str(tmp_path / 'history.sqlite3')
+        backend = SQLiteHistoryBackend(path, batch_size=4)
+        
+        def stored():
+            with sqlite3.connect(path) as connection:
+                return connection.execute('SELECT COUNT(*) FROM messages').fetchone()[0]
+        
+        backend.append('s', turn_entries(0))
+        assert stored() == 0
+        backend.append('s', turn_entries(1))
+        assert stored() == 4
+        backend.append('s', turn_entries(2))
+        backend.close()
+        assert stored() == 6
+    
+    def test_load_turns_round_trips_messages(self):
+        backend = SQLiteHistoryBackend(batch_size=100)
+        for turn in range(4):
+            backend.append('s', turn_entries(turn))
+        backend.append('other', turn_entries(0))
+        
+        entries = backend.load_turns('s', 1, 3)
+        assert [(turn, type(message), message.content, tokens) for turn, message, tokens in entries] == [
+            (1, HumanMessage, 'q1', 3), (1, AIMessage, 'a1', 5), (2, HumanMessage, 'q2', 3), (2, AIMessage, 'a2', 5)
+        ]
+        assert [message.content for _, message, _ in backend.load_turns('s', 3)] == ['q3', 'a3']
+        assert backend.last_turn('s') == 3
+        assert backend.last_turn('missing') == -1
+    
+    def test_turns_are_reserved_once(self, tmp_path):
+        path = str(tmp_path / 'history.sqlite3')
+        backend = SQLiteHistoryBackend(path, batch_size=100)
+        backend.append('s', turn_entries(0))
+        backend.append('s', turn_entries(1))
+        
+        other = SQLiteHistoryBackend(path)
+        assert [backend.next_turn('s'), other.next_turn('s'), backend.next_turn('s')] == [2, 3, 4]
+        assert other.next_turn('new') == 0
+        
+        backend.clear('s')
+        assert other.next_turn('s') == 0
+    
+    def test_summary_and_clear(self):
+        backend = SQLiteHistoryBackend()
+        backend.append('s', turn_entries(0))
+        backend.save_summary('s', 'Summary.', 1)
+        assert backend.load_summary('s') == ('Summary.', 1)
+        
+        backend.clear('s')
+        assert backend.load_turns('s', 0) == []
+        assert backend.load_summary('s') == ('', 0)
+    
+    def test_turn_queries_use_index(self):
+        backend = SQLiteHistoryBackend()
+        plan = backend._connection.execute(
+            'EXPLAIN QUERY PLAN SELECT turn, message, tokens FROM messages '
+            'WHERE session_id = ? AND turn >= ? AND turn < ? ORDER BY turn, id', ('s', 0, 1)
+        ).fetchall()
+        
+        assert 'messages_session_turn' in ' '.join(str(row) for row in plan)
@@ -3,6 +3,8 @@
 Tests for the generic MondrUI rendering engine.
 """
 
+import asyncio
+import gc
 import pytest
 from mondrui import (
     MondrUIRenderer, 
@@ -12,14 +14,33 @@ from mondrui import (
     ButtonComponent,
     InputComponent,
     TextComponent,
+    VirtualListWindow,
+    RenderHandle,
     render_ui,
     register_component,
     register_template,
     create_component,
     ComponentStyle,
     EventHandler,
-    EventType
+    EventBinding,
+    EventType,
+    CompiledTemplate,
+    ItemTemplateBinder,
+    LRUCache,
+    canonical_spec,
+    PropRule,
+    SpecValidationError,
+    compile_validator,
+    RenderHook,
+    RenderPlan,
+    spec_fingerprint,
+    sync_value_on_change,
+    defer_value_sync,
+    FormState,
+    SyncPolicy
 )
+from nicegui import ui
+from mondrui_memory import MemoryUI
 
 
 class TestComponentStyle:
@@ -34,6 +55,28 @@ class TestComponentStyle:
         assert style.classes == ['test-class', 'another-class']
         assert style.width == '100px'
         assert style.color == 'red'
+    
+    def test_precomputed_strings(self):
+        style = ComponentStyle(classes=['a', 'b'], width='10px', border='none')
+        assert style.class_string == 'a b'
+        assert dict(style.style_map) == {'width': '10px', 'border': 'none'}
+        assert style.to_style_dict() == {'width': '10px', 'border': 'none'}
+    
+    def test_styles_are_interned_and_frozen(self):
+        first = ComponentStyle.intern(['w-full'], padding='4px')
+        second = ComponentStyle.intern(['w-full'], padding='4px')
+        assert first is second
+        assert ComponentStyle.intern(['w-full']) is not first
+        assert ComponentStyle.intern('p-2 m-1').classes == ['p-2', 'm-1']
+        
+        with pytest.raises(AttributeError):
+            first.width = '1px'
+    
+    def test_parsed_styles_are_shared(self):
+        first = TextComponent('Text', {'style': {'classes': ['x'], 'color': 'red'}})
+        second = TextComponent('Text', {'style': {'color': 'red', 'classes': ['x']}})
+        assert first.style is second.style
+        assert TextComponent('Text', {}).style is ButtonComponent('Button', {}).style
 
 
 class TestBaseComponent:
@@ -57,6 +100,13 @@ class TestBaseComponent:
         assert len(component.events) == 1
         assert component.events[0].action == 'test_action'
         assert len(component.children) == 1
+    
+    def test_builtin_components_have_no_instance_dict(self):
+        component = InputComponent('Input', {'label': 'Name'})
+        assert not hasattr(component, '__dict__')
+        
+        with pytest.raises(AttributeError):
+            EventHandler(EventType.CLICK, 'go').action = 'stop'
 
 
 class TestGenericComponents:
@@ -107,6 +157,13 @@ class TestGenericComponents:
             # Expected in test environment
             pass
     
+    def test_select_input_without_value(self):
+        renderer = MondrUIRenderer()
+        component = InputComponent('Input', {'inputType': 'select', 'options': ['Low', 'High']})
+        
+        element = component.render(renderer)
+        assert element.value is None
+    
     def test_button_component(self):
         renderer = MondrUIRenderer()
         props = {
@@ -442,6 +499,939 @@ class TestTemplateSystem:
         except Exception:
             # Expected in test environment
             pass
+    
+    def test_compiled_template_records_slot_paths(self):
+        compiled = CompiledTemplate({
+            'component': 'Form',
+            'props': {'title': '{{title}}', 'style': {'classes': ['p-6']}, 'fields': ['{{first}}']}
+        })
+        
+        assert compiled.slots == [(('props', 'title'), 'title'), (('props', 'fields', 0), 'first')]
+    
+    def test_template_expansion_shares_unchanged_subtrees(self):
+        renderer = MondrUIRenderer()
+        template = renderer.template_registry['bugReportForm']
+        
+        expanded = renderer._expand_template('bugReportForm', {'title': 'Bug'})
+        again = renderer._expand_template('bugReportForm', {'title': 'Other'})
+        assert expanded['props']['title'] == 'Bug'
+        assert expanded['props']['fields'] == '{{fields}}'
+        assert expanded['props']['style'] is again['props']['style']
+        assert template['props']['title'] == '{{title}}'
+    
+    def test_nested_templates_are_flattened(self):
+        renderer = MondrUIRenderer()
+        renderer.register_template('shortBugForm', {
+            'component': 'bugReportForm',
+            'props': {'title': 'Quick Bug', 'fields': '{{fields}}', 'actions': []}
+        })
+        
+        fields = [{'id': 'summary', 'label': 'Summary'}]
+        expanded = renderer._expand_template('shortBugForm', {'fields': fields})
+        assert expanded['component'] == 'Form'
+        assert expanded['props']['title'] == 'Quick Bug'
+        assert expanded['props']['fields'] is fields
+    
+    def test_recursive_template_is_rejected(self):
+        renderer = MondrUIRenderer()
+        
+        with pytest.raises(ValueError, match="references itself"):
+            renderer.register_template('loop', {'component': 'loop', 'props': {}})
+        assert 'loop' not in renderer.template_registry
+
+
+class TestItemTemplateBinder:
+    """Test list item template binding."""
+    
+    template = {
+        'component': 'Card',
+        'props': {
+            'title': '{{title}}',
+            'children': [
+                {'component': 'Text', 'props': {'text': 'By {{user.name}} (#{{id}})'}},
+                {'component': 'Text', 'props': {'text': 'static', 'style': {'classes': ['a']}}}
+            ]
+        }
+    }
+    
+    def test_binds_dotted_paths_and_embedded_variables(self):
+        binder = ItemTemplateBinder(self.template)
+        spec = binder.bind_item({'title': 'First', 'id': 7, 'user': {'name': 'Ada'}})
+        
+        assert spec['props']['title'] == 'First'
+        assert spec['props']['children'][0]['props']['text'] == 'By Ada (#7)'
+    
+    def test_unchanged_subtrees_are_shared(self):
+        binder = ItemTemplateBinder(self.template)
+        first = binder.bind_item({'title': 'A'})
+        second = binder.bind_item({'title': 'B'})
+        
+        assert first['props']['children'][1] is second['props']['children'][1]
+        assert self.template['props']['title'] == '{{title}}'
+    
+    def test_missing_variables_are_left_untouched(self):
+        binder = ItemTemplateBinder(self.template)
+        spec = binder.bind_item({'id': 1})
+        
+        assert spec['props']['title'] == '{{title}}'
+        assert spec['props']['children'][0]['props']['text'] == 'By {{user.name}} (#1)'
+    
+    def test_whole_slot_keeps_value_type(self):
+        binder = ItemTemplateBinder({'component': 'Slider', 'props': {'value': '{{score}}'}})
+        assert binder.bind_item({'score': 4})['props']['value'] == 4
+    
+    def test_non_dict_items_bind_as_text(self):
+        binder = ItemTemplateBinder({'component': 'Text', 'props': {'text': 'Item: {{value}}'}})
+        assert binder.bind_item(3)['props']['text'] == 'Item: 3'
+        assert ItemTemplateBinder('{{value}}').bind_item('x') == {'component': 'Text', 'props': {'text': 'x'}}
+
+
+class TestVirtualList:
+    """Test the virtualized list window."""
+    
+    def make_window(self, count=1000):
+        rendered = []
+        window = VirtualListWindow(
+            list(range(count)), rendered.append, row_height=40, overscan=2, height='400px'
+        )
+        return window, rendered
+    
+    def test_only_visible_rows_are_materialized(self):
+        window, rendered = self.make_window()
+        
+        assert (window.start, window.end) == (0, 13)
+        assert rendered == list(range(13))
+        assert len(window.row_container.default_slot.children) == 13
+    
+    def test_window_follows_scroll_position(self):
+        assert self.make_window()[0].compute_window(4000, 400) == (98, 113)
+        assert self.make_window(count=105)[0].compute_window(4000, 400) == (98, 105)
+    
+    def test_rows_are_recycled_on_scroll(self):
+        window, rendered = self.make_window()
+        rows_before = set(window.row_container.default_slot.children)
+        rendered.clear()
+        
+        window.update_window(200, 400)
+        
+        assert (window.start, window.end) == (3, 18)
+        assert rendered == [13, 14, 15, 16, 17]
+        assert set(window.row_container.default_slot.children) >= rows_before
+        ordered = window.row_container.default_slot.children[:15]
+        assert ordered == [window.rows[i] for i in range(3, 18)]
+    
+    def test_list_component_virtual_prop(self):
+        renderer = MondrUIRenderer()
+        spec = {
+            'component': 'List',
+            'props': {'items': [{'name': f'Item {i}'} for i in range(5000)], 'virtual': True,
+                      'itemTemplate': {'component': 'Text', 'props': {'text': '{{name}}'}}}
+        }
+        
+        scroll_area = renderer.render_component(spec)
+        assert len(list(scroll_area.descendants())) < 100
+
+
+class TestIncrementalUpdate:
+    """Test diffing a new spec against a rendered tree."""
+    
+    def container_spec(self, *children, style=None):
+        props = {'layout': 'vertical', 'children': list(children)}
+        if style:
+            props['style'] = style
+        return {'type': 'ui.render', 'component': 'Container', 'props': props}
+    
+    def text(self, key, text):
+        return {'component': 'Text', 'props': {'key': key, 'text': text}}
+    
+    def test_render_ui_returns_handle(self):
+        renderer = MondrUIRenderer()
+        handle = renderer.render_ui(self.container_spec(self.text('a', 'A')))
+        
+        assert isinstance(handle, RenderHandle)
+        assert handle.node.children[0].element.text == 'A'
+        assert list(handle.element) == [handle.node.children[0].element]
+    
+    def test_changed_text_is_patched_in_place(self):
+        renderer = MondrUIRenderer()
+        handle = renderer.render_ui(self.container_spec(self.text('a', 'A'), self.text('b', 'B')))
+        root = handle.element
+        first, second = [child.element for child in handle.node.children]
+        
+        handle.update(self.container_spec(self.text('a', 'A'), self.text('b', 'Changed')))
+        
+        assert handle.element is root
+        assert [child.element for child in handle.node.children] == [first, second]
+        assert second.text == 'Changed'
+    
+    def test_keyed_children_are_moved_added_and_removed(self):
+        renderer = MondrUIRenderer()
+        handle = renderer.render_ui(self.container_spec(self.text('a', 'A'), self.text('b', 'B')))
+        first, second = [child.element for child in handle.node.children]
+        
+        handle.update(self.container_spec(self.text('b', 'B'), self.text('c', 'C')))
+        
+        elements = list(handle.element)
+        assert elements[0] is second
+        assert elements[1].text == 'C'
+        assert first not in elements
+        assert len(elements) == 2
+    
+    def test_duplicate_keys_fall_back_to_positions(self):
+        renderer = MondrUIRenderer()
+        handle = renderer.render_ui(self.container_spec(self.text('a', 'one'), self.text('a', 'two')))
+        first = handle.node.children[0].element
+        
+        handle.update(self.container_spec(self.text('a', 'three')))
+        
+        elements = list(handle.element)
+        assert [element.text for element in elements] == ['three']
+        assert elements[0] is first
+        assert len(handle.node.children) == 1
+    
+    def test_removed_children_are_disposed(self):
+        renderer = MondrUIRenderer()
+        handle = renderer.render_ui(self.container_spec(self.text('a', 'A'), self.text('b', 'B')))
+        removed = handle.node.children[1]
+        
+        handle.update(self.container_spec(self.text('a', 'A')))
+        
+        assert removed.element is None
+        assert removed.children == []
+    
+    def test_component_type_change_replaces_element(self):
+        renderer = MondrUIRenderer()
+        handle = renderer.render_ui(self.container_spec(self.text('a', 'A'), self.text('b', 'B')))
+        old_first = handle.node.children[0].element
+        
+        button = {'component': 'Button', 'props': {'key': 'a', 'label': 'Go'}}
+        handle.update(self.container_spec(button, self.text('b', 'B')))
+        
+        elements = list(handle.element)
+        assert elements[0] is not old_first
+        assert elements[0].text == 'Go'
+    
+    def test_style_change_is_patched(self):
+        renderer = MondrUIRenderer()
+        handle = renderer.render_ui(self.container_spec(style={'classes': ['p-2'], 'width': '10px'}))
+        root = handle.element
+        
+        handle.update(self.container_spec(style={'classes': ['p-4']}))
+        
+        assert handle.element is root
+        assert 'p-4' in root.classes and 'p-2' not in root.classes
+        assert 'width' not in root.style
+
+
+class TestSpecValidation:
+    """Test schema validation of specifications."""
+    
+    def test_valid_spec_has_no_errors(self):
+        renderer = MondrUIRenderer()
+        spec = {
+            'type': 'ui.render',
+            'component': 'bugReportForm',
+            'props': {
+                'title': 'Report a Bug',
+                'fields': [{'id': 'summary', 'label': 'Summary', 'type': 'text', 'required': True}],
+                'actions': [{'label': 'Submit', 'action': 'submit_bug'}]
+            }
+        }
+        assert renderer.validate(spec) == []
+    
+    def test_errors_are_reported_with_paths(self):
+        renderer = MondrUIRenderer()
+        spec = {
+            'component': 'Container',
+            'props': {
+                'children': [
+                    {'component': 'Text', 'props': {'variant': 1}},
+                    {'component': 'Slider', 'props': {'min': 'low'}},
+                    {'component': 'Form', 'props': {'fields': [{'label': 'A', 'required': 'yes'}, 'oops']}},
+                    {'component': 'Nope'}
+                ]
+            }
+        }
+        
+        errors = renderer.validate(spec)
+        assert errors == [
+            'spec.props.children[0].props.variant: expected str, got int',
+            'spec.props.children[1].props.min: expected int or float, got str',
+            'spec.props.children[2].props.fields[0].required: expected bool, got str',
+            'spec.props.children[2].props.fields[1]: expected dict, got str',
+            'spec.props.children[3]: Unknown component: Nope'
+        ]
+    
+    def test_invalid_spec_fails_before_rendering(self):
+        renderer = MondrUIRenderer()
+        rendered = []
+        
+        class Recorder(TextComponent):
+            def render(self, renderer):
+                rendered.append(self.props)
+                return super().render(renderer)
+        
+        renderer.register_component('Recorder', Recorder)
+        spec = {
+            'type': 'ui.render',
+            'component': 'Container',
+            'props': {'children': [
+                {'component': 'Recorder', 'props': {'text': 'ok'}},
+                {'component': 'Recorder', 'props': {'text': ['bad']}}
+            ]}
+        }
+        
+        with pytest.raises(SpecValidationError) as info:
+            renderer.render_ui(spec)
+        assert rendered == []
+        assert info.value.errors == ['spec.props.children[1].props.text: expected str or int or float, got list']
+    
+    def test_verdicts_are_cached(self):
+        renderer = MondrUIRenderer()
+        spec = {'component': 'Text', 'props': {'variant': 3}}
+        
+        first = renderer.validate(spec)
+        second = renderer.validate(spec)
+        assert first == second
+        stats = renderer.get_validation_cache_stats()
+        assert stats['hits'] == 1 and stats['misses'] == 1
+    
+    def test_validate_props_uses_schema(self):
+        assert InputComponent('Input', {'required': True}).validate_props()
+        assert not InputComponent('Input', {'required': 'true'}).validate_props()
+    
+    def test_compile_validator(self):
+        validate = compile_validator({
+            'name': PropRule((str,), required=True),
+            'size': PropRule(choices=('s', 'm', 'l'))
+        })
+        errors = []
+        validate({'size': 'xl'}, 'item', errors)
+        assert errors == ["item: missing required prop 'name'", 'item.size: must be one of s, m, l']
+
+
+class TestRenderProfiling:
+    """Test render instrumentation hooks and profiles."""
+    
+    SPEC = {
+        'type': 'ui.render',
+        'component': 'Container',
+        'props': {'children': [
+            {'component': 'Text', 'props': {'text': 'Title', 'variant': 'h2'}},
+            {'component': 'Card', 'props': {'title': 'Card', 'children': [
+                {'component': 'Button', 'props': {'label': 'Go'}}
+            ]}},
+            {'component': 'primaryButton', 'props': {'label': 'Save'}}
+        ]}
+    }
+    
+    def test_hooks_are_called_around_each_component(self):
+        renderer = MondrUIRenderer()
+        calls = []
+        
+        class Recorder(RenderHook):
+            def before_render(self, plan, depth):
+                calls.append(('before', plan.component, depth))
+            
+            def after_render(self, plan, timing):
+                calls.append(('after', timing.component, timing.depth))
+        
+        hook = Recorder()
+        renderer.add_render_hook(hook)
+        renderer.render_ui({'type': 'ui.render', 'component': 'Card', 'props': {'children': [{'component': 'Text'}]}})
+        renderer.remove_render_hook(hook)
+        renderer.render_ui({'type': 'ui.render', 'component': 'Text'})
+        
+        assert calls == [
+            ('before', 'Card', 0), ('before', 'Text', 1),
+            ('after', 'Text', 1), ('after', 'Card', 0)
+        ]
+    
+    def test_profile_report(self):
+        renderer = MondrUIRenderer()
+        renderer.register_template('primaryButton', {'component': 'Button', 'props': {'label': '{{label}}'}})
+        with renderer.profile() as report:
+            handle = renderer.render_ui(self.SPEC)
+        
+        assert [root.component for root in report.roots] == ['Container']
+        container = report.roots[0]
+        assert [child.component for child in container.children] == ['Text', 'Card', 'Button']
+        assert container.children[1].children[0].depth == 2
+        assert report.max_depth == 2
+        assert report.template_expansions == 2  # Once when validating, once when compiling
+        assert report.wall_time >= container.wall_time >= container.children[1].wall_time
+        assert container.elements == 1 + len(list(handle.element.descendants()))
+        
+        components = report.by_component()
+        assert components['Button']['count'] == 2
+        assert sum(entry['elements'] for entry in components.values()) == container.elements
+        
+        data = report.to_dict()
+        assert data['tree'][0]['name'] == 'Container'
+        assert data['elements'] == container.elements
+        assert [line.rsplit(' ', 1)[0] for line in report.collapsed_stacks()] == [
+            'Container', 'Container;Text', 'Container;Card', 'Container;Card;Button', 'Container;Button'
+        ]
+    
+    def test_profile_is_removed_after_block(self):
+        renderer = MondrUIRenderer()
+        with renderer.profile() as report:
+            renderer.render_ui({'type': 'ui.render', 'component': 'Text'})
+        renderer.render_ui({'type': 'ui.render', 'component': 'Button'})
+        
+        assert [frame.component for frame in report.frames()] == ['Text']
+        assert renderer._render_hooks == []
+
+
+class TestEventPolicies:
+    """Test event rate limits and the event dispatch table."""
+    
+    def render(self, events, component='Input', **renderer_kwargs):
+        renderer = MondrUIRenderer(backend=MemoryUI())
+        calls = []
+        renderer.register_action_handler('record', lambda *args, **params: calls.append((args, params)))
+        handle = renderer.render_ui({
+            'type': 'ui.render', 'component': component, 'props': {'events': events}
+        })
+        return renderer, handle.element, calls
+    
+    def test_debounce_is_applied_on_the_client(self):
+        _, element, _ = self.render({'change': {'action': 'record', 'debounce': 300, 'leading': False}})
+        
+        listener = element.handlers['change'][0]
+        assert 'setTimeout' in listener['js_handler'] and '}, 300);' in listener['js_handler']
+        assert 'if (state.timer === null && false) emit(...args)' in listener['js_handler']
+        assert listener['throttle'] == 0
+    
+    def test_throttle_uses_listener_throttle(self):
+        _, element, _ = self.render({'slide': {'action': 'record', 'throttle': 250, 'trailing': False}},
+                                    component='Input')
+        
+        listener = element.handlers['update:model-value'][0]
+        assert listener['throttle'] == 0.25
+        assert listener['js_handler'] is None
+    
+    def test_plain_events_have_no_rate_limit(self):
+        _, element, calls = self.render({'click': 'record'}, component='Button')
+        
+        listener = element.handlers['click'][0]
+        assert (listener['throttle'], listener['js_handler'], listener['args']) == (0, None, [])
+        element.trigger('click')
+        assert calls == [((), {})]
+    
+    def test_keydown_focus_and_blur_are_wired(self):
+        _, element, calls = self.render({
+            'keydown': {'action': 'record', 'params': {'field': 'name'}},
+            'focus': 'record',
+            'blur': 'record'
+        })
+        element.value = 'Ann'
+        
+        element.trigger('keydown', {'key': 'Enter'})
+        element.trigger('focus')
+        element.trigger('blur')
+        assert calls == [(('Enter',), {'field': 'name'}), ((), {}), (('Ann',), {})]
+    
+    def test_register_event_binding(self):
+        renderer = MondrUIRenderer(backend=MemoryUI())
+        renderer.register_event_binding(EventType.SUBMIT, EventBinding('keydown.enter', lambda element, e: ('enter',)))
+        calls = []
+        renderer.register_action_handler('send', calls.append)
+        
+        handle = renderer.render_ui({'type': 'ui.render', 'component': 'Input', 'props': {'events': {'submit': 'send'}}})
+        handle.element.trigger('keydown.enter')
+        assert calls == ['enter']
+    
+    def test_unhandled_actions_are_not_bound(self):
+        _, element, _ = self.render({'click': 'unknown', 'hover': 'record'}, component='Button')
+        assert element.handlers == {}
+
+
+class TestSliderReadout:
+    """Test that slider values are shown in the browser and synced on release."""
+    
+    def render(self, **props):
+        renderer = MondrUIRenderer(backend=MemoryUI())
+        handle = renderer.render_ui({'type': 'ui.render', 'component': 'Slider', 'props': props})
+        slider = next(e for e in handle.element.descendants() if e.tag == 'slider')
+        label = next(e for e in handle.element.descendants() if e.tag == 'label')
+        return slider, label
+    
+    def test_readout_is_updated_on_the_client(self):
+        slider, label = self.render(value=3)
+        
+        listeners = slider.handlers['update:model-value']
+        assert all(listener['handler'] is None for listener in listeners)
+        assert any(f'getHtmlElement({label.id}).textContent' in listener['js_handler'] for listener in listeners)
+    
+    def test_label_follows_committed_value(self):
+        slider, label = self.render(value=3)
+        assert label.text == 'Value: 3'
+        
+        slider.trigger('change', 7)
+        assert label.text == 'Value: 7'
+    
+    def test_value_element_syncs_on_change(self):
+        slider = ui.slider(min=0, max=10, value=3)
+        sync_value_on_change(slider)
+        
+        types = sorted(listener.type for listener in slider._event_listeners.values())
+        assert types == ['change', 'update:modelValue']
+        client_side = [listener for listener in slider._event_listeners.values() if listener.type == 'update:modelValue']
+        assert client_side[0].js_handler is not None
+
+
+class TestFormState:
+    """Test pulling form values at submit instead of syncing every edit."""
+    
+    FORM = {
+        'type': 'ui.render',
+        'component': 'Form',
+        'props': {
+            'fields': [
+                {'id': 'name', 'label': 'Name', 'type': 'text'},
+                {'id': 'rating', 'type': 'slider', 'min': 1, 'max': 10, 'value': 5, 'sync': 'debounce'},
+                {'id': 'features', 'type': 'checkboxGroup', 'options': {'a': 'A', 'b': 'B'}, 'value': ['a']},
+                {'label': 'No id', 'type': 'textarea'}
+            ],
+            'actions': [{'label': 'Submit', 'action': 'submit_form'}]
+        }
+    }
+    
+    def render(self, handler):
+        renderer = MondrUIRenderer(backend=MemoryUI())
+        renderer.register_action_handler('submit_form', handler)
+        element = renderer.render_ui(self.FORM).element
+        return {e.tag: e for e in element.descendants()}, list(element.descendants())
+    
+    def test_submit_passes_field_values(self):
+        submitted = []
+        
+        async def submit(values):
+            submitted.append(values)
+        
+        by_tag, elements = self.render(submit)
+        by_tag['input'].value = 'Ann'
+        by_tag['slider'].value = 8
+        checkboxes = [e for e in elements if e.tag == 'checkbox']
+        checkboxes[1].value = True
+        
+        by_tag['button'].trigger('click')
+        assert submitted == [{'name': 'Ann', 'rating': 8, 'features': ['a', 'b']}]
+    
+    def test_handlers_without_arguments_are_called_without_values(self):
+        calls = []
+        by_tag, _ = self.render(lambda: calls.append('submitted'))
+        
+        by_tag['button'].trigger('click')
+        assert calls == ['submitted']
+    
+    def test_form_fields_send_no_events_while_editing(self):
+        by_tag, _ = self.render(lambda values: None)
+        
+        assert 'change' not in by_tag['input'].handlers
+        assert 'change' in by_tag['slider'].handlers  # Only the value readout label
+    
+    def test_invalid_sync_policy(self):
+        spec = {'type': 'ui.render', 'component': 'Form', 'props': {'fields': [{'id': 'a', 'sync': 'often'}]}}
+        errors = MondrUIRenderer().validate(spec)
+        assert errors == ["spec.props.fields[0].sync: must be one of lazy, blur, debounce"]
+    
+    def value_listener(self, element):
+        return next(listener for listener in element._event_listeners.values()
+                    if listener.type.startswith('update:'))
+    
+    def test_lazy_sync_keeps_edits_in_the_browser(self):
+        element = ui.input()
+        defer_value_sync(element)
+        
+        js_handler = self.value_listener(element).js_handler
+        assert 'mondrui_pending' in js_handler and 'emit' not in js_handler
+    
+    def test_debounced_and_blur_sync(self):
+        debounced = ui.textarea()
+        defer_value_sync(debounced, SyncPolicy.DEBOUNCE, 500)
+        assert '}, 500);' in self.value_listener(debounced).js_handler
+        
+        on_blur = ui.input()
+        defer_value_sync(on_blur, SyncPolicy.BLUR)
+        blur = next(listener for listener in on_blur._event_listeners.values() if listener.type == 'blur')
+        assert blur.handler is self.value_listener(on_blur).handler
+        assert 'emit(pending[' in blur.js_handler
+    
+    def test_pull_applies_pending_values_in_one_request(self):
+        text, number, radio = ui.input(value='old'), ui.number(value=1), ui.radio(['x', 'y'], value='x')
+        state = FormState()
+        state.add_field('text', text)
+        state.add_field('number', number)
+        state.add_field('radio', radio)
+        requests = []
+        
+        async def run_javascript(code, timeout=1.0):
+            requests.append(code)
+            return {str(text.id): 'new', str(number.id): '3'}
+        
+        text.client.run_javascript = run_javascript
+        try:
+            values = asyncio.run(state.pull())
+        finally:
+            del text.client.run_javascript
+        
+        assert len(requests) == 1
+        assert values == {'text': 'new', 'number': 3.0, 'radio': 'x'}
+        assert text.value == 'new'
+    
+    def test_pull_falls_back_to_synced_values_on_timeout(self):
+        text = ui.input(value='synced')
+        state = FormState()
+        state.add_field('text', text)
+        
+        async def run_javascript(code, timeout=1.0):
+            raise TimeoutError(f'JavaScript did not respond within {timeout:.1f} s')
+        
+        submitted = []
+        submit = FormComponent._submit_handler(state, submitted.append)
+        text.client.run_javascript = run_javascript
+        try:
+            values = asyncio.run(state.pull())
+            asyncio.run(submit())
+        finally:
+            del text.client.run_javascript
+        
+        assert values == {'text': 'synced'}
+        assert submitted == [{'text': 'synced'}]
+
+
+class TestRenderLifecycle:
+    """Test disposing of rendered trees and counting live ones."""
+    
+    SPEC = {'type': 'ui.render', 'component': 'Button', 'props': {'label': 'Go', 'events': {'click': 'go'}}}
+    
+    def renderer(self, **kwargs):
+        renderer = MondrUIRenderer(backend=MemoryUI(), **kwargs)
+        renderer.register_action_handler('go', lambda: None)
+        return renderer
+    
+    def test_dispose_deletes_elements_and_handlers(self):
+        renderer = self.renderer()
+        handle = renderer.render_ui(self.SPEC)
+        element = handle.element
+        
+        handle.dispose()
+        handle.dispose()  # Idempotent
+        assert element.is_deleted and element.handlers == {}
+        assert handle.disposed and handle.node.element is None
+        assert renderer.ui.root.default_slot.children == []
+        with pytest.raises(ValueError, match='disposed'):
+            handle.update(self.SPEC)
+    
+    def test_live_trees_are_counted_per_client(self):
+        renderer = self.renderer()
+        first = renderer.render_ui(self.SPEC)
+        second = renderer.render_ui(self.SPEC)
+        assert renderer.live_trees() == [first, second]
+        
+        first.dispose()
+        renderer.ui.root.clear()  # Deleting a parent ends the tree as well
+        assert renderer.live_trees() == []
+        assert renderer.get_live_tree_stats()['trees'] == 0
+    
+    def test_deleted_trees_are_not_kept(self):
+        renderer = self.renderer()
+        for _ in range(100):
+            renderer.render_ui(self.SPEC)
+            renderer.ui.root.clear()
+        
+        assert len(renderer._live_trees[renderer.ui.context.client]) == 1
+    
+    def test_trees_do_not_keep_their_client_alive(self):
+        class Client:
+            pass
+        renderer = self.renderer()
+        client = Client()
+        node = renderer.render_ui(self.SPEC).node
+        renderer._track(RenderHandle(renderer, self.SPEC, node, client))
+        assert len(renderer._live_trees) == 2
+        
+        del client
+        gc.collect()
+        assert len(renderer._live_trees) == 1
+    
+    def test_max_live_trees_disposes_oldest(self):
+        renderer = self.renderer(max_live_trees=2)
+        handles = [renderer.render_ui(self.SPEC) for _ in range(3)]
+        
+        assert [handle.disposed for handle in handles] == [True, False, False]
+        assert renderer.live_trees() == handles[1:]
+    
+    def test_dispose_on_dialog_close(self):
+        renderer = MondrUIRenderer()
+        with ui.dialog() as dialog:
+            handle = renderer.render_ui(self.SPEC).dispose_on_close(dialog)
+        dialog.open()
+        assert renderer.get_live_tree_stats()['trees'] == 1
+        
+        dialog.close()
+        assert handle.disposed and dialog.is_deleted
+        assert renderer.get_live_tree_stats()['trees'] == 0
+
+
+class TestElementPool:
+    """Test reusing released trees for structurally identical specs."""
+    
+    def form(self, title, label='Summary'):
+        return {'type': 'ui.render', 'component': 'Form', 'props': {
+            'title': title,
+            'fields': [{'id': 'summary', 'label': label, 'type': 'text'}],
+            'actions': [{'label': 'Send', 'action': 'send'}]
+        }}
+    
+    def test_released_form_shell_is_reused(self):
+        renderer = MondrUIRenderer(backend=MemoryUI(), pool_size=2)
+        first = renderer.render_ui(self.form('Bug report'))
+        card = first.element
+        old_input = next(e for e in card.descendants() if e.tag == 'input')
+        old_input.value = 'typed before'
+        
+        first.release()
+        assert first.disposed and not card.is_deleted
+        assert card.parent_slot.parent.visible is False  # Kept in the hidden pool container
+        
+        second = renderer.render_ui(self.form('Feedback', label='Comment'))
+        assert second.element is card
+        assert card.parent_slot is renderer.ui.root.default_slot
+        texts = [e.text for e in card.descendants() if e.tag == 'label']
+        assert texts == ['Feedback', 'Comment']
+        new_input = next(e for e in card.descendants() if e.tag == 'input')
+        assert new_input is not old_input and new_input.value == ''
+        assert renderer.get_pool_stats()['hits'] == 1
+    
+    def test_reused_inputs_are_reset(self):
+        renderer = MondrUIRenderer(backend=MemoryUI(), pool_size=1)
+        spec = {'type': 'ui.render', 'component': 'Container', 'props': {
+            'children': [{'component': 'Input', 'props': {'value': 'start'}}]
+        }}
+        handle = renderer.render_ui(spec)
+        element = handle.element.default_slot.children[0]
+        element.value = 'edited'
+        
+        handle.release()
+        reused = renderer.render_ui(spec)
+        assert reused.element.default_slot.children[0] is element
+        assert element.value == 'start'
+    
+    def test_different_structure_is_not_reused(self):
+        renderer = MondrUIRenderer(backend=MemoryUI(), pool_size=1)
+        handle = renderer.render_ui(self.form('A'))
+        card = handle.element
+        handle.release()
+        
+        other = renderer.render_ui({'type': 'ui.render', 'component': 'Form', 'props': {'title': 'B'}})
+        assert other.element is not card
+        assert renderer.get_pool_stats()['misses'] == 2  # The first render found an empty pool too
+    
+    def test_pool_size_is_bounded_per_client(self):
+        renderer = MondrUIRenderer(backend=MemoryUI(), pool_size=2)
+        handles = [renderer.render_ui(self.form(str(index))) for index in range(3)]
+        cards = [handle.element for handle in handles]
+        for handle in handles:
+            handle.release()
+        
+        assert [card.is_deleted for card in cards] == [True, False, False]
+        assert renderer.get_pool_stats()['size'] == 2
+    
+    def test_release_without_pool_disposes(self):
+        renderer = MondrUIRenderer(backend=MemoryUI())
+        handle = renderer.render_ui(self.form('A'))
+        card = handle.element
+        
+        handle.release()
+        assert handle.disposed and card.is_deleted
+
+
+class TestRenderPlanCache:
+    """Test compiled render plans and their cache."""
+    
+    def test_compile_resolves_class_style_and_events(self):
+        renderer = MondrUIRenderer()
+        spec = {
+            'component': 'Button',
+            'props': {
+                'label': 'Go',
+                'style': {'classes': ['w-full'], 'width': '10px'},
+                'events': {'click': 'go'}
+            }
+        }
+        
+        plan = renderer.compile(spec)
+        assert isinstance(plan, RenderPlan)
+        assert plan.component_class is ButtonComponent
+        assert plan.style.classes == ['w-full']
+        assert plan.style.width == '10px'
+        assert plan.events[0].event == EventType.CLICK
+        assert plan.events[0].action == 'go'
+    
+    def test_compile_expands_templates_and_children(self):
+        renderer = MondrUIRenderer()
+        spec = {
+            'component': 'chatInterface',
+            'props': {'children': [{'component': 'Text', 'props': {'text': 'Hi'}}]}
+        }
+        
+        plan = renderer.compile(spec)
+        assert plan.component == 'Container'
+        inner = plan.children[0]
+        assert inner.props['layout'] == 'horizontal'
+        assert inner.children[0].component_class is TextComponent
+    
+    def test_repeated_specs_hit_cache(self):
+        renderer = MondrUIRenderer()
+        spec = {'component': 'Text', 'props': {'text': 'Hello', 'variant': 'h1'}}
+        reordered = {'props': {'variant': 'h1', 'text': 'Hello'}, 'component': 'Text'}
+        
+        first = renderer.compile(spec)
+        second = renderer.compile(reordered)
+        
+        assert first is second
+        stats = renderer.get_plan_cache_stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+    
+    def test_plans_do_not_share_the_spec(self):
+        renderer = MondrUIRenderer(shared_cache=None)
+        spec = {
+            'component': 'CheckboxGroup',
+            'props': {'id': 'color', 'options': {'r': 'Red'}, 'value': ['r'], 'style': {'classes': ['w-full']}}
+        }
+        
+        plan = renderer.compile(spec)
+        spec['props']['options']['g'] = 'Green'
+        spec['props']['value'].append('g')
+        spec['props']['label'] = 'Color'
+        
+        assert plan.props['options'] == {'r': 'Red'}
+        assert plan.props['value'] == ['r']
+        assert 'label' not in plan.props
+        with pytest.raises(TypeError):
+            plan.props['value'].append('g')
+        with pytest.raises(TypeError):
+            plan.props['style']['classes'] = []
+        copy = plan.props['options'].copy()
+        copy['g'] = 'Green'
+        assert plan.props['options'] == {'r': 'Red'}
+    
+    def test_compiled_plans_are_not_validated_again(self, monkeypatch):
+        renderer = MondrUIRenderer(backend=MemoryUI(), shared_cache=None)
+        plan = renderer.compile({'component': 'Input', 'props': {'required': True}})
+        calls = []
+        monkeypatch.setattr(InputComponent, 'validate_props', lambda self: calls.append(self) or True)
+        
+        renderer.render_plan(plan)
+        renderer.render_plan(plan)
+        assert plan.validated
+        assert calls == []
+    
+    def test_hand_built_plans_are_validated(self):
+        renderer = MondrUIRenderer(backend=MemoryUI(), shared_cache=None)
+        plan = RenderPlan('Input', InputComponent, {'required': 'true'}, ComponentStyle(), ())
+        
+        with pytest.raises(ValueError, match="Invalid properties"):
+            renderer.render_plan(plan)
+    
+    def test_registration_invalidates_cache(self):
+        renderer = MondrUIRenderer()
+        renderer.compile({'component': 'Text', 'props': {'text': 'Hello'}})
+        assert len(renderer.plan_cache) == 1
+        
+        renderer.register_template('greeting', {'component': 'Text', 'props': {'text': '{{name}}'}})
+        assert len(renderer.plan_cache) == 0
+    
+    def test_renderers_share_compiled_plans(self):
+        cache = LRUCache(maxsize=8, maxbytes=4096)
+        spec = {'component': 'Text', 'props': {'text': 'Hello', 'variant': 'h1'}}
+        reordered = {'props': {'variant': 'h1', 'text': 'Hello'}, 'component': 'Text'}
+        
+        first = MondrUIRenderer(shared_cache=cache).compile(spec)
+        second = MondrUIRenderer(shared_cache=cache).compile(reordered)
+        
+        assert first is second
+        stats = cache.stats()
+        assert stats['hits'] == 1 and stats['misses'] == 1
+        assert stats['bytes'] == len(canonical_spec(spec))
+    
+    def test_mutated_spec_does_not_poison_shared_cache(self):
+        cache = LRUCache(maxsize=8)
+        spec = {'component': 'Container', 'props': {'children': [{'component': 'Text', 'props': {'text': 'Hello'}}]}}
+        original = {'component': 'Container', 'props': {'children': [{'component': 'Text', 'props': {'text': 'Hello'}}]}}
+        
+        MondrUIRenderer(shared_cache=cache).compile(spec)
+        spec['props']['children'][0]['props']['text'] = 'MUTATED'
+        
+        fresh = MondrUIRenderer(backend=MemoryUI(), shared_cache=cache)
+        plan = fresh.compile(original)
+        assert cache.stats()['hits'] == 1
+        assert plan.children[0].props['text'] == 'Hello'
+        assert plan.props['children'][0]['props']['text'] == 'Hello'
+        html = fresh.render_html({'type': 'ui.render', **original})
+        assert 'Hello' in html and 'MUTATED' not in html
+    
+    def test_shared_plans_are_per_registry(self):
+        cache = LRUCache(maxsize=8)
+        spec = {'component': 'greeting', 'props': {'name': 'Ada'}}
+        plain = MondrUIRenderer(shared_cache=cache)
+        plain.register_template('greeting', {'component': 'Text', 'props': {'text': '{{name}}'}})
+        shouting = MondrUIRenderer(shared_cache=cache)
+        shouting.register_template('greeting', {'component': 'Text', 'props': {'text': '{{name}}', 'variant': 'h1'}})
+        
+        assert 'variant' not in plain.compile(spec).props
+        assert shouting.compile(spec).props['variant'] == 'h1'
+        assert len(cache) == 2
+    
+    def test_shared_cache_can_be_disabled(self):
+        renderer = MondrUIRenderer(shared_cache=None)
+        renderer.compile({'component': 'Text', 'props': {'text': 'Hello'}})
+        
+        assert len(renderer.plan_cache) == 1
+        assert renderer.get_shared_cache_stats() == {}
+    
+    def test_unknown_child_fails_before_rendering(self):
+        renderer = MondrUIRenderer()
+        spec = {
+            'component': 'Container',
+            'props': {'children': [{'component': 'Missing'}]}
+        }
+        
+        with pytest.raises(ValueError, match="Unknown component"):
+            renderer.compile(spec)
+    
+    def test_lru_cache_is_bounded(self):
+        cache = LRUCache(maxsize=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        assert cache.get('a') == 1
+        cache.put('c', 3)
+        
+        assert 'b' not in cache
+        assert 'a' in cache and 'c' in cache
+        assert cache.stats()['size'] == 2
+    
+    def test_lru_cache_is_bounded_by_bytes(self):
+        cache = LRUCache(maxsize=10, maxbytes=10, sizeof=len)
+        cache.put('a', 'xxxx')
+        cache.put('b', 'yyyy')
+        cache.put('c', 'zzzz')
+        
+        assert 'a' not in cache
+        assert cache.nbytes == 8
+        cache.put('big', 'x' * 11)
+        assert 'big' not in cache and len(cache) == 2
+        cache.put('b', 'yy')
+        assert cache.stats()['bytes'] == 6
+        assert cache.stats()['evictions'] == 1
+    
+    def test_spec_fingerprint_ignores_key_order(self):
+        assert spec_fingerprint({'a': 1, 'b': [1, 2]}) == spec_fingerprint({'b': [1, 2], 'a': 1})
+        assert spec_fingerprint({'a': 1}) != spec_fingerprint({'a': 2})
 
 
 if __name__ == '__main__':
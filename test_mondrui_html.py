@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests for static HTML pre-rendering.
+"""
+
+from mondrui import MondrUIRenderer
+from mondrui_html import element_to_html
+from mondrui_memory import MemoryUI
+
+
+class TestElementToHTML:
+    """Test serializing in-memory elements."""
+    
+    def test_containers_and_text_are_escaped(self):
+        ui = MemoryUI()
+        with ui.grid(columns=2).classes('gap-2').style('width: 50%') as grid:
+            ui.label('<b>&</b>')
+            ui.button('Go').classes('w-full')
+        
+        assert element_to_html(grid) == (
+            '<div class="nicegui-grid gap-2" style="grid-template-columns: repeat(2, minmax(0, 1fr)); width: 50%">'
+            '<div>&lt;b&gt;&amp;&lt;/b&gt;</div>'
+            '<button type="button" class="q-btn q-btn--standard q-btn--rectangle bg-primary text-white '
+            'q-px-md q-py-xs w-full" disabled>Go</button>'
+            '</div>'
+        )
+    
+    def test_form_controls_are_read_only(self):
+        ui = MemoryUI()
+        with ui.column() as column:
+            ui.input(placeholder='Name "first"', value='Ann').props('required')
+            ui.select({'l': 'Low', 'h': 'High'}, value='h')
+            ui.checkbox('Agree', value=True)
+            ui.slider(min=0, max=10, step=1, value=3)
+        
+        html = element_to_html(column)
+        assert '<input type="text" class="border rounded px-2 py-1" value="Ann" placeholder="Name &quot;first&quot;" required disabled>' in html
+        assert '<option value="l">Low</option><option value="h" selected>High</option>' in html
+        assert '<input type="checkbox" checked disabled> Agree' in html
+        assert '<input type="range" class="w-full" min="0" max="10" step="1" value="3" disabled>' in html
+    
+    def test_hidden_elements_are_skipped(self):
+        ui = MemoryUI()
+        with ui.row() as row:
+            ui.label('shown')
+            ui.label('hidden').set_visibility(False)
+        
+        assert element_to_html(row) == '<div class="nicegui-row row"><div>shown</div></div>'
+
+
+class TestRendererHTML:
+    """Test pre-rendering specs through the renderer."""
+    
+    SPEC = {
+        'type': 'ui.render',
+        'component': 'bugReportForm',
+        'props': {
+            'title': 'Report a Bug',
+            'fields': [{'id': 'summary', 'label': 'Summary', 'type': 'text', 'required': True}],
+            'actions': [{'label': 'Submit', 'action': 'submit_bug'}]
+        }
+    }
+    
+    def test_render_html_is_cached(self):
+        renderer = MondrUIRenderer()
+        
+        first = renderer.render_html(self.SPEC)
+        second = renderer.render_html(dict(reversed(list(self.SPEC.items()))))
+        
+        assert first is second
+        assert first.startswith('<div class="q-card nicegui-card max-w-md mx-auto p-6">')
+        assert '>Report a Bug</div>' in first and '>Summary*</div>' in first and '>Submit</button>' in first
+        assert renderer.get_html_cache_stats()['hits'] == 1
+    
+    def test_render_html_leaves_renderer_state_alone(self):
+        backend = MemoryUI()
+        renderer = MondrUIRenderer(backend=backend)
+        renderer.render_html(self.SPEC)
+        
+        assert renderer.ui is backend
+        assert backend.root.default_slot.children == []
+    
+    def test_render_static_creates_one_element(self):
+        backend = MemoryUI()
+        renderer = MondrUIRenderer(backend=backend)
+        
+        element = renderer.render_static(self.SPEC)
+        
+        assert element.tag == 'html'
+        assert element.content == renderer.render_html(self.SPEC)
+    
+    def test_prerendered_is_hydrated_by_timer(self):
+        backend = MemoryUI()
+        renderer = MondrUIRenderer(backend=backend)
+        hydrated = []
+        
+        container = renderer.render_prerendered(self.SPEC, hydrated.append)
+        children = container.default_slot.children
+        assert [child.tag for child in children] == ['html']
+        
+        backend.run_timers()
+        
+        assert [child.tag for child in children] == ['card']
+        assert hydrated[0].element is children[0]
+        assert backend.timers == []
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Tests for the in-memory rendering backend.
+"""
+
+from mondrui import MondrUIRenderer
+from mondrui_memory import MemoryUI
+
+
+def render(spec, **kwargs):
+    backend = MemoryUI()
+    renderer = MondrUIRenderer(backend=backend, **kwargs)
+    handle = renderer.render_ui({'type': 'ui.render', **spec})
+    return backend, renderer, handle
+
+
+class TestMemoryElements:
+    """Test the element tree API."""
+    
+    def test_nesting_follows_context(self):
+        ui = MemoryUI()
+        with ui.column() as column:
+            label = ui.label('a')
+            with ui.row():
+                ui.button('b')
+        
+        assert ui.root.default_slot.children == [column]
+        assert label.parent_slot.parent is column
+        assert [element.tag for element in column.descendants()] == ['label', 'row', 'button']
+    
+    def test_classes_style_and_props(self):
+        ui = MemoryUI()
+        element = ui.input(placeholder='Name').classes('w-full mb-3').style('width: 10px').props('required')
+        element.classes(remove='mb-3')
+        
+        assert element.snapshot() == {
+            'tag': 'input', 'value': '',
+            'props': {'placeholder': 'Name', 'required': True},
+            'classes': ['w-full'], 'style': {'width': '10px'}
+        }
+    
+    def test_move_delete_and_clear(self):
+        ui = MemoryUI()
+        with ui.column() as column:
+            first, second, third = ui.label('1'), ui.label('2'), ui.label('3')
+        
+        third.move(target_index=0)
+        second.delete()
+        assert column.default_slot.children == [third, first]
+        assert second.is_deleted
+        
+        column.clear()
+        assert column.default_slot.children == []
+    
+    def test_trigger_calls_handlers(self):
+        ui = MemoryUI()
+        calls = []
+        button = ui.button('Go').on('click', lambda: calls.append('no args'))
+        button.on('click', lambda e: calls.append(e.sender))
+        
+        button.trigger('click')
+        assert calls == ['no args', button]
+
+
+class TestMemoryRendering:
+    """Test rendering specs into the in-memory backend."""
+    
+    def test_renders_without_nicegui_client(self):
+        _, _, handle = render({
+            'component': 'Card',
+            'props': {
+                'title': 'Profile',
+                'style': {'classes': ['p-4'], 'width': '300px'},
+                'children': [
+                    {'component': 'Text', 'props': {'text': 'Hello', 'variant': 'h2'}},
+                    {'component': 'Input', 'props': {'placeholder': 'Name', 'required': True}}
+                ]
+            }
+        })
+        
+        assert handle.element.snapshot() == {
+            'tag': 'card',
+            'classes': ['p-4'],
+            'style': {'width': '300px'},
+            'children': [
+                {'tag': 'label', 'text': 'Profile', 'classes': ['text-lg', 'font-bold', 'mb-2']},
+                {'tag': 'html', 'content': '<h2>Hello</h2>'},
+                {'tag': 'input', 'value': '', 'props': {'placeholder': 'Name', 'required': True}}
+            ]
+        }
+    
+    def test_events_dispatch_to_action_handlers(self):
+        backend = MemoryUI()
+        renderer = MondrUIRenderer(backend=backend)
+        submitted = []
+        renderer.register_action_handler('submit', lambda **params: submitted.append(params))
+        
+        handle = renderer.render_ui({
+            'type': 'ui.render',
+            'component': 'Button',
+            'props': {'label': 'Send', 'events': {'click': {'action': 'submit', 'params': {'id': 7}}}}
+        })
+        handle.element.trigger('click')
+        
+        assert submitted == [{'id': 7}]
+    
+    def test_update_reorders_keyed_children(self):
+        def spec(names):
+            return {
+                'type': 'ui.render',
+                'component': 'Container',
+                'props': {'children': [{'component': 'Text', 'props': {'key': name, 'text': name}} for name in names]}
+            }
+        
+        backend, renderer, handle = render(spec(['a', 'b', 'c']))
+        labels = list(handle.element.default_slot.children)
+        
+        handle.update(spec(['c', 'a']))
+        
+        assert handle.element.default_slot.children == [labels[2], labels[0]]
+        assert labels[1].is_deleted
+    
+    def test_virtual_list_scrolls(self):
+        _, _, handle = render({
+            'component': 'List',
+            'props': {'items': [{'name': f'Item {i}'} for i in range(1000)], 'virtual': True, 'rowHeight': 40,
+                      'itemTemplate': {'component': 'Text', 'props': {'text': '{{name}}'}}}
+        })
+        
+        handle.element.trigger('scroll', {'verticalPosition': 4000, 'verticalContainerSize': 400})
+        
+        texts = [element.text for element in handle.element.descendants()
+                 if element.tag == 'label' and element.parent_slot.parent.visible]
+        assert texts[0] == 'Item 95' and texts[-1] == 'Item 115'
+    
+    def test_profiling_counts_memory_elements(self):
+        backend = MemoryUI()
+        renderer = MondrUIRenderer(backend=backend)
+        with renderer.profile() as report:
+            handle = renderer.render_ui({'type': 'ui.render', 'component': 'Form', 'props': {
+                'fields': [{'id': 'a', 'label': 'A'}, {'id': 'b', 'label': 'B', 'type': 'textarea'}]
+            }})
+        
+        assert report.roots[0].elements == len(list(handle.element.descendants(include_self=True)))
+    
+    def test_root_clear_discards_renders(self):
+        backend, renderer, _ = render({'component': 'Text', 'props': {'text': 'x'}})
+        renderer.render_ui({'type': 'ui.render', 'component': 'Text'})
+        assert len(backend.root.default_slot.children) == 2
+        
+        backend.root.clear()
+        assert backend.root.default_slot.children == []
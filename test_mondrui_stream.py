@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental parsing of streamed MondrUI specifications.
+"""
+
+import json
+import pytest
+from mondrui_stream import (
+    IncrementalJSONParser, SpecExtractor, StreamedFormParts, extract_mondrui_json, extract_mondrui_specs
+)
+
+
+FORM_SPEC = {
+    'type': 'ui.render',
+    'component': 'Form',
+    'props': {
+        'title': 'Report a "Bug" \\ now',
+        'fields': [
+            {'id': 'summary', 'label': 'Summary', 'type': 'text', 'required': True},
+            {'id': 'rating', 'label': 'Rating', 'type': 'slider', 'min': 1, 'max': 10, 'value': 5.5},
+            {'id': 'features', 'type': 'checkboxGroup', 'options': {'a': 'A'}, 'value': ['a'], 'extra': None}
+        ],
+        'actions': [{'label': 'Submit', 'action': 'submit_form'}]
+    }
+}
+
+RESPONSE = (
+    'Here is a form for your report:\n\n```json\n'
+    + json.dumps(FORM_SPEC, indent=2)
+    + '\n```\n\nPlease fill it in.'
+)
+
+
+def feed_in_chunks(parser, text, size):
+    completed = []
+    for start in range(0, len(text), size):
+        completed.extend(parser.feed(text[start:start + size]))
+    return completed
+
+
+class TestIncrementalJSONParser:
+    """Test the chunk-fed JSON parser."""
+    
+    @pytest.mark.parametrize('size', [1, 2, 5, 64, 10000])
+    def test_parses_across_chunk_boundaries(self, size):
+        parser = IncrementalJSONParser()
+        text = json.dumps(FORM_SPEC)
+        for start in range(0, len(text), size):
+            parser.feed(text[start:start + size])
+        
+        assert parser.done
+        assert parser.result == FORM_SPEC
+    
+    def test_reports_fields_as_soon_as_they_close(self):
+        parser = IncrementalJSONParser()
+        text = json.dumps(FORM_SPEC)
+        first_field_end = text.index('}') + 1
+        
+        completed, _ = parser.feed(text[:first_field_end])
+        
+        assert (('props', 'fields', 0), FORM_SPEC['props']['fields'][0]) in completed
+        assert (('props', 'title'), FORM_SPEC['props']['title']) in completed
+        assert not parser.done
+    
+    def test_values_deeper_than_max_depth_are_not_reported(self):
+        parser = IncrementalJSONParser(max_depth=2)
+        completed, _ = parser.feed(json.dumps(FORM_SPEC))
+        
+        paths = [path for path, _ in completed]
+        assert ('props', 'fields') in paths
+        assert all(len(path) <= 2 for path in paths)
+    
+    def test_returns_text_after_root_value(self):
+        parser = IncrementalJSONParser()
+        completed, rest = parser.feed('{"a": [1, 2]}\n```\nmore')
+        
+        assert parser.result == {'a': [1, 2]}
+        assert completed[-1] == ((), {'a': [1, 2]})
+        assert rest == '\n```\nmore'
+    
+    def test_values_split_across_chunks(self):
+        parser = IncrementalJSONParser()
+        completed = []
+        for chunk in ['{"count": 12', '34, "te', 'xt": "a\\', '"b", "ok": tr', 'ue}']:
+            completed.extend(parser.feed(chunk)[0])
+        
+        assert (('count',), 1234) in completed
+        assert (('text',), 'a"b') in completed
+        assert (('ok',), True) in completed
+        assert parser.buffer == '{"count": 1234, "text": "a\\"b", "ok": true}'
+    
+    @pytest.mark.parametrize('chunks', [
+        ['{"a": [1, 2]}\n```\nmore'],
+        ['\n', '{"a": [1, 2]}\n```\nmore'],
+        ['{"a": [1', ', 2]}\n```\nmore'],
+    ])
+    def test_root_only_parsing_keeps_the_consumed_text(self, chunks):
+        parser = IncrementalJSONParser(max_depth=0)
+        for chunk in chunks:
+            completed, rest = parser.feed(chunk)
+        
+        assert completed == [((), {'a': [1, 2]})]
+        assert rest == '\n```\nmore'
+        assert parser.buffer.strip() == '{"a": [1, 2]}'
+
+
+class TestProgressiveExtraction:
+    """Test reporting the values of a spec and the prose while the response streams in."""
+    
+    def extractor(self):
+        values = []
+        extractor = SpecExtractor(on_value=lambda path, value: values.append((path, value)))
+        return extractor, values
+    
+    @pytest.mark.parametrize('size', [1, 3, 7, 100])
+    def test_separates_prose_and_spec(self, size):
+        extractor, values = self.extractor()
+        prose = []
+        for start in range(0, len(RESPONSE), size):
+            extractor.feed(RESPONSE[start:start + size])
+            prose.append(extractor.new_prose())
+        
+        assert values[-1] == ((), FORM_SPEC)
+        assert extractor.specs == [FORM_SPEC]
+        extractor.finish()
+        prose.append(extractor.new_prose())
+        assert ''.join(prose) == 'Here is a form for your report:\n\n\n\nPlease fill it in.'
+    
+    def test_fields_arrive_in_order(self):
+        extractor, values = self.extractor()
+        feed_in_chunks(extractor, RESPONSE, 4)
+        
+        field_paths = [path for path, _ in values if path[:2] == ('props', 'fields') and len(path) == 3]
+        assert field_paths == [('props', 'fields', 0), ('props', 'fields', 1), ('props', 'fields', 2)]
+        assert values[0] == (('type',), 'ui.render')
+    
+    def test_values_are_reported_before_the_block_closes(self):
+        extractor, values = self.extractor()
+        text = RESPONSE[:RESPONSE.index('"actions"')]
+        
+        assert extractor.feed(text) == []
+        assert (('props', 'fields', 2), FORM_SPEC['props']['fields'][2]) in values
+        assert extractor.new_prose() == 'Here is a form for your report:\n\n'
+    
+    def test_response_without_block(self):
+        extractor, values = self.extractor()
+        feed_in_chunks(extractor, 'Just a plain answer with `code`.', 3)
+        
+        assert values == []
+        assert extractor.finish() == ('Just a plain answer with `code`.', [])
+
+
+class TestStreamedFormParts:
+    """Test choosing the streamed values a form is built from."""
+    
+    def build(self, response, size=1):
+        parts = StreamedFormParts()
+        built = []
+        extractor = SpecExtractor(on_value=lambda path, value: built.extend(parts.feed(path, value)))
+        feed_in_chunks(extractor, response, size)
+        return parts, built, extractor.finish()[1]
+    
+    def test_type_after_props(self):
+        spec = {'component': 'Form', 'props': FORM_SPEC['props'], 'type': 'ui.render'}
+        parts, built, specs = self.build(f'Form:\n```json\n{json.dumps(spec)}\n```')
+        
+        fields = [value for path, value in built if path[:2] == ('props', 'fields') and len(path) == 3]
+        assert fields == FORM_SPEC['props']['fields']
+        assert (('props', 'title'), FORM_SPEC['props']['title']) in built
+        assert parts.complete(specs[0])
+    
+    def test_values_wait_for_component_or_type(self):
+        parts = StreamedFormParts()
+        assert parts.feed(('props', 'title'), 'Report') == []
+        assert parts.feed(('component',), 'Form') == [(('props', 'title'), 'Report'), (('component',), 'Form')]
+        assert parts.feed(('props', 'fields', 0), {'id': 'a'}) == [(('props', 'fields', 0), {'id': 'a'})]
+    
+    def test_blocks_that_are_not_specs_are_forgotten(self):
+        parts, built, specs = self.build('```json\n{"title": "x", "fields": [1]}\n```\n' + RESPONSE, size=5)
+        
+        assert built[0] == (('type',), 'ui.render')
+        assert parts.complete(specs[0])
+    
+    def test_missed_fields_are_reported(self):
+        parts = StreamedFormParts()
+        parts.feed(('type',), 'ui.render')
+        parts.feed(('props', 'title'), 'Report')
+        parts.feed(('props', 'fields', 0), FORM_SPEC['props']['fields'][0])
+        
+        assert not parts.complete(FORM_SPEC)
+        assert not StreamedFormParts().complete(FORM_SPEC)
+
+
+class TestExtractMondrUIJSON:
+    """Test extracting a spec from a complete response."""
+    
+    def test_extracts_spec_and_cleans_text(self):
+        text, spec = extract_mondrui_json(RESPONSE)
+        
+        assert spec == FORM_SPEC
+        assert text == 'Here is a form for your report:\n\n\n\nPlease fill it in.'
+    
+    def test_response_without_spec(self):
+        response = 'No form here.\n```json\n{"a": 1}\n```'
+        assert extract_mondrui_json(response) == (response, None)
+    
+    def test_spec_with_backticks_in_strings(self):
+        spec = {'type': 'ui.render', 'component': 'Text', 'props': {'content': 'Use ```code``` here'}}
+        response = f'Look:\n```json\n{json.dumps(spec)}\n```'
+        assert extract_mondrui_json(response) == ('Look:', spec)
+    
+    def test_extracts_every_spec(self):
+        second = {'type': 'ui.render', 'component': 'Text', 'props': {'content': 'Done'}}
+        response = RESPONSE + '\n```json\n' + json.dumps(second) + '\n```\nBye.'
+        
+        text, specs = extract_mondrui_specs(response)
+        assert specs == [FORM_SPEC, second]
+        assert text == 'Here is a form for your report:\n\n\n\nPlease fill it in.\n\nBye.'
+
+
+class TestSpecExtractor:
+    """Test the chunk-fed spec extractor."""
+    
+    OTHER_BLOCKS = (
+        'Code:\n```python\nprint("{")\n```\n'
+        'Config:\n```json\n{"a": 1}\n```\n'
+        'Broken:\n```json\n{"type": "ui.render", oops}\n```\n'
+    )
+    
+    @pytest.mark.parametrize('size', [1, 2, 3, 7, 64, 100000])
+    def test_chunked_extraction(self, size):
+        extractor = SpecExtractor()
+        completed = feed_in_chunks(extractor, self.OTHER_BLOCKS + RESPONSE, size)
+        
+        assert completed == [FORM_SPEC]
+        prose, specs = extractor.finish()
+        assert specs == [FORM_SPEC]
+        assert prose == self.OTHER_BLOCKS + 'Here is a form for your report:\n\n\n\nPlease fill it in.'
+    
+    def test_spec_is_reported_when_its_block_closes(self):
+        extractor = SpecExtractor()
+        head, tail = RESPONSE.split('\n```\n\nPlease')
+        
+        assert extractor.feed(head) == []
+        assert extractor.feed('\n``') == []
+        assert extractor.feed('`\n\nPlease' + tail) == [FORM_SPEC]
+    
+    @pytest.mark.parametrize('response', [
+        'Unterminated:\n```json\n{"type": "ui.render", "component": "Text"',
+        'Text after the JSON:\n```json\n{"type": "ui.render", "component": "Text"} trailing\n```',
+        'Ends with a fence ```',
+        'Ends with ```js',
+    ])
+    def test_non_spec_text_is_kept_verbatim(self, response):
+        extractor = SpecExtractor()
+        feed_in_chunks(extractor, response, 3)
+        assert extractor.finish() == (response, [])
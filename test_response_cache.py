@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Tests for the two-tier cache of model answers.
+"""
+
+import asyncio
+import subprocess
+import sys
+import time
+from langchain_core.messages import AIMessage, HumanMessage
+from response_cache import ResponseCache, replay, response_key
+
+
+class TestResponseKey:
+    """Test what an answer is keyed on."""
+    
+    def test_key_depends_on_every_part(self):
+        history = [HumanMessage(content='hi'), AIMessage(content='hello')]
+        key = response_key('gpt-4o-mini', 'system', history, 'question')
+        
+        assert key == response_key('gpt-4o-mini', 'system', list(history), 'question')
+        assert key != response_key('gpt-4o', 'system', history, 'question')
+        assert key != response_key('gpt-4o-mini', 'other system', history, 'question')
+        assert key != response_key('gpt-4o-mini', 'system', history[:1], 'question')
+        assert key != response_key('gpt-4o-mini', 'system', history, 'other question')
+    
+    def test_message_roles_are_part_of_history(self):
+        assert (response_key('m', 's', [HumanMessage(content='x')], 'q')
+                != response_key('m', 's', [AIMessage(content='x')], 'q'))
+
+
+class TestResponseCache:
+    """Test the memory and disk tiers."""
+    
+    def test_memory_tier(self):
+        cache = ResponseCache(maxsize=2)
+        assert cache.get('a') is None
+        cache.put('a', ['Hel', 'lo'])
+        
+        assert cache.get('a') == ('Hel', 'lo')
+        stats = cache.stats()
+        assert stats['hits'] == 1 and stats['memory_hits'] == 1 and stats['misses'] == 1
+        assert stats['hit_rate'] == 0.5
+    
+    def test_disk_tier_survives_restart(self, tmp_path):
+        path = str(tmp_path / 'responses.sqlite3')
+        cache = ResponseCache(path=path)
+        cache.put('a', ['Hel', 'lo'])
+        cache.close()
+        
+        restarted = ResponseCache(path=path)
+        assert restarted.get('a') == ('Hel', 'lo')
+        assert restarted.get('a') == ('Hel', 'lo')
+        stats = restarted.stats()
+        assert stats['disk_hits'] == 1 and stats['memory_hits'] == 1 and stats['misses'] == 0
+    
+    def test_evicted_answers_come_back_from_disk(self, tmp_path):
+        cache = ResponseCache(maxsize=1, path=str(tmp_path / 'responses.sqlite3'))
+        cache.put('a', ['A'])
+        cache.put('b', ['B'])
+        
+        assert cache.get('a') == ('A',)
+        assert cache.stats()['disk_hits'] == 1
+    
+    def test_disk_tier_keeps_newest_entries(self, tmp_path, monkeypatch):
+        clock = iter(range(1000))
+        monkeypatch.setattr(time, 'time', lambda: next(clock))
+        path = str(tmp_path / 'responses.sqlite3')
+        cache = ResponseCache(maxsize=1, path=path, max_disk_entries=2)
+        for key in 'abc':
+            cache.put(key, [key.upper()])
+        cache.put('c', ['C'])
+        
+        assert cache.stats()['disk_size'] == 2
+        assert cache.stats()['disk_evictions'] == 1
+        assert cache.get('a') is None
+        assert cache.get('b') == ('B',)
+    
+    def test_expired_answers_are_not_replayed(self, tmp_path, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(time, 'time', lambda: now[0])
+        path = str(tmp_path / 'responses.sqlite3')
+        cache = ResponseCache(path=path, max_age=60)
+        cache.put('a', ['A'])
+        assert cache.get('a') == ('A',)
+        
+        now[0] += 61
+        assert cache.get('a') is None
+        stats = cache.stats()
+        assert stats['hits'] == 1 and stats['memory_hits'] == 1 and stats['disk_hits'] == 0
+        assert stats['misses'] == 1 and stats['hit_rate'] == 0.5
+        cache.close()
+        assert ResponseCache(path=path, max_age=60).stats()['disk_size'] == 0
+    
+    def test_does_not_import_the_renderer(self):
+        code = 'import sys, response_cache; print("mondrui" in sys.modules or "nicegui" in sys.modules)'
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+        assert result.stdout.strip() == 'False'
+    
+    def test_clear(self, tmp_path):
+        cache = ResponseCache(path=str(tmp_path / 'responses.sqlite3'))
+        cache.put('a', ['A'])
+        cache.clear()
+        
+        assert cache.get('a') is None
+    
+    def test_replay_yields_chunks_in_order(self):
+        async def collect():
+            return [chunk async for chunk in replay(('Hel', 'lo', '!'))]
+        
+        assert asyncio.run(collect()) == ['Hel', 'lo', '!']
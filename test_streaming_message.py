@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Tests for frame-coalesced streaming of chat message bodies.
+"""
+
+import json
+import pytest
+from mondrui_memory import MemoryUI
+from streaming_message import StreamingMessage
+
+
+@pytest.fixture
+def backend():
+    return MemoryUI()
+
+
+def sent_deltas(backend):
+    """The text deltas of the append calls sent to the page, in order."""
+    deltas = []
+    for code in backend.javascript:
+        if 'buffers[' in code:
+            start = code.index('+ ') + 2
+            deltas.append(json.JSONDecoder().raw_decode(code, start)[0])
+    return deltas
+
+
+class TestStreamingMessage:
+    """Test buffering, coalescing and finishing of streamed text."""
+    
+    def test_chunks_are_coalesced_per_frame(self, backend):
+        stream = StreamingMessage(backend=backend)
+        for chunk in ['Hel', 'lo', ', ']:
+            stream.append(chunk)
+        backend.run_timers()
+        stream.append('world')
+        backend.run_timers()
+        backend.run_timers()
+        
+        assert sent_deltas(backend) == ['Hello, ', 'world']
+        assert stream.flushes == 2
+        assert stream.text == 'Hello, world'
+    
+    def test_bandwidth_is_linear(self, backend):
+        stream = StreamingMessage(backend=backend)
+        chunk = 'token '
+        for _ in range(500):
+            stream.append(chunk)
+            backend.run_timers()
+        
+        assert ''.join(sent_deltas(backend)) == chunk * 500
+        per_frame = max(len(code) for code in backend.javascript)
+        assert sum(len(code) for code in backend.javascript) <= 500 * per_frame
+        assert per_frame < 400
+    
+    def test_update_sends_only_new_text(self, backend):
+        stream = StreamingMessage(backend=backend)
+        stream.update('Here is')
+        backend.run_timers()
+        stream.update('Here is a form')
+        backend.run_timers()
+        
+        assert sent_deltas(backend) == ['Here is', ' a form']
+    
+    def test_every_frame_scrolls_once(self, backend):
+        stream = StreamingMessage(backend=backend)
+        stream.append('a')
+        stream.append('b')
+        backend.run_timers()
+        
+        assert backend.javascript[0].count('window.scrollTo') == 1
+        quiet = StreamingMessage(scroll=False, backend=backend)
+        quiet.append('c')
+        backend.run_timers()
+        assert 'window.scrollTo' not in backend.javascript[-1]
+    
+    def test_delta_is_escaped_as_a_string(self, backend):
+        stream = StreamingMessage(backend=backend)
+        stream.append("'); alert(1); ('\n\"")
+        backend.run_timers()
+        
+        assert sent_deltas(backend) == ["'); alert(1); ('\n\""]
+    
+    def test_finish_sets_content_and_stops(self, backend):
+        stream = StreamingMessage(backend=backend)
+        stream.append('Some <b>bold</b> text')
+        stream.finish()
+        stream.append('late')
+        backend.run_timers()
+        
+        assert stream.element.content == 'Some <b>bold</b> text'
+        assert sent_deltas(backend) == []
+        assert 'delete window.mondrui_streams' in backend.javascript[-1]
+        assert backend.timers == []
+    
+    def test_finish_with_replacement_content(self, backend):
+        stream = StreamingMessage(backend=backend)
+        stream.append('Here is a form:\n```json\n{')
+        stream.finish("I've prepared a form for you:")
+        
+        assert stream.element.content == "I've prepared a form for you:"
+    
+    def test_deleted_element_stops_streaming(self, backend):
+        stream = StreamingMessage(backend=backend)
+        stream.append('text')
+        stream.element.delete()
+        backend.run_timers()
+        stream.finish()
+        
+        assert stream.finished
+        assert backend.javascript == []
+        assert backend.timers == []